@@ -67,25 +67,46 @@ Você tem acesso a um banco SQLite com as seguintes tabelas:
    - id, nome, partido, uf, url_foto, email, etc
 
 2. **gastos** - Gastos parlamentares (cota CEAP)
-   - id, deputado_id, mes, ano, tipo_despesa, data_documento, valor_documento, valor_liquido, fornecedor
+   - id, deputado_id, mes, ano, tipo_despesa_id, fornecedor_id, data_documento, valor_documento, valor_liquido
+   - Textos ficam em dimensões: tipos_despesa (id, descricao), fornecedores (id, documento, nome), partidos (id, sigla)
 
 3. **projetos_lei** - Projetos de Lei
    - id, numero, ano, tipo, ementa, data_apresentacao, importancia, categoria
 
 4. **votacoes** - Votações na Câmara
-   - id, data_hora_registro, descricao, aprovacao, votos_sim, votos_nao, votos_outros
+   - id, data, descricao, proposicao, orgao, aprovacao, votos_sim, votos_nao, votos_outros
 
 5. **medidas_provisorias** - Medidas Provisórias
-   - id, numero, ementa, data_apresentacao, status, dias_restantes, nivel_urgencia
+   - id, numero, ano, ementa, data_apresentacao, prazo_vencimento, prazo_vencido, status, dias_restantes, nivel_urgencia
 
 6. **votos_deputados** - Votos individuais de cada deputado
-   - id, votacao_id, deputado_id, tipo_voto
+   - votacao_id, deputado_id, tipo_voto (código: 1=Sim, 2=Não, 3=Abstenção, 4=Obstrução, 5=Artigo 17, 0=Outro; ver tabela tipos_voto)
+
+7. **orientacoes** - Orientação de cada partido/bloco em cada votação
+   - votacao_id, sigla, tipo_lideranca, orientacao (mesmos códigos de tipos_voto, 6=Liberado)
+
+8. **tramitacoes** - Histórico de tramitação de PLs e MPs
+   - proposicao_id, sequencia, data_hora, orgao_id (código em orgaos), descricao, situacao, despacho
+
+9. **autorias** - Autores de cada PL na ordem de assinatura (índice por deputado_id)
+   - proposicao_id, ordem, deputado_id (nulo se o autor não é deputado), nome, tipo, proponente
+   - projetos_lei.autor_id é o primeiro deputado autor
+
+BUSCA POR PALAVRA-CHAVE (FTS5, ignora acentos e maiúsculas; não use LIKE '%...%' em ementa/titulo):
+- busca_pls (ementa; rowid = projetos_lei.id), busca_mps (ementa; rowid = medidas_provisorias.id), busca_noticias (titulo; rowid = noticias.id)
+- Use MATCH, ordene por bm25(tabela) (menor = mais relevante) e snippet(tabela, 0, '[', ']', '…', 16) para o trecho
 
 VIEWS DISPONÍVEIS:
 - vw_estatisticas_gerais - Estatísticas gerais do banco
 - vw_pls_por_categoria_ano - PLs agrupados por categoria e ano
 - vw_ranking_gastos_12m - Ranking de gastos dos últimos 12 meses
 - vw_taxa_aprovacao_votacoes - Taxa de aprovação de votações por ano
+- vw_votos_deputados - Votos com o tipo de voto decodificado: votacao_id, deputado_id, voto
+- vw_orientacoes - Orientações com o tipo decodificado: votacao_id, sigla, tipo_lideranca, orientacao
+- vw_tramitacoes - Tramitações com a sigla do órgão: proposicao_id, sequencia, data_hora, orgao, descricao, situacao, despacho
+- vw_autorias - Autorias com partido e uf do deputado (ou os da API, se o deputado não está em deputados) e numero, ano, categoria, status do PL
+- vw_gastos - Gastos com tipo_despesa, fornecedor e cnpj_fornecedor já decodificados
+- vw_cota_utilizacao - Utilização da cota (CEAP) por deputado e mês, a partir de 2024 (período com limites cadastrados): ano, mes, id, nome, partido, uf, gasto, limite, percentual
 
 INSTRUÇÕES:
 1. Quando o usuário fizer uma pergunta, analise o que ele quer saber
@@ -98,7 +119,10 @@ INSTRUÇÕES:
 EXEMPLOS DE QUERIES:
 - "SELECT d.nome, SUM(g.valor_liquido) as total FROM deputados d JOIN gastos g ON d.id = g.deputado_id GROUP BY d.id ORDER BY total DESC LIMIT 10"
 - "SELECT categoria, COUNT(*) as total FROM projetos_lei GROUP BY categoria ORDER BY total DESC"
+- "SELECT t.descricao, SUM(g.valor_liquido) as total FROM gastos g JOIN tipos_despesa t ON t.id = g.tipo_despesa_id GROUP BY g.tipo_despesa_id ORDER BY total DESC"
 - "SELECT * FROM vw_estatisticas_gerais"
+- "SELECT nome, uf, gasto, limite, percentual FROM vw_cota_utilizacao WHERE ano = 2024 AND mes = 3 ORDER BY percentual DESC LIMIT 10"
+- "SELECT p.numero, p.ano, snippet(busca_pls, 0, '[', ']', '…', 16) as trecho FROM busca_pls JOIN projetos_lei p ON p.id = busca_pls.rowid WHERE busca_pls MATCH 'reforma tributaria' AND p.ano = 2024 ORDER BY bm25(busca_pls) LIMIT 10"
 
 Responda em português brasileiro de forma natural e conversacional.`;
 
@@ -0,0 +1,112 @@
+"""
+Acesso à API da Câmara para os Coletores Históricos
+Todas as requisições passam por um único limitador de taxa (token bucket),
+então coletores rodando em paralelo dividem o mesmo orçamento
+"""
+import threading
+import time
+import sys
+from collections import Counter
+from pathlib import Path
+
+import requests
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import CAMARA_REQUISICOES_POR_SEGUNDO
+
+BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
+HEADERS = {"Accept": "application/json"}
+
+
+class LimitadorTaxa:
+    """
+    Token bucket thread-safe.
+
+    Acumula até `rajada` fichas, repostas a `taxa` por segundo; cada
+    requisição consome uma ficha e espera quando não há nenhuma.
+    """
+
+    def __init__(self, taxa, rajada=None):
+        self.taxa = taxa
+        self.rajada = rajada or max(1, int(taxa))
+        self._fichas = float(self.rajada)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+        self.espera_total = 0.0
+
+    def adquirir(self):
+        """Bloqueia até haver uma ficha disponível"""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._fichas = min(self.rajada, self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+
+                espera = (1 - self._fichas) / self.taxa
+                self.espera_total += espera
+
+            time.sleep(espera)
+
+
+LIMITADOR = LimitadorTaxa(CAMARA_REQUISICOES_POR_SEGUNDO)
+
+# Requisições feitas por nome de thread (cada fluxo do coletor mestre roda em uma)
+requisicoes_por_fluxo = Counter()
+_contador_lock = threading.Lock()
+_local = threading.local()
+
+
+def _sessao():
+    """Sessão HTTP por thread (reaproveita conexões sem compartilhar estado)"""
+    if not hasattr(_local, 'sessao'):
+        _local.sessao = requests.Session()
+        _local.sessao.headers.update(HEADERS)
+    return _local.sessao
+
+
+def fluxo_atual():
+    """Fluxo ao qual as requisições desta thread são contadas (padrão: nome da thread)"""
+    return getattr(_local, 'fluxo', None) or threading.current_thread().name
+
+
+def definir_fluxo(nome):
+    """
+    Conta as requisições desta thread no fluxo `nome`.
+
+    Usado como initializer dos pools de enriquecimento, para que os
+    workers somem no fluxo que os criou.
+    """
+    _local.fluxo = nome
+
+
+def api_get(url, params=None, timeout=15):
+    """GET respeitando o orçamento global de requisições; retorna a Response"""
+    LIMITADOR.adquirir()
+
+    with _contador_lock:
+        requisicoes_por_fluxo[fluxo_atual()] += 1
+
+    return _sessao().get(url, params=params, timeout=timeout)
+
+
+def paginar(url, params=None, timeout=30):
+    """
+    Itera os registros de uma listagem, seguindo os links 'next' da API.
+
+    Levanta requests.RequestException se alguma página falhar.
+    """
+    while url:
+        response = api_get(url, params, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+
+        yield from data.get('dados', [])
+
+        url = next((link['href'] for link in data.get('links', []) if link['rel'] == 'next'), None)
+        params = None
@@ -0,0 +1,255 @@
+"""
+Autorias de PLs
+Mantém a tabela autorias (autores de cada PL na ordem de assinatura) e o
+autor_id de projetos_lei: o enriquecimento busca em paralelo só os PLs que
+ainda não têm autoria gravada
+"""
+import logging
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.api_camara import BASE_URL, definir_fluxo, fluxo_atual, paginar
+from database.escrita import EscritorLotes
+from src.config import CAMARA_ENRIQUECIMENTO_PARALELO
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# PLs por lote gravado no enriquecimento em massa
+PLS_POR_LOTE = 200
+
+PADRAO_DEPUTADO = re.compile(r'/deputados/(\d+)')
+
+SQL_INSERIR_AUTORIA = """
+    INSERT INTO autorias (proposicao_id, ordem, deputado_id, nome, tipo, proponente, partido, uf)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (proposicao_id, ordem) DO UPDATE SET
+        deputado_id = excluded.deputado_id, nome = excluded.nome,
+        tipo = excluded.tipo, proponente = excluded.proponente,
+        partido = excluded.partido, uf = excluded.uf
+"""
+
+# Primeiro autor (deputado, se houver) de volta em projetos_lei
+SQL_ATUALIZAR_AUTOR = """
+    UPDATE projetos_lei SET
+        autor_id = (SELECT deputado_id FROM autorias
+                    WHERE proposicao_id = ?1 AND deputado_id IS NOT NULL
+                    ORDER BY ordem LIMIT 1),
+        autor_nome = COALESCE((SELECT nome FROM autorias WHERE proposicao_id = ?1
+                               ORDER BY ordem LIMIT 1), autor_nome)
+    WHERE id = ?1
+"""
+
+
+def linhas_autoria(proposicao_id, autores):
+    """Linhas de autorias a partir da lista de autores da API"""
+    linhas = []
+    for posicao, autor in enumerate(autores, 1):
+        deputado = PADRAO_DEPUTADO.search(autor.get('uri') or '')
+        linhas.append((
+            proposicao_id,
+            autor.get('ordemAssinatura') or posicao,
+            int(deputado.group(1)) if deputado else None,
+            autor.get('nome') or '',
+            autor.get('tipo'),
+            autor.get('proponente'),
+            autor.get('siglaPartido') or None,
+            autor.get('siglaUf') or None
+        ))
+    return linhas
+
+
+def buscar_autores(proposicao_id):
+    """
+    Autores de uma proposição.
+
+    Returns:
+        list: Autores da API (levanta requests.RequestException em falha)
+    """
+    return list(paginar(f"{BASE_URL}/proposicoes/{proposicao_id}/autores", timeout=15))
+
+
+def enriquecer_autorias(escritor, executor, ids):
+    """
+    Busca em paralelo os autores dos PLs e os enfileira com o autor_id.
+
+    Returns:
+        tuple: (PLs com autoria enfileirada, IDs dos PLs cuja busca falhou)
+    """
+    futuros = {executor.submit(buscar_autores, proposicao_id): proposicao_id for proposicao_id in ids}
+
+    enriquecidos = 0
+    falhas = []
+    for futuro in as_completed(futuros):
+        proposicao_id = futuros[futuro]
+        try:
+            autores = futuro.result()
+        except requests.RequestException as e:
+            logger.warning(f"⚠️  Erro ao buscar autores do PL {proposicao_id}: {e}")
+            falhas.append(proposicao_id)
+            continue
+
+        if not autores:
+            continue
+        escritor.adicionar_varios(SQL_INSERIR_AUTORIA, linhas_autoria(proposicao_id, autores))
+        escritor.adicionar(SQL_ATUALIZAR_AUTOR, (proposicao_id,))
+        enriquecidos += 1
+
+    return enriquecidos, falhas
+
+
+def pls_sem_autoria(conn, ids=None):
+    """IDs de PLs (todos, ou só os de `ids`) sem nenhuma autoria gravada"""
+    if ids is None:
+        cursor = conn.execute("""
+            SELECT id FROM projetos_lei
+            WHERE id NOT IN (SELECT proposicao_id FROM autorias)
+        """)
+        return [row[0] for row in cursor.fetchall()]
+
+    ids = list(ids)
+    pendentes = []
+    for i in range(0, len(ids), 500):
+        parte = ids[i:i + 500]
+        cursor = conn.execute(f"""
+            SELECT value FROM json_each(?)
+            WHERE value NOT IN (SELECT proposicao_id FROM autorias)
+        """, (str(parte),))
+        pendentes.extend(row[0] for row in cursor.fetchall())
+    return pendentes
+
+
+def coletar_autorias(todas=False, paralelo=CAMARA_ENRIQUECIMENTO_PARALELO):
+    """
+    Preenche as autorias dos PLs já gravados.
+
+    Args:
+        todas (bool): Rebusca todos os PLs (padrão: só os sem autoria)
+        paralelo (int): Requisições simultâneas
+
+    Returns:
+        int: PLs com autoria gravada
+    """
+    escritor = EscritorLotes()
+    if todas:
+        ids = [row[0] for row in escritor.conn.execute("SELECT id FROM projetos_lei").fetchall()]
+    else:
+        ids = pls_sem_autoria(escritor.conn)
+    inicio = time.time()
+    enriquecidos = 0
+    falhas = 0
+
+    logger.info(f"✍️  Autorias de {len(ids)} PLs...")
+
+    with ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='autorias',
+                            initializer=definir_fluxo, initargs=(fluxo_atual(),)) as executor:
+        for i in range(0, len(ids), PLS_POR_LOTE):
+            gravados, falhos = enriquecer_autorias(escritor, executor, ids[i:i + PLS_POR_LOTE])
+            enriquecidos += gravados
+            falhas += len(falhos)
+            escritor.flush()
+            logger.info(f"   {min(i + PLS_POR_LOTE, len(ids))}/{len(ids)} PLs ({enriquecidos} com autoria)")
+
+    escritor.close()
+    logger.info(f"✅ {enriquecidos} PLs com autoria em {time.time() - inicio:.1f}s ({falhas} com falha na API)")
+    return enriquecidos
+
+
+def autores_do_projeto(conn, proposicao_id, buscar=True):
+    """
+    Autores de um PL no formato "Nome (PARTIDO-UF)", na ordem de assinatura.
+
+    Se o PL ainda não tem autoria gravada e `buscar` é True, os autores
+    são buscados uma vez na API e gravados.
+
+    Returns:
+        list: Nomes dos autores (vazia se não há autoria nem foi possível buscar)
+    """
+    consulta = """
+        SELECT nome, partido, uf FROM vw_autorias
+        WHERE proposicao_id = ?
+        ORDER BY ordem
+    """
+    linhas = conn.execute(consulta, (proposicao_id,)).fetchall()
+
+    if not linhas and buscar:
+        try:
+            autores = buscar_autores(proposicao_id)
+        except requests.RequestException as e:
+            logger.error(f"❌ Erro ao buscar autores do PL {proposicao_id}: {e}")
+            return []
+        with EscritorLotes(conn=conn) as escritor:
+            escritor.adicionar_varios(SQL_INSERIR_AUTORIA, linhas_autoria(proposicao_id, autores))
+            escritor.adicionar(SQL_ATUALIZAR_AUTOR, (proposicao_id,))
+        linhas = conn.execute(consulta, (proposicao_id,)).fetchall()
+
+    return [f"{nome} ({partido}-{uf})" if partido and uf else nome for nome, partido, uf in linhas]
+
+
+def projetos_do_deputado(conn, deputado_id):
+    """PLs de que o deputado é autor ou coautor, do mais recente ao mais antigo"""
+    cursor = conn.execute("""
+        SELECT p.id, p.numero, p.ano, a.ordem, p.categoria, p.status, p.ementa
+        FROM autorias a
+        JOIN projetos_lei p ON p.id = a.proposicao_id
+        WHERE a.deputado_id = ?
+        ORDER BY p.ano DESC, p.id DESC
+    """, (deputado_id,))
+    return cursor.fetchall()
+
+
+def producao_deputados(conn, limite=20):
+    """
+    Deputados com mais PLs de autoria.
+
+    Returns:
+        list: (deputado_id, nome, partido, uf, PLs, PLs como primeiro autor)
+    """
+    cursor = conn.execute("""
+        SELECT a.deputado_id, d.nome, d.partido, d.uf,
+               COUNT(*) AS pls,
+               SUM(a.ordem = 1) AS primeiro_autor
+        FROM autorias a
+        JOIN deputados d ON d.id = a.deputado_id
+        GROUP BY a.deputado_id
+        ORDER BY pls DESC
+        LIMIT ?
+    """, (limite,))
+    return cursor.fetchall()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Autorias de PLs')
+    parser.add_argument('--todas', action='store_true',
+                        help='Rebusca todos os PLs (padrão: só os sem autoria)')
+    parser.add_argument('--paralelo', type=int, default=CAMARA_ENRIQUECIMENTO_PARALELO,
+                        help=f'Requisições simultâneas (padrão: {CAMARA_ENRIQUECIMENTO_PARALELO})')
+    parser.add_argument('--deputado', type=int, help='Lista os PLs de um deputado')
+    parser.add_argument('--ranking', action='store_true', help='Deputados com mais PLs de autoria')
+
+    args = parser.parse_args()
+
+    if args.deputado or args.ranking:
+        from database.init_db import get_connection
+
+        conn = get_connection()
+        if args.deputado:
+            for _, numero, _, ordem, categoria, status, ementa in projetos_do_deputado(conn, args.deputado):
+                papel = 'autor' if ordem == 1 else f'coautor ({ordem}º)'
+                print(f"   {numero:<16} {papel:<14} {categoria or '-':<14} {(ementa or '')[:70]}")
+        else:
+            for _, nome, partido, uf, pls, primeiro in producao_deputados(conn):
+                print(f"   {nome} ({partido}-{uf}): {pls} PLs ({primeiro} como primeiro autor)")
+        conn.close()
+    else:
+        coletar_autorias(args.todas, args.paralelo)
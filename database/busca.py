@@ -0,0 +1,154 @@
+"""
+Busca Textual
+Consultas por palavra-chave nos índices FTS5 (busca_pls, busca_mps,
+busca_noticias), ordenadas por relevância (bm25), com trecho destacado e
+filtros por ano e categoria
+"""
+import logging
+import re
+import sys
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import get_connection
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FONTES = ('pls', 'mps', 'noticias')
+
+# Índice FTS de cada fonte
+INDICES = {'pls': 'busca_pls', 'mps': 'busca_mps', 'noticias': 'busca_noticias'}
+
+# Mesmas colunas para as três fontes; notícias não têm categoria e o ano vem da publicação
+CONSULTAS = {
+    'pls': """
+        SELECT 'pls' AS fonte, p.id, p.numero AS titulo, p.ano, p.categoria, p.url,
+               snippet(busca_pls, 0, '[', ']', '…', 16) AS trecho,
+               bm25(busca_pls) AS relevancia
+        FROM busca_pls
+        JOIN projetos_lei p ON p.id = busca_pls.rowid
+        WHERE busca_pls MATCH :consulta
+          AND (:ano IS NULL OR p.ano = :ano)
+          AND (:categoria IS NULL OR p.categoria = :categoria)
+        ORDER BY relevancia
+        LIMIT :limite
+    """,
+    'mps': """
+        SELECT 'mps' AS fonte, m.id, m.numero AS titulo, m.ano, m.categoria, m.url,
+               snippet(busca_mps, 0, '[', ']', '…', 16) AS trecho,
+               bm25(busca_mps) AS relevancia
+        FROM busca_mps
+        JOIN medidas_provisorias m ON m.id = busca_mps.rowid
+        WHERE busca_mps MATCH :consulta
+          AND (:ano IS NULL OR m.ano = :ano)
+          AND (:categoria IS NULL OR m.categoria = :categoria)
+        ORDER BY relevancia
+        LIMIT :limite
+    """,
+    'noticias': """
+        SELECT 'noticias' AS fonte, n.id, n.titulo, CAST(strftime('%Y', n.data_publicacao) AS INTEGER) AS ano,
+               NULL AS categoria, n.link AS url,
+               snippet(busca_noticias, 0, '[', ']', '…', 16) AS trecho,
+               bm25(busca_noticias) AS relevancia
+        FROM busca_noticias
+        JOIN noticias n ON n.id = busca_noticias.rowid
+        WHERE busca_noticias MATCH :consulta
+          AND (:ano IS NULL OR n.data_publicacao >= printf('%04d', :ano)
+                            AND n.data_publicacao < printf('%04d', :ano + 1))
+          AND :categoria IS NULL
+        ORDER BY relevancia
+        LIMIT :limite
+    """,
+}
+
+
+def consulta_fts(texto):
+    """
+    Converte texto livre em consulta FTS5: cada palavra vira um termo entre
+    aspas (todas obrigatórias) e um * final é mantido como prefixo.
+
+    Ex.: 'reforma tribut*' -> '"reforma" "tribut"*'
+    """
+    termos = re.findall(r'(\w+)(\*?)', texto)
+    return ' '.join(f'"{palavra}"{prefixo}' for palavra, prefixo in termos)
+
+
+def buscar(conn, texto, fontes=FONTES, ano=None, categoria=None, limite=20, expressao=False):
+    """
+    Busca por palavras-chave, sem distinção de maiúsculas e acentos.
+
+    Args:
+        texto (str): Palavras buscadas (ou expressão FTS5 com expressao=True)
+        fontes: Subconjunto de FONTES
+        ano (int): Só proposições do ano (notícias: ano de publicação)
+        categoria (str): Só proposições da categoria (exclui notícias)
+        limite (int): Máximo de resultados no total
+        expressao (bool): Usa `texto` como consulta FTS5 (AND, OR, NEAR, aspas)
+
+    Returns:
+        list: Dicts (fonte, id, titulo, ano, categoria, url, trecho, relevancia),
+            do mais ao menos relevante
+    """
+    consulta = texto if expressao else consulta_fts(texto)
+    if not consulta:
+        return []
+
+    parametros = {'consulta': consulta, 'ano': ano, 'categoria': categoria, 'limite': limite}
+    resultados = []
+    for fonte in fontes:
+        resultados.extend(dict(row) for row in conn.execute(CONSULTAS[fonte], parametros))
+
+    # bm25 é negativo: quanto menor, mais relevante
+    resultados.sort(key=lambda resultado: resultado['relevancia'])
+    return resultados[:limite]
+
+
+def reconstruir_indices(conn=None):
+    """
+    Reconstrói os índices FTS5 a partir das tabelas base.
+
+    Os triggers mantêm os índices durante a ingestão; a reconstrução só é
+    necessária em bancos populados antes dos índices existirem.
+    """
+    fechar = conn is None
+    conn = conn or get_connection()
+
+    logger.info("🔎 Reconstruindo índices de busca textual...")
+    for indice in INDICES.values():
+        conn.execute(f"INSERT INTO {indice} ({indice}) VALUES ('rebuild')")
+        conn.commit()
+        logger.info(f"   ✅ {indice}")
+
+    if fechar:
+        conn.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Busca textual em PLs, MPs e notícias')
+    parser.add_argument('texto', nargs='?', help='Palavras buscadas (acentos e maiúsculas são ignorados)')
+    parser.add_argument('--fontes', nargs='+', choices=FONTES, default=list(FONTES),
+                        help='Onde buscar (padrão: todas)')
+    parser.add_argument('--ano', type=int, help='Filtra por ano')
+    parser.add_argument('--categoria', help='Filtra por categoria (só PLs e MPs)')
+    parser.add_argument('--limite', type=int, default=20, help='Quantidade de resultados (padrão: 20)')
+    parser.add_argument('--expressao', action='store_true', help='Usa o texto como consulta FTS5')
+    parser.add_argument('--reconstruir', action='store_true', help='Reconstrói os índices a partir das tabelas')
+
+    args = parser.parse_args()
+    conn = get_connection()
+
+    if args.reconstruir:
+        reconstruir_indices(conn)
+
+    if args.texto:
+        for resultado in buscar(conn, args.texto, args.fontes, args.ano, args.categoria,
+                                args.limite, args.expressao):
+            print(f"   {resultado['fonte']:<9} {resultado['titulo'] or '':<18} "
+                  f"{resultado['ano'] or '':<5} {resultado['trecho']}")
+
+    conn.close()
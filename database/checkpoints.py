@@ -0,0 +1,96 @@
+"""
+Checkpoints da Coleta Histórica
+Registra as unidades de trabalho já concluídas (deputado, página ou
+partição) no mesmo lote dos dados, para que uma coleta interrompida
+recomece de onde parou
+"""
+import logging
+import sys
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import get_connection
+
+logger = logging.getLogger(__name__)
+
+SQL_MARCAR = """
+    INSERT INTO checkpoints_coleta (entidade, ano, mes, unidade, total_registros, concluido_em)
+    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT (entidade, ano, mes, unidade) DO UPDATE SET
+        total_registros = excluded.total_registros,
+        concluido_em = excluded.concluido_em
+"""
+
+
+class Checkpoints:
+    """
+    Unidades concluídas de uma entidade ('gastos', 'pls', 'votacoes', 'mps').
+
+    Uma unidade é (ano, mes, unidade): mes 0 vale para o ano inteiro e
+    unidade '' para a partição inteira. As já concluídas são lidas uma vez
+    na criação; marcar() entra no lote do escritor junto com os dados da
+    unidade, então o flush grava os dois na mesma transação e uma
+    interrupção perde no máximo a unidade em andamento.
+
+    Com ativo=False (coletas de teste, com limites) nada é pulado nem
+    registrado: uma amostra não pode marcar a unidade como completa.
+
+    Uso:
+        checkpoints = Checkpoints('gastos')
+        if not checkpoints.concluido(ano, mes, deputado_id):
+            ...
+            checkpoints.marcar(escritor, ano, mes, deputado_id, total)
+            escritor.flush()
+    """
+
+    def __init__(self, entidade, ativo=True, conn=None):
+        self.entidade = entidade
+        self.ativo = ativo
+        self.concluidos = set()
+        self.pulados = 0
+
+        if ativo:
+            fechar = conn is None
+            conn = conn or get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT ano, mes, unidade FROM checkpoints_coleta WHERE entidade = ?", (entidade,)
+            )
+            self.concluidos = {tuple(row) for row in cursor.fetchall()}
+            if fechar:
+                conn.close()
+
+            if self.concluidos:
+                logger.info(f"⏩ {entidade}: {len(self.concluidos)} unidades já concluídas serão puladas")
+
+    def concluido(self, ano, mes=0, unidade=''):
+        """True se a unidade já foi concluída (conta como pulada)"""
+        if (ano, mes, str(unidade)) in self.concluidos:
+            self.pulados += 1
+            return True
+        return False
+
+    def marcar(self, escritor, ano, mes=0, unidade='', total_registros=0):
+        """Enfileira a marca de conclusão no lote do escritor (antes do flush)"""
+        if not self.ativo:
+            return
+        escritor.adicionar(SQL_MARCAR, (self.entidade, ano, mes, str(unidade), total_registros))
+        self.concluidos.add((ano, mes, str(unidade)))
+
+
+def reiniciar(entidades=None, conn=None):
+    """Apaga os checkpoints (de todas as entidades ou só das informadas)"""
+    fechar = conn is None
+    conn = conn or get_connection()
+
+    if entidades is None:
+        conn.execute("DELETE FROM checkpoints_coleta")
+    else:
+        conn.executemany("DELETE FROM checkpoints_coleta WHERE entidade = ?", [(e,) for e in entidades])
+    conn.commit()
+    logger.info(f"🔁 Checkpoints apagados: {', '.join(entidades) if entidades else 'todas as entidades'}")
+
+    if fechar:
+        conn.close()
@@ -0,0 +1,236 @@
+"""
+Coleta Distribuída
+Divide a coleta histórica em shards (faixas de deputados por mês, meses de
+PLs e votações, anos de MPs) registrados em work_leases e os processa em
+quantos processos forem iniciados, sem trabalho duplicado
+"""
+import calendar
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import leases
+from database.api_camara import definir_fluxo, fluxo_atual, requisicoes_por_fluxo
+from database.checkpoints import Checkpoints
+from database.coletor_historico_gastos import (
+    MESES_EM_ABERTO, buscar_todos_deputados, coletar_gastos_mes, salvar_deputado
+)
+from database.coletor_historico_mps import coletar_mps_ano
+from database.coletor_historico_pls import buscar_pls_particao, enriquecer_pls, particoes_pls, salvar_pl
+from database.coletor_historico_votacoes import coletar_votacoes_mes, meses_votacoes
+from database.escrita import EscritorLotes
+from src.config import CAMARA_ENRIQUECIMENTO_PARALELO
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ENTIDADES = ('gastos', 'pls', 'votacoes', 'mps')
+
+# Deputados por shard de gastos (um mês de uma faixa de ids)
+DEPUTADOS_POR_SHARD = 50
+
+
+def shards_gastos(anos, deputados):
+    """Shards 'AAAA-MM:id_inicial-id_final' com faixas contíguas de ids de deputados"""
+    hoje = datetime.now()
+    ids = sorted(deputado['id'] for deputado in deputados)
+    faixas = [ids[i:i + DEPUTADOS_POR_SHARD] for i in range(0, len(ids), DEPUTADOS_POR_SHARD)]
+
+    for ano, mes in particoes_pls(anos):
+        aberto = (hoje.year * 12 + hoje.month) - (ano * 12 + mes) <= MESES_EM_ABERTO
+        for faixa in faixas:
+            yield f"{ano}-{mes:02d}:{faixa[0]}-{faixa[-1]}", aberto
+
+
+def registrar_shards(conn, entidades, anos):
+    """
+    Registra os shards das entidades nos últimos N anos.
+
+    Para gastos, a lista de deputados é buscada e gravada aqui: os workers
+    leem as faixas de ids da tabela deputados.
+
+    Returns:
+        dict: Shards novos (ou recolocados na fila) por entidade
+    """
+    hoje = datetime.now()
+    mes_corrente = (hoje.year, hoje.month)
+    registrados = {}
+
+    for entidade in entidades:
+        if entidade == 'gastos':
+            deputados = buscar_todos_deputados()
+            with EscritorLotes(conn=conn) as escritor:
+                for deputado in deputados:
+                    salvar_deputado(escritor, deputado)
+            shards = shards_gastos(anos, deputados)
+        elif entidade == 'pls':
+            shards = ((f"{ano}-{mes:02d}", (ano, mes) >= mes_corrente) for ano, mes in particoes_pls(anos))
+        elif entidade == 'votacoes':
+            shards = ((f"{ano}-{mes:02d}", (ano, mes) >= mes_corrente)
+                      for ano, mes, _, _ in meses_votacoes(anos))
+        else:
+            shards = ((f"{ano}", ano >= hoje.year) for ano in range(hoje.year - anos, hoje.year + 1))
+
+        registrados[entidade] = leases.registrar(conn, entidade, list(shards))
+        logger.info(f"🧩 {entidade}: {registrados[entidade]} shards na fila")
+
+    return registrados
+
+
+def processar_shard(escritor, executor, checkpoints, entidade, shard):
+    """
+    Coleta um shard com as mesmas funções dos coletores históricos.
+
+    Os checkpoints da entidade continuam valendo: um shard refeito (worker
+    caído) pula as unidades que já tinham sido gravadas.
+
+    Returns:
+        tuple: (registros gravados, True se o shard foi coletado sem falhas)
+    """
+    if entidade == 'gastos':
+        periodo, faixa = shard.split(':')
+        ano, mes = map(int, periodo.split('-'))
+        inicio, fim = map(int, faixa.split('-'))
+        cursor = escritor.conn.execute(
+            "SELECT id FROM deputados WHERE id BETWEEN ? AND ? ORDER BY id", (inicio, fim)
+        )
+        pendentes = [{'id': row[0]} for row in cursor.fetchall()
+                     if not checkpoints.concluido(ano, mes, row[0])]
+        gravados, erros = coletar_gastos_mes(escritor, checkpoints, ano, mes, pendentes)
+        return gravados, erros == 0
+
+    if entidade == 'pls':
+        ano, mes = map(int, shard.split('-'))
+        pls = buscar_pls_particao(ano, mes)
+        completos, falhas = enriquecer_pls(pls, executor)
+        gravados = sum(salvar_pl(escritor, pl) for pl in completos)
+        if falhas:
+            return gravados, False
+        if (ano, mes) < (datetime.now().year, datetime.now().month):
+            checkpoints.marcar(escritor, ano, mes, total_registros=gravados)
+        return gravados, True
+
+    if entidade == 'votacoes':
+        ano, mes = map(int, shard.split('-'))
+        inicio = datetime(ano, mes, 1)
+        fim = min(datetime(ano, mes, calendar.monthrange(ano, mes)[1]), datetime.now())
+        return coletar_votacoes_mes(escritor, executor, checkpoints, ano, mes, inicio, fim)
+
+    return coletar_mps_ano(escritor, checkpoints, int(shard))
+
+
+def trabalhar(entidades=ENTIDADES, duracao=leases.DURACAO_PADRAO, paralelo=CAMARA_ENRIQUECIMENTO_PARALELO,
+              worker=None):
+    """
+    Laço de um worker: reivindica, processa e conclui shards até a fila esvaziar.
+
+    Enquanto outros workers ainda detêm leases, espera em vez de sair: se
+    algum deles cair, o lease vence e este worker refaz o shard.
+
+    Returns:
+        dict: Shards processados, com falha e registros gravados
+    """
+    worker = worker or leases.identificador_worker()
+    escritor = EscritorLotes()
+    checkpoints = {}
+    estatisticas = {'shards': 0, 'falhas': 0, 'registros': 0}
+    requisicoes_antes = sum(requisicoes_por_fluxo.values())
+    inicio = time.time()
+
+    logger.info(f"👷 Worker {worker}: {', '.join(entidades)} (lease de {duracao}s)")
+
+    with ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='shard-enriquecimento',
+                            initializer=definir_fluxo, initargs=(fluxo_atual(),)) as executor:
+        while True:
+            lease = leases.reivindicar(escritor.conn, worker, entidades, duracao)
+            if lease is None:
+                if leases.em_andamento(escritor.conn, entidades):
+                    time.sleep(duracao / 3)
+                    continue
+                break
+
+            entidade, shard, tentativas = lease
+            inicio_shard = time.time()
+
+            # Qualquer falha (API, banco, dado inesperado) devolve o shard em vez de
+            # derrubar o worker segurando o lease até ele vencer
+            batimento = None
+            try:
+                # Um shard retomado de outro worker pode ter unidades gravadas depois da última leitura
+                if entidade not in checkpoints or tentativas > 1:
+                    checkpoints[entidade] = Checkpoints(entidade, conn=escritor.conn)
+
+                with leases.Batimento(entidade, shard, worker, duracao) as batimento:
+                    registros, completo = processar_shard(escritor, executor, checkpoints[entidade],
+                                                          entidade, shard)
+                erro = None if completo else 'shard incompleto (falhas na API)'
+            except requests.RequestException as e:
+                registros, completo, erro = 0, False, str(e)
+            except Exception as e:
+                logger.exception(f"❌ Erro inesperado no shard {entidade} {shard}: {e}")
+                registros, completo, erro = 0, False, f"{type(e).__name__}: {e}"
+
+            if batimento is not None and batimento.perdido.is_set():
+                # Outro worker reivindicou o shard: grava o que veio, mas não conclui nem libera
+                escritor.flush()
+                estatisticas['falhas'] += 1
+                logger.warning(f"   ⚠️  {entidade} {shard}: lease perdido, conclusão fica com o outro worker")
+            elif completo:
+                # Últimos dados do shard e a conclusão na mesma transação
+                leases.concluir(escritor, entidade, shard, worker, registros)
+                escritor.flush()
+                logger.info(f"   ✅ {entidade} {shard}: {registros} registros em {time.time() - inicio_shard:.1f}s")
+            else:
+                escritor.flush()
+                leases.liberar(escritor.conn, entidade, shard, worker, erro)
+                estatisticas['falhas'] += 1
+                logger.error(f"   ❌ {entidade} {shard}: {erro}")
+
+            estatisticas['shards'] += 1
+            estatisticas['registros'] += registros
+
+    escritor.close()
+    logger.info(f"🏁 Worker {worker}: {estatisticas['shards']} shards ({estatisticas['falhas']} com falha), "
+                f"{estatisticas['registros']} registros, "
+                f"{sum(requisicoes_por_fluxo.values()) - requisicoes_antes} requisições "
+                f"em {time.time() - inicio:.1f}s")
+    return estatisticas
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from database.init_db import get_connection
+
+    parser = argparse.ArgumentParser(
+        description='Coleta histórica distribuída: rode --registrar uma vez e inicie quantos workers quiser'
+    )
+    parser.add_argument('--registrar', action='store_true', help='Registra os shards em work_leases e sai')
+    parser.add_argument('--status', action='store_true', help='Mostra os shards por entidade e situação')
+    parser.add_argument('--entidades', nargs='+', choices=ENTIDADES, default=list(ENTIDADES),
+                        help='Entidades a registrar/processar (padrão: todas)')
+    parser.add_argument('--anos', type=int, default=5, help='Anos de histórico ao registrar (padrão: 5)')
+    parser.add_argument('--duracao', type=int, default=leases.DURACAO_PADRAO,
+                        help=f'Prazo do lease em segundos (padrão: {leases.DURACAO_PADRAO})')
+    parser.add_argument('--paralelo', type=int, default=CAMARA_ENRIQUECIMENTO_PARALELO,
+                        help=f'Requisições simultâneas no enriquecimento (padrão: {CAMARA_ENRIQUECIMENTO_PARALELO})')
+
+    args = parser.parse_args()
+
+    if args.registrar or args.status:
+        conn = get_connection()
+        if args.registrar:
+            registrar_shards(conn, args.entidades, args.anos)
+        for entidade, contagem in leases.resumo(conn).items():
+            print(f"   • {entidade}: " + ', '.join(f"{status} {n}" for status, n in contagem.items()))
+        conn.close()
+    else:
+        trabalhar(args.entidades, args.duracao, args.paralelo)
@@ -1,19 +1,25 @@
 """
 Script Mestre - Coleta Histórica Completa
-Executa todos os coletores históricos em sequência
+Executa todos os coletores históricos em paralelo, sob um orçamento de
+requisições compartilhado
 """
 import logging
+import threading
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 
 # Adicionar diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from database.init_db import get_connection, get_statistics, DATABASE_FILE
-from database.coletor_historico_gastos import coletar_gastos_historico
-from database.coletor_historico_pls import coletar_pls_historico
+from database.init_db import get_connection, get_statistics, carga_em_massa, DATABASE_FILE
+from database.api_camara import LIMITADOR, requisicoes_por_fluxo
+from database.escrita import EscritorDedicado
+from database.filas import mostrar_metricas, reiniciar_metricas
+from database.coletor_historico_gastos import coletar_gastos_historicos
+from database.coletor_historico_pls import coletar_pls_historicos
 from database.coletor_historico_votacoes import coletar_votacoes_historico
 from database.coletor_historico_mps import coletar_mps_historico
 
@@ -30,16 +36,6 @@ def mostrar_banner():
     print("="*70 + "\n")
 
 
-def mostrar_progresso(etapa, total_etapas, descricao):
-    """Mostra progresso visual"""
-    progresso = int((etapa / total_etapas) * 50)
-    barra = "█" * progresso + "░" * (50 - progresso)
-    percentual = (etapa / total_etapas) * 100
-    
-    print(f"\n[{barra}] {percentual:.1f}%")
-    print(f"Etapa {etapa}/{total_etapas}: {descricao}\n")
-
-
 def mostrar_estatisticas_finais():
     """Mostra estatísticas finais do banco"""
     print("\n" + "="*70)
@@ -69,13 +65,141 @@ def mostrar_estatisticas_finais():
     print("\n" + "="*70 + "\n")
 
 
-def main(modo_teste=False, anos=5):
+def definir_fluxos(modo_teste, anos):
+    """
+    Fluxos de coleta: endpoints e tabelas diferentes, então rodam em paralelo.
+
+    Returns:
+        list: Tuplas (chave, descrição, função do coletor, argumentos)
+    """
+    if modo_teste:
+        return [
+            ('gastos', 'Gastos Parlamentares', coletar_gastos_historicos, {'anos': 1, 'limite_deputados': 5}),
+            ('pls', 'Projetos de Lei', coletar_pls_historicos, {'anos': 1, 'limite_por_particao': 2}),
+            ('votacoes', 'Votações', coletar_votacoes_historico,
+             {'anos_historico': 1, 'teste_modo': True, 'max_votes_teste': 30}),
+            ('mps', 'Medidas Provisórias', coletar_mps_historico,
+             {'anos_historico': 1, 'teste_modo': True, 'max_mps_teste': 20}),
+        ]
+
+    return [
+        ('gastos', 'Gastos Parlamentares', coletar_gastos_historicos, {'anos': anos}),
+        ('pls', 'Projetos de Lei', coletar_pls_historicos, {'anos': anos}),
+        ('votacoes', 'Votações', coletar_votacoes_historico, {'anos_historico': anos}),
+        ('mps', 'Medidas Provisórias', coletar_mps_historico, {'anos_historico': anos}),
+    ]
+
+
+def executar_fluxo(chave, funcao, argumentos, estados, interromper):
+    """Roda um coletor isolado: uma falha marca só este fluxo como ❌"""
+    # O nome da thread identifica o fluxo nos logs e na contagem de requisições
+    threading.current_thread().name = chave
+    estado = estados[chave]
+    estado.update(status='executando', inicio=time.time())
+    
+    try:
+        funcao(**argumentos, parar=interromper)
+        estado['status'] = '⏹️' if interromper.is_set() else '✅'
+    except Exception as e:
+        logger.exception(f"❌ Erro no fluxo {chave}: {e}")
+        estado.update(status='❌', erro=str(e))
+    finally:
+        estado['fim'] = time.time()
+
+
+def mostrar_progresso(estados, escritor=None):
+    """
+    Uma linha de status por fluxo (situação, duração, requisições), a fila
+    de escrita e, por etapa, a profundidade da fila e o tempo parado
+    """
+    agora = time.time()
+    for chave, estado in estados.items():
+        duracao = (estado['fim'] or agora) - (estado['inicio'] or agora)
+        logger.info(f"   📡 {chave:<9} {estado['status']:<10} "
+                    f"{int(duracao // 60)}m{int(duracao % 60):02d}s  "
+                    f"{requisicoes_por_fluxo[chave]} requisições")
+    if escritor is not None:
+        logger.info(f"   💾 escritor: {escritor.profundidade} lotes na fila, "
+                    f"{escritor.linhas_gravadas} linhas em {escritor.commits} commits")
+    mostrar_metricas()
+
+
+def monitorar_progresso(estados, escritor, parar, intervalo):
+    """Mostra o progresso dos fluxos a cada `intervalo` segundos até `parar` ser sinalizado"""
+    while not parar.wait(intervalo):
+        mostrar_progresso(estados, escritor)
+
+
+def executar_etapas(modo_teste, anos, intervalo_progresso=60):
+    """
+    Executa os quatro coletores em paralelo sob o orçamento de requisições
+    compartilhado (database/api_camara.py) e retorna o resultado de cada um.
+
+    Os coletores só buscam e montam lotes; todas as gravações passam por
+    um único EscritorDedicado, então não há disputa pelo lock do SQLite.
+    
+    Com Ctrl+C, os fluxos são avisados por um evento e param na próxima
+    unidade; o escritor grava o que já recebeu e a interrupção é propagada
+    só depois que todas as threads terminaram.
+    """
+    fluxos = definir_fluxos(modo_teste, anos)
+    estados = {
+        chave: {'descricao': descricao, 'status': 'aguardando', 'inicio': None, 'fim': None, 'erro': None}
+        for chave, descricao, _, _ in fluxos
+    }
+    
+    logger.info(f"🚦 Orçamento compartilhado: {LIMITADOR.taxa:g} requisições/s para {len(fluxos)} fluxos")
+    
+    # Um banco em schema antigo é migrado aqui, uma vez, antes das threads
+    get_connection().close()
+    
+    # O progresso mostra só as filas desta execução
+    reiniciar_metricas()
+    
+    parar = threading.Event()
+    interromper = threading.Event()
+    
+    # O escritor é fechado (gravando o que já recebeu) também numa interrupção
+    with EscritorDedicado() as escritor:
+        threading.Thread(
+            target=monitorar_progresso, args=(estados, escritor, parar, intervalo_progresso),
+            name='progresso', daemon=True
+        ).start()
+        
+        executor = ThreadPoolExecutor(max_workers=len(fluxos))
+        try:
+            futuros = [
+                executor.submit(executar_fluxo, chave, funcao, {**argumentos, 'destino': escritor},
+                                estados, interromper)
+                for chave, _, funcao, argumentos in fluxos
+            ]
+            wait(futuros)
+        except KeyboardInterrupt:
+            logger.warning("⏹️ Interrompendo: os fluxos param ao fim da unidade em andamento...")
+            interromper.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            parar.set()
+    
+    mostrar_progresso(estados, escritor)
+    
+    return estados
+
+
+# Tabelas carregadas pelos coletores (índices adiados na carga em massa)
+TABELAS_CARGA = ['deputados', 'gastos', 'projetos_lei', 'votacoes', 'votos_deputados', 'medidas_provisorias']
+
+
+def main(modo_teste=False, anos=5, modo_carga_em_massa=False):
     """
     Executa coleta histórica completa
     
     Args:
         modo_teste (bool): Se True, coleta apenas uma amostra pequena
         anos (int): Número de anos para coletar
+        modo_carga_em_massa (bool): Adia os índices secundários até o fim da carga
     """
     inicio = time.time()
     
@@ -87,68 +211,18 @@ def main(modo_teste=False, anos=5):
         logger.warning("    Para coleta completa, rode sem o parâmetro --teste")
         print()
     
-    logger.info(f"📋 Plano de Coleta ({anos} anos):")
-    logger.info("   1. Gastos Parlamentares")
-    logger.info("   2. Projetos de Lei")
-    logger.info("   3. Votações")
-    logger.info("   4. Medidas Provisórias")
+    logger.info(f"📋 Plano de Coleta ({anos} anos, em paralelo):")
+    logger.info("   • Gastos Parlamentares")
+    logger.info("   • Projetos de Lei")
+    logger.info("   • Votações")
+    logger.info("   • Medidas Provisórias")
     logger.info("")
     
-    if not modo_teste:
-        logger.info("⏱️  Tempo estimado: 2-4 horas")
-        logger.info("")
-        input("Pressione ENTER para iniciar a coleta...")
-        print()
-    
-    resultados = {}
-    
-    # Etapa 1: Gastos
-    mostrar_progresso(1, 4, "Coletando gastos parlamentares")
-    try:
-        if modo_teste:
-            coletar_gastos_historico(anos_historico=1, teste_modo=True, max_deputies_teste=5)
-        else:
-            coletar_gastos_historico(anos_historico=anos)
-        resultados['gastos'] = '✅'
-    except Exception as e:
-        logger.error(f"❌ Erro na coleta de gastos: {e}")
-        resultados['gastos'] = '❌'
-    
-    # Etapa 2: PLs
-    mostrar_progresso(2, 4, "Coletando Projetos de Lei")
-    try:
-        if modo_teste:
-            coletar_pls_historico(anos_historico=1, teste_modo=True, max_pls_teste=20)
-        else:
-            coletar_pls_historico(anos_historico=anos)
-        resultados['pls'] = '✅'
-    except Exception as e:
-        logger.error(f"❌ Erro na coleta de PLs: {e}")
-        resultados['pls'] = '❌'
-    
-    # Etapa 3: Votações
-    mostrar_progresso(3, 4, "Coletando Votações")
-    try:
-        if modo_teste:
-            coletar_votacoes_historico(anos_historico=1, teste_modo=True, max_votes_teste=30)
-        else:
-            coletar_votacoes_historico(anos_historico=anos)
-        resultados['votacoes'] = '✅'
-    except Exception as e:
-        logger.error(f"❌ Erro na coleta de votações: {e}")
-        resultados['votacoes'] = '❌'
-    
-    # Etapa 4: MPs
-    mostrar_progresso(4, 4, "Coletando Medidas Provisórias")
-    try:
-        if modo_teste:
-            coletar_mps_historico(anos_historico=1, teste_modo=True, max_mps_teste=20)
-        else:
-            coletar_mps_historico(anos_historico=anos)
-        resultados['mps'] = '✅'
-    except Exception as e:
-        logger.error(f"❌ Erro na coleta de MPs: {e}")
-        resultados['mps'] = '❌'
+    if modo_carga_em_massa:
+        with carga_em_massa(TABELAS_CARGA):
+            estados = executar_etapas(modo_teste, anos)
+    else:
+        estados = executar_etapas(modo_teste, anos)
     
     # Estatísticas finais
     tempo_total = time.time() - inicio
@@ -165,10 +239,11 @@ def main(modo_teste=False, anos=5):
     print(f"\n⏱️  Tempo total: {horas}h {minutos}m {segundos}s\n")
     
     print("📊 Resultados:")
-    print(f"   {resultados.get('gastos', '❓')} Gastos Parlamentares")
-    print(f"   {resultados.get('pls', '❓')} Projetos de Lei")
-    print(f"   {resultados.get('votacoes', '❓')} Votações")
-    print(f"   {resultados.get('mps', '❓')} Medidas Provisórias")
+    for chave, estado in estados.items():
+        duracao = (estado['fim'] or time.time()) - (estado['inicio'] or time.time())
+        print(f"   {estado['status']} {estado['descricao']} ({int(duracao // 60)}m {int(duracao % 60)}s)")
+        if estado['erro']:
+            print(f"      ↳ {estado['erro']}")
     print()
     
     mostrar_estatisticas_finais()
@@ -186,17 +261,29 @@ def main(modo_teste=False, anos=5):
 if __name__ == '__main__':
     import argparse
     
+    # Os fluxos rodam em threads nomeadas: o nome identifica cada linha de log
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s',
+                        force=True)
+    
     parser = argparse.ArgumentParser(description='Coletar dados históricos completos')
     parser.add_argument('--teste', action='store_true', help='Modo teste: coleta apenas amostra')
     parser.add_argument('--anos', type=int, default=5, help='Número de anos para coletar (padrão: 5)')
+    parser.add_argument('--carga-em-massa', action='store_true',
+                        help='Adia os índices secundários e os recria ao final (backfill inicial)')
+    parser.add_argument('--reiniciar', action='store_true',
+                        help='Apaga os checkpoints e recoleta tudo em vez de retomar')
     
     args = parser.parse_args()
     
+    if args.reiniciar:
+        from database.checkpoints import reiniciar
+        reiniciar()
+    
     try:
-        main(modo_teste=args.teste, anos=args.anos)
+        main(modo_teste=args.teste, anos=args.anos, modo_carga_em_massa=args.carga_em_massa)
     except KeyboardInterrupt:
         print("\n\n⚠️  Coleta interrompida pelo usuário")
-        print("   O progresso foi salvo e você pode retomar depois")
+        print("   As unidades concluídas estão nos checkpoints: rode o mesmo comando para retomar")
     except Exception as e:
         logger.error(f"❌ Erro na coleta: {e}")
         import traceback
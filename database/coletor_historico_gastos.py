@@ -14,17 +14,23 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database.init_db import get_connection, DATABASE_FILE
+from database.api_camara import BASE_URL, api_get, paginar
+from database.checkpoints import Checkpoints
+from database.fornecedores import obter_fornecedor_id
+from database.dimensoes import TIPOS_DESPESA, PARTIDOS
+from database.escrita import EscritorLotes
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
-HEADERS = {"Accept": "application/json"}
-
 # Configuração
 ANOS_HISTORICO = 5
 DATA_INICIO = datetime.now() - timedelta(days=365 * ANOS_HISTORICO)
 
+# Despesas podem ser apresentadas até 3 meses depois: esses meses nunca
+# são marcados como concluídos e são recoletados a cada execução
+MESES_EM_ABERTO = 3
+
 
 def buscar_todos_deputados():
     """Busca lista completa de deputados"""
@@ -34,7 +40,7 @@ def buscar_todos_deputados():
         url = f"{BASE_URL}/deputados"
         params = {'itens': 600, 'ordem': 'ASC', 'ordenarPor': 'nome'}
         
-        response = requests.get(url, headers=HEADERS, params=params, timeout=15)
+        response = api_get(url, params, timeout=15)
         response.raise_for_status()
         data = response.json()
         
@@ -48,116 +54,250 @@ def buscar_todos_deputados():
         return []
 
 
-def salvar_deputado(conn, deputado):
-    """Salva ou atualiza informações de um deputado"""
-    cursor = conn.cursor()
+def preparar_deputado(conn, deputado):
+    """Monta a linha de deputados, resolvendo o partido na conexão de escrita"""
+    return (
+        deputado['id'],
+        deputado['nome'],
+        deputado.get('siglaPartido', ''),
+        PARTIDOS.obter_id(conn, deputado.get('siglaPartido', '')),
+        deputado.get('siglaUf', ''),
+        deputado.get('email', ''),
+        deputado.get('idLegislaturaUltimaEleicao', 0)
+    )
+
+
+def salvar_deputado(escritor, deputado):
+    """Enfileira a gravação (ou atualização) de um deputado"""
+    escritor.adicionar("""
+        INSERT OR REPLACE INTO deputados 
+        (id, nome, partido, partido_id, uf, email, legislatura_atual)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, deputado, preparar=preparar_deputado)
     
-    try:
-        cursor.execute("""
-            INSERT OR REPLACE INTO deputados 
-            (id, nome, partido, uf, email, legislatura_atual)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            deputado['id'],
-            deputado['nome'],
-            deputado.get('siglaPartido', ''),
-            deputado.get('siglaUf', ''),
-            deputado.get('email', ''),
-            deputado.get('idLegislaturaUltimaEleicao', 0)
-        ))
-        
-        conn.commit()
-        return True
-        
-    except Exception as e:
-        logger.error(f"Erro ao salvar deputado {deputado['id']}: {e}")
-        return False
+    return True
 
 
 def buscar_gastos_deputado(deputado_id, ano, mes):
-    """Busca gastos de um deputado em um ano/mês específico"""
+    """
+    Busca gastos de um deputado em um ano/mês específico (todas as páginas)
+
+    Returns:
+        list: Gastos do mês, ou None se a busca falhou (o deputado não é
+        marcado como concluído e volta na próxima execução)
+    """
     try:
         url = f"{BASE_URL}/deputados/{deputado_id}/despesas"
         params = {'ano': ano, 'mes': mes, 'itens': 100, 'ordem': 'ASC'}
         
-        response = requests.get(url, headers=HEADERS, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        return data.get('dados', [])
+        return list(paginar(url, params, timeout=15))
         
     except Exception as e:
-        logger.debug(f"Erro ao buscar gastos do deputado {deputado_id} em {ano}/{mes}: {e}")
-        return []
+        logger.error(f"❌ Erro ao buscar gastos do deputado {deputado_id} em {ano}/{mes}: {e}")
+        return None
 
 
-def salvar_gasto(conn, deputado_id, gasto):
-    """Salva um gasto no banco"""
-    cursor = conn.cursor()
+# Recoletar um documento atualiza a linha existente em vez de duplicá-la;
+# o WHERE evita UPDATEs (e os triggers de totais) quando nada mudou
+SQL_UPSERT_GASTO = """
+    INSERT INTO gastos 
+    (deputado_id, ano, mes, tipo_despesa_id, valor_documento, valor_liquido,
+     fornecedor_id, cod_documento, numero_documento, data_documento, parcela, url_documento)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (deputado_id, cod_documento, numero_documento, data_documento,
+                 valor_documento, fornecedor_id, parcela)
+    DO UPDATE SET
+        ano = excluded.ano,
+        mes = excluded.mes,
+        tipo_despesa_id = excluded.tipo_despesa_id,
+        valor_liquido = excluded.valor_liquido,
+        url_documento = excluded.url_documento
+    WHERE gastos.valor_liquido IS NOT excluded.valor_liquido
+       OR gastos.tipo_despesa_id IS NOT excluded.tipo_despesa_id
+       OR gastos.ano IS NOT excluded.ano
+       OR gastos.mes IS NOT excluded.mes
+       OR gastos.url_documento IS NOT excluded.url_documento
+"""
+
+
+def preparar_gasto(conn, registro):
+    """
+    Monta a linha de gastos a partir de (deputado_id, gasto da API).
+
+    Roda na conexão que grava o lote: os textos repetidos viram códigos
+    inteiros ali (com cache por processo), sem uma ida e volta por linha.
+    """
+    deputado_id, gasto = registro
     
-    try:
-        cursor.execute("""
-            INSERT OR IGNORE INTO gastos 
-            (deputado_id, ano, mes, tipo_despesa, valor_documento, valor_liquido,
-             fornecedor, cnpj_fornecedor, numero_documento, data_documento, url_documento)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            deputado_id,
-            gasto['ano'],
-            gasto['mes'],
-            gasto['tipoDespesa'],
-            gasto.get('valorDocumento', 0),
-            gasto.get('valorLiquido', 0),
-            gasto.get('nomeFornecedor', ''),
-            gasto.get('cnpjCpfFornecedor', ''),
-            gasto.get('numeroDocumento', ''),
-            gasto.get('dataDocumento', ''),
-            gasto.get('urlDocumento', '')
-        ))
-        
-        return True
-        
-    except Exception as e:
-        logger.debug(f"Erro ao salvar gasto: {e}")
-        return False
+    return (
+        deputado_id,
+        gasto['ano'],
+        gasto['mes'],
+        TIPOS_DESPESA.obter_id(conn, gasto['tipoDespesa']),
+        gasto.get('valorDocumento') or 0,
+        gasto.get('valorLiquido') or 0,
+        obter_fornecedor_id(conn, gasto.get('cnpjCpfFornecedor', ''), gasto.get('nomeFornecedor', '')),
+        gasto.get('codDocumento') or 0,
+        gasto.get('numeroDocumento') or '',
+        gasto.get('dataDocumento') or '',
+        gasto.get('parcela') or 0,
+        gasto.get('urlDocumento') or ''
+    )
+
+
+def salvar_gasto(escritor, deputado_id, gasto):
+    """
+    Enfileira um gasto no lote do escritor.
+
+    A gravação (e uma eventual falha) só acontece no flush: quantas linhas
+    foram de fato gravadas fica nos contadores do escritor.
+    """
+    escritor.adicionar(SQL_UPSERT_GASTO, (deputado_id, gasto), preparar=preparar_gasto)
+
+
+def compactar_gastos(conn=None, vacuum=True):
+    """
+    Remove gastos duplicados por coletas repetidas (execução única).
 
+    Mantém a linha mais recente de cada chave natural, cria o índice único
+    que passa a impedir novas duplicatas e, opcionalmente, roda VACUUM para
+    devolver o espaço ao disco. Os triggers de gastos ajustam os totais de
+    fornecedores e da cota a cada linha removida.
 
-def registrar_coleta(conn, tipo, ano, mes, status, total_registros=0, erro=None):
-    """Registra progresso da coleta"""
+    Returns:
+        int: Quantidade de linhas removidas
+    """
+    fechar = conn is None
+    conn = conn or get_connection()
     cursor = conn.cursor()
     
-    try:
-        if status == 'in_progress':
-            cursor.execute("""
-                INSERT INTO coleta_historica (tipo, ano, mes, status, started_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (tipo, ano, mes, status))
-        elif status == 'completed':
-            cursor.execute("""
-                UPDATE coleta_historica 
-                SET status = ?, total_registros = ?, completed_at = CURRENT_TIMESTAMP
-                WHERE tipo = ? AND ano = ? AND mes = ? AND status = 'in_progress'
-            """, (status, total_registros, tipo, ano, mes))
-        elif status == 'error':
-            cursor.execute("""
-                UPDATE coleta_historica 
-                SET status = ?, erro = ?, completed_at = CURRENT_TIMESTAMP
-                WHERE tipo = ? AND ano = ? AND mes = ? AND status = 'in_progress'
-            """, (status, erro, tipo, ano, mes))
+    logger.info("🧹 Compactando gastos duplicados...")
+    # Arquivo da própria conexão (as migrações passam a conexão do banco sendo migrado)
+    arquivo = Path(cursor.execute("PRAGMA database_list").fetchone()[2])
+    tamanho_antes = arquivo.stat().st_size
+    
+    # Bancos anteriores à chave natural: colunas novas e textos nulos
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(gastos)")}
+    for coluna in ('cod_documento', 'parcela'):
+        if coluna not in colunas:
+            cursor.execute(f"ALTER TABLE gastos ADD COLUMN {coluna} INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("""
+        UPDATE gastos
+        SET numero_documento = IFNULL(numero_documento, ''),
+            data_documento = IFNULL(data_documento, '')
+        WHERE numero_documento IS NULL OR data_documento IS NULL
+    """)
+    
+    cursor.execute("""
+        DELETE FROM gastos
+        WHERE id NOT IN (
+            SELECT MAX(id)
+            FROM gastos
+            GROUP BY deputado_id, cod_documento, numero_documento, data_documento,
+                     valor_documento, fornecedor_id, parcela
+        )
+    """)
+    removidos = cursor.rowcount
+    
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_gastos_chave_natural ON gastos(
+            deputado_id, cod_documento, numero_documento, data_documento,
+            valor_documento, fornecedor_id, parcela
+        )
+    """)
+    cursor.execute("DROP INDEX IF EXISTS idx_gastos_deputado")
+    conn.commit()
+    
+    if vacuum:
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    tamanho_depois = arquivo.stat().st_size
+    logger.info(f"   ✅ {removidos} duplicatas removidas "
+                f"({tamanho_antes / 1024 / 1024:.2f} MB → {tamanho_depois / 1024 / 1024:.2f} MB)")
+    
+    if fechar:
+        conn.close()
+    
+    return removidos
+
+
+def registrar_coleta(escritor, tipo, ano, mes, status, total_registros=0, erro=None):
+    """Registra progresso da coleta (pela mesma fila de escrita dos dados)"""
+    if status == 'in_progress':
+        escritor.adicionar("""
+            INSERT INTO coleta_historica (tipo, ano, mes, status, started_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (tipo, ano, mes, status))
+    elif status == 'completed':
+        escritor.adicionar("""
+            UPDATE coleta_historica 
+            SET status = ?, total_registros = ?, completed_at = CURRENT_TIMESTAMP
+            WHERE tipo = ? AND ano = ? AND mes = ? AND status = 'in_progress'
+        """, (status, total_registros, tipo, ano, mes))
+    elif status == 'error':
+        escritor.adicionar("""
+            UPDATE coleta_historica 
+            SET status = ?, erro = ?, completed_at = CURRENT_TIMESTAMP
+            WHERE tipo = ? AND ano = ? AND mes = ? AND status = 'in_progress'
+        """, (status, erro, tipo, ano, mes))
+    
+    escritor.flush()
+
+
+def coletar_gastos_mes(escritor, checkpoints, ano, mes, deputados, parar=None):
+    """
+    Coleta os gastos de um mês para os deputados informados.
+    
+    Uma transação por deputado, com a marca de concluído junto quando o mês
+    já saiu da janela de MESES_EM_ABERTO. Com `parar` sinalizado, encerra
+    antes do próximo deputado (os que faltam voltam na próxima execução).
+    
+    Returns:
+        tuple: (gastos recebidos da API e enfileirados, deputados cuja busca falhou)
+    """
+    hoje = datetime.now()
+    encerrado = (hoje.year * 12 + hoje.month) - (ano * 12 + mes) > MESES_EM_ABERTO
+    gastos_mes = 0
+    erros = 0
+    
+    for i, deputado in enumerate(deputados, 1):
+        if parar is not None and parar.is_set():
+            break
+        deputado_id = deputado['id']
         
-        conn.commit()
+        # Buscar gastos
+        gastos = buscar_gastos_deputado(deputado_id, ano, mes)
         
-    except Exception as e:
-        logger.error(f"Erro ao registrar coleta: {e}")
+        if gastos is None:
+            erros += 1
+            continue
+        
+        # Enfileirar gastos
+        for gasto in gastos:
+            salvar_gasto(escritor, deputado_id, gasto)
+        gastos_mes += len(gastos)
+        
+        if encerrado:
+            checkpoints.marcar(escritor, ano, mes, deputado_id, len(gastos))
+        escritor.flush()
+        
+        if i % 10 == 0:
+            logger.info(f"   {ano}/{mes:02d} - Progresso: {i}/{len(deputados)} deputados ({gastos_mes} gastos)")
+    
+    return gastos_mes, erros
 
 
-def coletar_gastos_historicos(anos=5, limite_deputados=None):
+def coletar_gastos_historicos(anos=5, limite_deputados=None, destino=None, deputados=None, parar=None):
     """
     Coleta histórico de gastos dos últimos N anos
     
     Args:
         anos (int): Número de anos para buscar (padrão: 5)
         limite_deputados (int): Limitar número de deputados para teste (None = todos)
+        destino (EscritorDedicado): Escritor compartilhado (None = conexão própria)
+        deputados (list): Deputados já gravados (None = busca e grava a lista da API)
+        parar (threading.Event): Sinalizado para encerrar na próxima unidade (Ctrl+C)
     """
     logger.info("╔═══════════════════════════════════════════════╗")
     logger.info("║  🗄️  COLETA HISTÓRICA DE GASTOS             ║")
@@ -166,22 +306,25 @@ def coletar_gastos_historicos(anos=5, limite_deputados=None):
     logger.info(f"📅 Período: {anos} anos ({datetime.now().year - anos + 1} - {datetime.now().year})")
     logger.info("")
     
-    # Conectar ao banco
-    conn = get_connection()
+    # Uma conexão para toda a coleta (ou o escritor dedicado), com gravação em lotes
+    escritor = EscritorLotes(destino=destino)
     
     # Buscar deputados
-    deputados = buscar_todos_deputados()
+    buscar = deputados is None
+    if buscar:
+        deputados = buscar_todos_deputados()
     
     if limite_deputados:
         deputados = deputados[:limite_deputados]
         logger.info(f"⚠️  Modo teste: Limitado a {limite_deputados} deputados")
     
     # Salvar deputados no banco
-    logger.info("💾 Salvando deputados no banco...")
-    for deputado in deputados:
-        salvar_deputado(conn, deputado)
-    conn.commit()
-    logger.info(f"✅ {len(deputados)} deputados salvos\n")
+    if buscar:
+        logger.info("💾 Salvando deputados no banco...")
+        for deputado in deputados:
+            salvar_deputado(escritor, deputado)
+        escritor.flush()
+        logger.info(f"✅ {len(deputados)} deputados salvos\n")
     
     # Calcular período
     ano_atual = datetime.now().year
@@ -192,50 +335,44 @@ def coletar_gastos_historicos(anos=5, limite_deputados=None):
     total_requisicoes = 0
     erro_count = 0
     
+    # Deputados já coletados em cada mês (amostras de teste não contam)
+    checkpoints = Checkpoints('gastos', ativo=limite_deputados is None)
+    
     # Para cada ano
     for ano in range(ano_inicio, ano_atual + 1):
+        if parar is not None and parar.is_set():
+            break
         mes_fim = mes_atual if ano == ano_atual else 12
         
         logger.info(f"📊 Coletando ano {ano}...")
         
         # Para cada mês
         for mes in range(1, mes_fim + 1):
-            gastos_mes = 0
+            if parar is not None and parar.is_set():
+                break
+            pendentes = [d for d in deputados if not checkpoints.concluido(ano, mes, d['id'])]
+            if not pendentes:
+                logger.info(f"   ⏩ {ano}/{mes:02d}: já coletado")
+                continue
             
             # Registrar início da coleta
-            registrar_coleta(conn, 'gastos', ano, mes, 'in_progress')
+            registrar_coleta(escritor, 'gastos', ano, mes, 'in_progress')
             
-            # Para cada deputado
-            for i, deputado in enumerate(deputados, 1):
-                deputado_id = deputado['id']
-                
-                # Buscar gastos
-                gastos = buscar_gastos_deputado(deputado_id, ano, mes)
-                total_requisicoes += 1
-                
-                # Salvar gastos
-                for gasto in gastos:
-                    if salvar_gasto(conn, deputado_id, gasto):
-                        gastos_mes += 1
-                        total_gastos += 1
-                
-                # Commit a cada 10 deputados
-                if i % 10 == 0:
-                    conn.commit()
-                    logger.info(f"   {ano}/{mes:02d} - Progresso: {i}/{len(deputados)} deputados ({gastos_mes} gastos)")
-                
-                # Rate limiting (100 req/min = 1 req a cada 0.6s)
-                if total_requisicoes % 100 == 0:
-                    logger.info(f"   ⏸️  Pausa para respeitar rate limit...")
-                    time.sleep(60)
+            gastos_mes, erros = coletar_gastos_mes(escritor, checkpoints, ano, mes, pendentes, parar)
+            total_gastos += gastos_mes
+            total_requisicoes += len(pendentes)
+            erro_count += erros
             
-            # Commit final do mês
-            conn.commit()
-            registrar_coleta(conn, 'gastos', ano, mes, 'completed', gastos_mes)
+            # Lote final do mês
+            escritor.flush()
+            if parar is not None and parar.is_set():
+                logger.warning(f"   ⏹️ {ano}/{mes:02d}: coleta interrompida ({gastos_mes} gastos até aqui)")
+                break
+            registrar_coleta(escritor, 'gastos', ano, mes, 'completed', gastos_mes)
             
             logger.info(f"   ✅ {ano}/{mes:02d}: {gastos_mes} gastos coletados")
     
-    conn.close()
+    escritor.close()
     
     logger.info("")
     logger.info("╔═══════════════════════════════════════════════╗")
@@ -243,9 +380,12 @@ def coletar_gastos_historicos(anos=5, limite_deputados=None):
     logger.info("╚═══════════════════════════════════════════════╝")
     logger.info("")
     logger.info(f"📊 Estatísticas:")
-    logger.info(f"   • Total de gastos coletados: {total_gastos}")
+    logger.info(f"   • Gastos recebidos da API: {total_gastos}")
     logger.info(f"   • Total de requisições: {total_requisicoes}")
+    logger.info(f"   • Escrita: {escritor.resumo()}")
     logger.info(f"   • Deputados processados: {len(deputados)}")
+    logger.info(f"   • Buscas com erro (refeitas na próxima execução): {erro_count}")
+    logger.info(f"   • Unidades já concluídas puladas: {checkpoints.pulados}")
     logger.info(f"   • Período: {ano_inicio}-{ano_atual}")
     logger.info("")
     logger.info(f"💾 Banco de dados: {DATABASE_FILE}")
@@ -260,6 +400,9 @@ if __name__ == '__main__':
     if len(sys.argv) > 1 and sys.argv[1] == '--teste':
         logger.info("🧪 Modo TESTE: Apenas 10 deputados, últimos 2 anos")
         coletar_gastos_historicos(anos=2, limite_deputados=10)
+    elif len(sys.argv) > 1 and sys.argv[1] == '--compactar':
+        # Execução única: remove duplicatas de coletas anteriores
+        compactar_gastos()
     else:
         # Modo completo
         coletar_gastos_historicos(anos=5)
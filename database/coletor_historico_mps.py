@@ -15,17 +15,17 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database.init_db import get_connection, DATABASE_FILE
+from database.api_camara import BASE_URL, api_get
+from database.checkpoints import Checkpoints
+from database.escrita import EscritorLotes
 from src.coletores.coleta_medidas_provisorias import classify_mp_importance
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
-HEADERS = {"Accept": "application/json"}
-
 
 def fetch_mps_by_year(year, page=1, max_items=100):
-    """Busca Medidas Provisórias de um ano específico."""
+    """Busca Medidas Provisórias de um ano específico (None em caso de erro)."""
     url = f"{BASE_URL}/proposicoes"
     params = {
         'ano': year,
@@ -37,19 +37,19 @@ def fetch_mps_by_year(year, page=1, max_items=100):
     }
     
     try:
-        response = requests.get(url, headers=HEADERS, params=params, timeout=30)
+        response = api_get(url, params, timeout=30)
         response.raise_for_status()
         return response.json().get('dados', [])
     except requests.RequestException as e:
         logger.error(f"Erro ao buscar MPs para o ano {year}, página {page}: {e}")
-        return []
+        return None
 
 
 def fetch_mp_details(mp_id):
     """Busca detalhes completos de uma Medida Provisória."""
     url = f"{BASE_URL}/proposicoes/{mp_id}"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
+        response = api_get(url, timeout=15)
         response.raise_for_status()
         data = response.json()
         
@@ -60,11 +60,13 @@ def fetch_mp_details(mp_id):
         data_apresentacao_str = mp.get('dataApresentacao', '')
         dias_restantes = None
         prazo_vencido = False
+        prazo_vencimento = None
         
         if data_apresentacao_str:
             try:
                 data_apresentacao = datetime.fromisoformat(data_apresentacao_str.replace('Z', '+00:00'))
                 prazo_final = data_apresentacao + timedelta(days=120)
+                prazo_vencimento = prazo_final.date().isoformat()
                 dias_restantes = (prazo_final - datetime.now(data_apresentacao.tzinfo)).days
                 
                 if dias_restantes < 0:
@@ -74,7 +76,7 @@ def fetch_mp_details(mp_id):
                 logger.debug(f"Erro ao calcular prazo da MP {mp_id}: {e}")
         
         # Classificar importância e categoria
-        importancia, categoria = classify_mp_importance(mp.get('ementa', ''))
+        importancia, categoria = classify_mp_importance({'ementa': mp.get('ementa') or ''})
         
         # Calcular nível de urgência
         nivel_urgencia = 1
@@ -91,14 +93,17 @@ def fetch_mp_details(mp_id):
         return {
             'id': mp['id'],
             'numero': f"{mp['siglaTipo']} {mp['numero']}/{mp['ano']}",
+            'ano': mp['ano'],
             'ementa': mp.get('ementa', ''),
             'data_apresentacao': mp.get('dataApresentacao', ''),
+            'prazo_vencimento': prazo_vencimento,
             'status': status.get('descricaoTramitacao', 'N/A'),
             'dias_restantes': dias_restantes,
             'prazo_vencido': prazo_vencido,
             'nivel_urgencia': nivel_urgencia,
             'importancia': importancia,
-            'categoria': categoria
+            'categoria': categoria,
+            'url': mp.get('urlInteiroTeor', '')
         }
     
     except requests.RequestException as e:
@@ -106,49 +111,139 @@ def fetch_mp_details(mp_id):
         return None
 
 
-def save_mp_to_db(mp_data):
-    """Salva ou atualiza uma Medida Provisória no banco de dados."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
+def save_mp_to_db(escritor, mp_data):
+    """Enfileira uma Medida Provisória no lote do escritor."""
     try:
-        cursor.execute("""
-            INSERT OR REPLACE INTO medidas_provisorias (
-                id, numero, ementa, data_apresentacao, status,
-                dias_restantes, prazo_vencido, nivel_urgencia,
-                importancia, categoria, data_ultima_coleta
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        # Upsert (não REPLACE): a linha é atualizada no lugar e os triggers da
+        # busca textual veem um UPDATE, em vez de uma remoção que não disparam
+        escritor.adicionar("""
+            INSERT INTO medidas_provisorias (
+                id, numero, ano, ementa, data_apresentacao,
+                prazo_vencimento, status, dias_restantes, prazo_vencido,
+                nivel_urgencia, importancia, categoria, url, data_ultima_coleta
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (id) DO UPDATE SET
+                numero = excluded.numero,
+                ano = excluded.ano,
+                ementa = excluded.ementa,
+                data_apresentacao = excluded.data_apresentacao,
+                prazo_vencimento = excluded.prazo_vencimento,
+                status = excluded.status,
+                dias_restantes = excluded.dias_restantes,
+                prazo_vencido = excluded.prazo_vencido,
+                nivel_urgencia = excluded.nivel_urgencia,
+                importancia = excluded.importancia,
+                categoria = excluded.categoria,
+                url = excluded.url,
+                data_ultima_coleta = excluded.data_ultima_coleta
+            ON CONFLICT DO NOTHING
         """, (
             mp_data['id'],
             mp_data['numero'],
+            mp_data['ano'],
             mp_data['ementa'],
             mp_data['data_apresentacao'],
+            mp_data['prazo_vencimento'],
             mp_data['status'],
             mp_data['dias_restantes'],
             mp_data['prazo_vencido'],
             mp_data['nivel_urgencia'],
             mp_data['importancia'],
-            mp_data['categoria']
+            mp_data['categoria'],
+            mp_data['url']
         ))
         
-        conn.commit()
         return True
         
-    except sqlite3.Error as e:
-        logger.error(f"Erro ao salvar MP {mp_data['id']} no banco: {e}")
+    except KeyError as e:
+        logger.error(f"Erro ao preparar MP {mp_data.get('id')} para o banco: {e}")
         return False
-    finally:
-        conn.close()
 
 
-def coletar_mps_historico(anos_historico=5, teste_modo=False, max_mps_teste=50):
+def coletar_mps_ano(escritor, checkpoints, year, limite=None, parar=None):
+    """
+    Coleta as MPs de um ano, página a página, pulando as páginas já marcadas.
+    
+    Em anos encerrados, cada página gravada por inteiro é marcada junto com
+    os dados e, com a listagem esgotada sem falhas, o ano inteiro também.
+    
+    Args:
+        limite (int): Máximo de MPs a gravar (modo teste; None = todas).
+        parar (threading.Event): Sinalizado para encerrar antes da próxima página.
+    
+    Returns:
+        tuple: (MPs gravadas, True se o ano foi percorrido sem falhas)
+    """
+    # O ano corrente ainda recebe MPs: nada dele é marcado
+    encerrado = year < datetime.now().year
+    
+    gravadas = 0
+    completo = True
+    page = 1
+    while True:
+        if parar is not None and parar.is_set():
+            return gravadas, False
+        
+        if encerrado and checkpoints.concluido(year, 0, f'pagina {page}'):
+            page += 1
+            continue
+        
+        mps = fetch_mps_by_year(year, page=page)
+        
+        if mps is None:
+            # Ano incompleto: as páginas restantes voltam na próxima execução
+            return gravadas, False
+        
+        if not mps:
+            break
+        
+        if limite is not None:
+            mps = mps[:max(0, limite - gravadas)]
+        
+        mps_pagina = 0
+        for mp_summary in mps:
+            details = fetch_mp_details(mp_summary['id'])
+            if details:
+                if save_mp_to_db(escritor, details):
+                    mps_pagina += 1
+                    logger.debug(f"  MP {details['numero']} salva.")
+                else:
+                    logger.warning(f"  Falha ao salvar MP {details['numero']}")
+        gravadas += mps_pagina
+        
+        # MPs da página e a marca (só se nenhum detalhe falhou) em uma única transação
+        if mps_pagina < len(mps):
+            completo = False
+        elif encerrado:
+            checkpoints.marcar(escritor, year, 0, f'pagina {page}', mps_pagina)
+        escritor.flush()
+        
+        if limite is not None and gravadas >= limite:
+            return gravadas, False
+        
+        page += 1
+    
+    # O ano só é marcado se todas as páginas foram gravadas por inteiro
+    if completo and encerrado:
+        checkpoints.marcar(escritor, year)
+        escritor.flush()
+    
+    return gravadas, completo
+
+
+def coletar_mps_historico(anos_historico=5, teste_modo=False, max_mps_teste=50, destino=None, parar=None):
     """
     Coleta Medidas Provisórias históricas e salva no banco de dados.
     
+    Em anos já encerrados, cada página gravada por inteiro e cada ano
+    esgotado ficam em checkpoints_coleta e são pulados ao retomar.
+    
     Args:
         anos_historico (int): Quantidade de anos para buscar dados.
         teste_modo (bool): Se True, coleta apenas um número limitado de MPs.
         max_mps_teste (int): Número máximo de MPs para coletar em modo teste.
+        destino (EscritorDedicado): Escritor compartilhado (None = conexão própria).
+        parar (threading.Event): Sinalizado para encerrar na próxima página (Ctrl+C).
     """
     logger.info(f"--- Iniciando coleta histórica de Medidas Provisórias ({anos_historico} anos) ---")
     
@@ -157,43 +252,36 @@ def coletar_mps_historico(anos_historico=5, teste_modo=False, max_mps_teste=50):
     
     total_mps_coletadas = 0
     
+    # Uma conexão para toda a coleta (ou o escritor dedicado); cada página vira um lote
+    escritor = EscritorLotes(destino=destino)
+    
+    # Páginas e anos completos de execuções anteriores (o modo teste não registra)
+    checkpoints = Checkpoints('mps', ativo=not teste_modo)
+    
     for year in range(start_year, current_year + 1):
+        if parar is not None and parar.is_set():
+            logger.warning("⏹️ Coleta de MPs interrompida")
+            break
+        
+        if checkpoints.concluido(year):
+            logger.info(f"⏩ {year}: já coletado")
+            continue
+        
         logger.info(f"Coletando MPs para o ano {year}...")
         
-        page = 1
-        while True:
-            mps = fetch_mps_by_year(year, page=page)
-            
-            if not mps:
-                break
-            
-            if teste_modo and total_mps_coletadas >= max_mps_teste:
-                logger.info(f"Modo teste: Limite de {max_mps_teste} MPs atingido para o ano {year}.")
-                return
-            
-            for mp_summary in mps:
-                if teste_modo and total_mps_coletadas >= max_mps_teste:
-                    break
-                
-                details = fetch_mp_details(mp_summary['id'])
-                if details:
-                    if save_mp_to_db(details):
-                        total_mps_coletadas += 1
-                        logger.debug(f"  MP {details['numero']} salva. Total: {total_mps_coletadas}")
-                    else:
-                        logger.warning(f"  Falha ao salvar MP {details['numero']}")
-                
-                time.sleep(0.15)  # Delay para respeitar rate limit
-            
-            if teste_modo and total_mps_coletadas >= max_mps_teste:
-                break
-            
-            page += 1
-            time.sleep(0.5)
+        limite = max_mps_teste - total_mps_coletadas if teste_modo else None
+        gravadas, _ = coletar_mps_ano(escritor, checkpoints, year, limite, parar)
+        total_mps_coletadas += gravadas
+        
+        if teste_modo and total_mps_coletadas >= max_mps_teste:
+            logger.info(f"Modo teste: Limite de {max_mps_teste} MPs atingido para o ano {year}.")
+            break
         
         logger.info(f"  {total_mps_coletadas} MPs coletadas até agora.")
     
-    logger.info(f"--- Coleta histórica de MPs finalizada. Total: {total_mps_coletadas} MPs ---")
+    escritor.close()
+    logger.info(f"--- Coleta histórica de MPs finalizada. Total: {total_mps_coletadas} MPs "
+                f"({checkpoints.pulados} unidades já concluídas puladas) ---")
 
 
 if __name__ == '__main__':
@@ -1,12 +1,15 @@
 """
 Coletor Histórico de Projetos de Lei
-Busca PLs dos últimos 5 anos da API da Câmara e salva no banco
+Busca PLs dos últimos 5 anos da API da Câmara, por partições mensais
+paginadas e com os detalhes de cada PL, e salva no banco
 """
+import calendar
 import sqlite3
 import requests
 import logging
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -14,12 +17,17 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database.init_db import get_connection, DATABASE_FILE
+from database.api_camara import BASE_URL, api_get, definir_fluxo, fluxo_atual, paginar
+from database.checkpoints import Checkpoints
+from database.escrita import EscritorLotes
+from database.filas import em_ordem_de_conclusao, mostrar_metricas
+from src.config import CAMARA_ENRIQUECIMENTO_PARALELO, COLETA_CAPACIDADE_FILA
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
-HEADERS = {"Accept": "application/json"}
+# Máximo de itens por página aceito pela API de proposições
+ITENS_POR_PAGINA = 100
 
 
 def classificar_categoria(ementa):
@@ -62,63 +70,97 @@ def classificar_importancia(pl):
     return 2
 
 
-def buscar_pls_por_ano(ano, limite=None):
-    """Busca todos os PLs de um ano"""
-    logger.info(f"🔍 Buscando PLs de {ano}...")
+def particoes_pls(anos):
+    """
+    Partições (ano, mês) de dataApresentacao dos últimos N anos, até o mês corrente.
+
+    Cada mês tem algumas centenas de PLs: poucas páginas por partição e
+    partições independentes entre si.
+    """
+    hoje = datetime.now()
+    return [
+        (ano, mes)
+        for ano in range(hoje.year - anos + 1, hoje.year + 1)
+        for mes in range(1, 13)
+        if (ano, mes) <= (hoje.year, hoje.month)
+    ]
+
+
+def buscar_pls_particao(ano, mes, limite=None):
+    """
+    Lista os PLs apresentados em um mês, página a página.
+
+    Returns:
+        list: Resumos dos PLs (levanta requests.RequestException em falha)
+    """
+    ultimo_dia = calendar.monthrange(ano, mes)[1]
+    url = f"{BASE_URL}/proposicoes"
+    params = {
+        'siglaTipo': 'PL',
+        'dataApresentacaoInicio': f"{ano:04d}-{mes:02d}-01",
+        'dataApresentacaoFim': f"{ano:04d}-{mes:02d}-{ultimo_dia:02d}",
+        'ordem': 'ASC',
+        'ordenarPor': 'id',
+        'itens': min(limite or ITENS_POR_PAGINA, ITENS_POR_PAGINA),
+        'pagina': 1
+    }
     
-    try:
-        url = f"{BASE_URL}/proposicoes"
-        params = {
-            'siglaTipo': 'PL',
-            'ano': ano,
-            'ordem': 'ASC',
-            'ordenarPor': 'id',
-            'itens': limite or 10000  # Máximo permitido
-        }
-        
-        response = requests.get(url, headers=HEADERS, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        pls = data.get('dados', [])
-        logger.info(f"✅ Encontrados {len(pls)} PLs em {ano}")
-        
-        return pls
-        
-    except Exception as e:
-        logger.error(f"❌ Erro ao buscar PLs de {ano}: {e}")
-        return []
+    pls = []
+    for pl in paginar(url, params):
+        pls.append(pl)
+        if limite and len(pls) >= limite:
+            break
+    
+    return pls
 
 
 def buscar_detalhes_pl(pl_id):
     """Busca detalhes completos de um PL"""
     try:
         url = f"{BASE_URL}/proposicoes/{pl_id}"
-        response = requests.get(url, headers=HEADERS, timeout=15)
+        response = api_get(url, timeout=15)
         response.raise_for_status()
         data = response.json()
         
         return data.get('dados', {})
         
-    except Exception as e:
-        logger.debug(f"Erro ao buscar detalhes do PL {pl_id}: {e}")
+    except requests.RequestException as e:
+        logger.warning(f"⚠️  Erro ao buscar detalhes do PL {pl_id}: {e}")
         return None
 
 
-def salvar_pl(conn, pl):
-    """Salva um PL no banco"""
-    cursor = conn.cursor()
-    
+def salvar_pl(escritor, pl):
+    """Enfileira um PL no lote do escritor"""
     try:
         # Classificar
         categoria = classificar_categoria(pl.get('ementa', ''))
         importancia = classificar_importancia(pl)
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO projetos_lei 
-            (id, numero, ano, ementa, autor_nome, tipo, data_apresentacao,
+        # Upsert (não REPLACE): a linha é atualizada no lugar, então os triggers de
+        # resumo veem um UPDATE e o autor vindo de autorias é preservado (excluded.autor_id
+        # já é o primeiro autor gravado em autorias). Conflito em outra chave única (numero)
+        # não é engolido: o lote falha e aparece nos contadores do escritor
+        escritor.adicionar("""
+            INSERT INTO projetos_lei 
+            (id, numero, ano, ementa, autor_id, autor_nome, tipo, data_apresentacao,
              status, categoria, importancia, url)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?1, ?2, ?3, ?4,
+                    (SELECT deputado_id FROM autorias
+                     WHERE proposicao_id = ?1 AND deputado_id IS NOT NULL ORDER BY ordem LIMIT 1),
+                    COALESCE((SELECT nome FROM autorias WHERE proposicao_id = ?1 ORDER BY ordem LIMIT 1), ?5),
+                    ?6, ?7, ?8, ?9, ?10, ?11)
+            ON CONFLICT (id) DO UPDATE SET
+                numero = excluded.numero,
+                ano = excluded.ano,
+                ementa = excluded.ementa,
+                autor_id = COALESCE(excluded.autor_id, autor_id),
+                autor_nome = COALESCE(NULLIF(excluded.autor_nome, ''), autor_nome),
+                tipo = excluded.tipo,
+                data_apresentacao = excluded.data_apresentacao,
+                status = excluded.status,
+                categoria = excluded.categoria,
+                importancia = excluded.importancia,
+                url = excluded.url
         """, (
             pl['id'],
             f"{pl.get('siglaTipo', 'PL')} {pl.get('numero', '')}/{pl.get('ano', '')}",
@@ -140,91 +182,149 @@ def salvar_pl(conn, pl):
         return False
 
 
-def registrar_coleta(conn, tipo, ano, mes, status, total_registros=0, erro=None):
-    """Registra progresso da coleta"""
-    cursor = conn.cursor()
+def enriquecer_pls(pls, executor):
+    """
+    Busca os detalhes (situação, URL) de vários PLs ao mesmo tempo.
+
+    PLs cujos detalhes falharam ficam de fora: gravados só com o resumo,
+    eles apagariam a situação e a URL de uma linha já completa.
+
+    Returns:
+        tuple: (resumo de cada PL completado com os detalhes, IDs dos PLs com falha)
+    """
+    futuros = [executor.submit(buscar_detalhes_pl, pl['id']) for pl in pls]
+
+    completos = []
+    falhas = []
+    for pl, futuro in zip(pls, futuros):
+        detalhes = futuro.result()
+        if detalhes is None:
+            falhas.append(pl['id'])
+        else:
+            completos.append({**pl, **detalhes})
+    return completos, falhas
+
+
+def registrar_coleta(escritor, tipo, ano, mes, status, total_registros=0, erro=None):
+    """Registra progresso da coleta (pela mesma fila de escrita dos dados)"""
+    if status == 'in_progress':
+        escritor.adicionar("""
+            INSERT INTO coleta_historica (tipo, ano, mes, status, started_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (tipo, ano, mes, status))
+    elif status == 'completed':
+        escritor.adicionar("""
+            UPDATE coleta_historica 
+            SET status = ?, total_registros = ?, completed_at = CURRENT_TIMESTAMP
+            WHERE tipo = ? AND ano = ? AND mes = ? AND status = 'in_progress'
+        """, (status, total_registros, tipo, ano, mes))
+    elif status == 'error':
+        escritor.adicionar("""
+            UPDATE coleta_historica 
+            SET status = ?, erro = ?, completed_at = CURRENT_TIMESTAMP
+            WHERE tipo = ? AND ano = ? AND mes = ? AND status = 'in_progress'
+        """, (status, erro, tipo, ano, mes))
     
-    try:
-        if status == 'in_progress':
-            cursor.execute("""
-                INSERT INTO coleta_historica (tipo, ano, mes, status, started_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (tipo, ano, mes, status))
-        elif status == 'completed':
-            cursor.execute("""
-                UPDATE coleta_historica 
-                SET status = ?, total_registros = ?, completed_at = CURRENT_TIMESTAMP
-                WHERE tipo = ? AND ano = ? AND (mes IS NULL OR mes = ?) AND status = 'in_progress'
-            """, (status, total_registros, tipo, ano, mes))
-        
-        conn.commit()
-        
-    except Exception as e:
-        logger.error(f"Erro ao registrar coleta: {e}")
+    escritor.flush()
 
 
-def coletar_pls_historicos(anos=5, limite_por_ano=None):
+def coletar_pls_historicos(anos=5, limite_por_particao=None, destino=None,
+                           paralelo=CAMARA_ENRIQUECIMENTO_PARALELO, capacidade=COLETA_CAPACIDADE_FILA,
+                           parar=None):
     """
     Coleta histórico de PLs dos últimos N anos
     
+    Duas etapas concorrentes: a listagem das partições (ano × mês de
+    apresentação, paginadas) e o enriquecimento com os detalhes de cada PL.
+    Cada partição é gravada e marcada em coleta_historica assim que seus
+    detalhes chegam, enquanto as outras continuam sendo listadas. Meses
+    encerrados ficam em checkpoints_coleta e não são listados de novo ao
+    retomar uma coleta interrompida; o mês corrente é sempre recoletado.
+    
+    No máximo `capacidade` partições ficam listadas (em voo ou esperando o
+    enriquecimento) ao mesmo tempo: a listagem, mais rápida, espera o
+    enriquecimento em vez de acumular anos de resumos em memória.
+    
     Args:
         anos (int): Número de anos para buscar (padrão: 5)
-        limite_por_ano (int): Limitar PLs por ano para teste (None = todos)
+        limite_por_particao (int): Limitar PLs por mês para teste (None = todos)
+        destino (EscritorDedicado): Escritor compartilhado (None = conexão própria)
+        paralelo (int): Requisições simultâneas em cada etapa
+        capacidade (int): Partições listadas à espera do enriquecimento
+        parar (threading.Event): Sinalizado para encerrar na próxima partição (Ctrl+C)
     """
     logger.info("╔═══════════════════════════════════════════════╗")
     logger.info("║  🗄️  COLETA HISTÓRICA DE PLs                ║")
     logger.info("╚═══════════════════════════════════════════════╝")
     logger.info("")
     logger.info(f"📅 Período: {anos} anos ({datetime.now().year - anos + 1} - {datetime.now().year})")
-    if limite_por_ano:
-        logger.info(f"⚠️  Modo teste: Limitado a {limite_por_ano} PLs por ano")
+    if limite_por_particao:
+        logger.info(f"⚠️  Modo teste: Limitado a {limite_por_particao} PLs por mês")
     logger.info("")
     
-    # Conectar ao banco
-    conn = get_connection()
-    
-    # Calcular período
-    ano_atual = datetime.now().year
-    ano_inicio = ano_atual - anos + 1
+    # Uma conexão para toda a coleta (ou o escritor dedicado), com gravação em lotes
+    escritor = EscritorLotes(destino=destino)
     
+    particoes = particoes_pls(anos)
     total_pls = 0
-    total_requisicoes = 0
+    particoes_com_erro = 0
     
-    # Para cada ano
-    for ano in range(ano_inicio, ano_atual + 1):
-        logger.info(f"📊 Coletando PLs de {ano}...")
-        
-        # Registrar início
-        registrar_coleta(conn, 'pls', ano, None, 'in_progress')
-        
-        # Buscar PLs do ano
-        pls = buscar_pls_por_ano(ano, limite_por_ano)
-        total_requisicoes += 1
+    # Partições completas de execuções anteriores (amostras de teste não contam)
+    checkpoints = Checkpoints('pls', ativo=limite_por_particao is None)
+    pendentes = [(ano, mes) for ano, mes in particoes if not checkpoints.concluido(ano, mes)]
+    mes_corrente = (datetime.now().year, datetime.now().month)
+    
+    # Workers das duas etapas contam requisições no fluxo de quem os criou
+    fluxo = fluxo_atual()
+    with ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='pls-listagem',
+                            initializer=definir_fluxo, initargs=(fluxo,)) as listagem, \
+         ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='pls-detalhes',
+                            initializer=definir_fluxo, initargs=(fluxo,)) as detalhes:
         
-        pls_salvos = 0
+        particoes_listadas = em_ordem_de_conclusao(
+            listagem, buscar_pls_particao,
+            ((ano, mes, limite_por_particao) for ano, mes in pendentes),
+            capacidade, 'pls-listagem'
+        )
         
-        # Salvar cada PL
-        for i, pl in enumerate(pls, 1):
-            if salvar_pl(conn, pl):
-                pls_salvos += 1
-                total_pls += 1
+        for concluidas, ((ano, mes, _), futuro) in enumerate(particoes_listadas, 1):
+            if parar is not None and parar.is_set():
+                logger.warning(f"   ⏹️ Coleta interrompida ({concluidas - 1}/{len(pendentes)} partições)")
+                break
+            registrar_coleta(escritor, 'pls', ano, mes, 'in_progress')
             
-            # Commit a cada 100 PLs
-            if i % 100 == 0:
-                conn.commit()
-                logger.info(f"   Progresso: {i}/{len(pls)} PLs ({pls_salvos} salvos)")
+            try:
+                pls = futuro.result()
+            except requests.RequestException as e:
+                logger.error(f"❌ Erro ao listar PLs de {mes:02d}/{ano}: {e}")
+                registrar_coleta(escritor, 'pls', ano, mes, 'error', erro=str(e))
+                particoes_com_erro += 1
+                continue
             
-            # Rate limiting a cada 100 PLs
-            if i % 100 == 0:
-                time.sleep(1)
-        
-        # Commit final do ano
-        conn.commit()
-        registrar_coleta(conn, 'pls', ano, None, 'completed', pls_salvos)
-        
-        logger.info(f"   ✅ {ano}: {pls_salvos} PLs salvos")
+            completos, falhas = enriquecer_pls(pls, detalhes)
+            pls_coletados = sum(salvar_pl(escritor, pl) for pl in completos)
+            total_pls += pls_coletados
+            
+            if falhas:
+                # Partição sem marca: os PLs com falha voltam na próxima execução
+                escritor.flush()
+                registrar_coleta(escritor, 'pls', ano, mes, 'error',
+                                 erro=f"{len(falhas)} PLs sem detalhes (falha na API)")
+                particoes_com_erro += 1
+                logger.error(f"   ❌ {mes:02d}/{ano}: {pls_coletados} PLs coletados, {len(falhas)} sem detalhes "
+                             f"({concluidas}/{len(pendentes)} partições)")
+                continue
+            
+            # PLs da partição e a marca de conclusão no mesmo lote
+            if (ano, mes) < mes_corrente:
+                checkpoints.marcar(escritor, ano, mes, total_registros=pls_coletados)
+            escritor.flush()
+            registrar_coleta(escritor, 'pls', ano, mes, 'completed', pls_coletados)
+            
+            logger.info(f"   ✅ {mes:02d}/{ano}: {pls_coletados} PLs coletados "
+                        f"({concluidas}/{len(pendentes)} partições)")
     
-    conn.close()
+    escritor.close()
     
     logger.info("")
     logger.info("╔═══════════════════════════════════════════════╗")
@@ -233,8 +333,11 @@ def coletar_pls_historicos(anos=5, limite_por_ano=None):
     logger.info("")
     logger.info(f"📊 Estatísticas:")
     logger.info(f"   • Total de PLs coletados: {total_pls}")
-    logger.info(f"   • Total de requisições: {total_requisicoes}")
-    logger.info(f"   • Período: {ano_inicio}-{ano_atual}")
+    logger.info(f"   • Partições: {len(particoes)} ({particoes_com_erro} com erro, "
+                f"{checkpoints.pulados} já concluídas)")
+    logger.info(f"   • Escrita: {escritor.resumo()}")
+    mostrar_metricas()
+    logger.info(f"   • Período: {particoes[0][1]:02d}/{particoes[0][0]}-{particoes[-1][1]:02d}/{particoes[-1][0]}")
     logger.info("")
     logger.info(f"💾 Banco de dados: {DATABASE_FILE}")
     logger.info(f"📊 Tamanho: {Path(DATABASE_FILE).stat().st_size / 1024 / 1024:.2f} MB")
@@ -244,11 +347,10 @@ def coletar_pls_historicos(anos=5, limite_por_ano=None):
 if __name__ == '__main__':
     import sys
     
-    # Modo teste (100 PLs por ano)
+    # Modo teste (10 PLs por mês)
     if len(sys.argv) > 1 and sys.argv[1] == '--teste':
-        logger.info("🧪 Modo TESTE: Apenas 100 PLs por ano, últimos 2 anos")
-        coletar_pls_historicos(anos=2, limite_por_ano=100)
+        logger.info("🧪 Modo TESTE: Apenas 10 PLs por mês, último ano")
+        coletar_pls_historicos(anos=1, limite_por_particao=10)
     else:
         # Modo completo
         coletar_pls_historicos(anos=5)
-
@@ -3,11 +3,14 @@ Coletor Histórico de Votações da Câmara dos Deputados
 Busca votações dos últimos N anos e salva no banco SQLite
 """
 
+import calendar
+import json
 import sqlite3
 import requests
 import logging
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -15,17 +18,19 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database.init_db import get_connection, DATABASE_FILE
+from database.api_camara import BASE_URL, api_get, definir_fluxo, fluxo_atual
+from database.checkpoints import Checkpoints
+from database.escrita import EscritorLotes
+from database.dimensoes import ORGAOS, codificar_voto
 from src.coletores.coleta_votacoes import classify_vote_importance
+from src.config import CAMARA_ENRIQUECIMENTO_PARALELO
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
-HEADERS = {"Accept": "application/json"}
-
 
 def fetch_votes_by_period(start_date, end_date, page=1, max_items=100):
-    """Busca votações em um período específico."""
+    """Busca votações em um período específico (None em caso de erro)."""
     url = f"{BASE_URL}/votacoes"
     params = {
         'dataInicio': start_date.strftime('%Y-%m-%d'),
@@ -37,194 +42,353 @@ def fetch_votes_by_period(start_date, end_date, page=1, max_items=100):
     }
     
     try:
-        response = requests.get(url, headers=HEADERS, params=params, timeout=30)
+        response = api_get(url, params, timeout=30)
         response.raise_for_status()
         return response.json().get('dados', [])
     except requests.RequestException as e:
         logger.error(f"Erro ao buscar votações para período {start_date} - {end_date}, página {page}: {e}")
-        return []
+        return None
 
 
-def fetch_vote_details(vote_id):
-    """Busca detalhes completos de uma votação."""
-    url = f"{BASE_URL}/votacoes/{vote_id}"
+def _buscar_dados(url, timeout=15):
+    """GET em um endpoint da API; retorna o campo 'dados' ou None em caso de erro."""
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
+        response = api_get(url, timeout=timeout)
         response.raise_for_status()
-        votacao = response.json().get('dados', {})
-        
-        # Buscar votos individuais para contar
-        votos_sim = 0
-        votos_nao = 0
-        votos_outros = 0
-        votos_deputados = []
-        
-        try:
-            url_votos = f"{BASE_URL}/votacoes/{vote_id}/votos"
-            response_votos = requests.get(url_votos, headers=HEADERS, timeout=15)
-            response_votos.raise_for_status()
-            dados_votos = response_votos.json()
-            
-            for voto in dados_votos.get('dados', []):
-                tipo_voto = voto.get('tipoVoto', '').lower()
-                deputado_id = voto.get('deputado_', {}).get('id')
-                
-                if deputado_id:
-                    votos_deputados.append({
-                        'deputado_id': deputado_id,
-                        'tipo_voto': tipo_voto
-                    })
-                
-                if tipo_voto == 'sim':
-                    votos_sim += 1
-                elif tipo_voto == 'não' or tipo_voto == 'nao':
-                    votos_nao += 1
-                else:
-                    votos_outros += 1
-                    
-        except Exception as e:
-            logger.warning(f"Erro ao contar votos para votação {vote_id}: {e}")
-        
-        # Determinar aprovação
-        aprovacao = None
-        if votos_sim > votos_nao:
-            aprovacao = True
-        elif votos_nao > votos_sim:
-            aprovacao = False
-        
-        return {
-            'id': votacao.get('id', ''),
-            'data': votacao.get('dataHoraRegistro', ''),
-            'descricao': votacao.get('descricao', ''),
-            'sigla_orgao': votacao.get('siglaOrgao', ''),
-            'aprovacao': aprovacao,
-            'votos_sim': votos_sim,
-            'votos_nao': votos_nao,
-            'votos_outros': votos_outros,
-            'proposicao_id': votacao.get('proposicaoObjeto', {}).get('id', ''),
-            'proposicao_numero': votacao.get('proposicaoObjeto', {}).get('descricao', ''),
-            'votos_deputados': votos_deputados
-        }
-    
+        return response.json().get('dados')
     except requests.RequestException as e:
-        logger.error(f"Erro ao buscar detalhes da votação {vote_id}: {e}")
+        logger.error(f"Erro ao buscar {url}: {e}")
+        return None
+
+
+def montar_votacao(votacao, votos, orientacoes):
+    """
+    Monta o registro da votação a partir das respostas de /votacoes/{id},
+    /votacoes/{id}/votos e /votacoes/{id}/orientacoes.
+    """
+    # Contar votos individuais
+    votos_sim = 0
+    votos_nao = 0
+    votos_outros = 0
+    votos_deputados = []
+    
+    for voto in votos:
+        tipo_voto = voto.get('tipoVoto', '').lower()
+        deputado_id = voto.get('deputado_', {}).get('id')
+        
+        if deputado_id:
+            votos_deputados.append({
+                'deputado_id': deputado_id,
+                'tipo_voto': tipo_voto
+            })
+        
+        if tipo_voto == 'sim':
+            votos_sim += 1
+        elif tipo_voto == 'não' or tipo_voto == 'nao':
+            votos_nao += 1
+        else:
+            votos_outros += 1
+    
+    # Determinar aprovação
+    aprovacao = None
+    if votos_sim > votos_nao:
+        aprovacao = True
+    elif votos_nao > votos_sim:
+        aprovacao = False
+    
+    return {
+        'id': votacao.get('id', ''),
+        'data': votacao.get('dataHoraRegistro', ''),
+        'descricao': votacao.get('descricao', ''),
+        'sigla_orgao': votacao.get('siglaOrgao', ''),
+        'aprovacao': aprovacao,
+        'votos_sim': votos_sim,
+        'votos_nao': votos_nao,
+        'votos_outros': votos_outros,
+        'proposicao_id': (votacao.get('proposicaoObjeto') or {}).get('id', ''),
+        'proposicao_numero': (votacao.get('proposicaoObjeto') or {}).get('descricao', ''),
+        'votos_deputados': votos_deputados,
+        'orientacoes': [
+            {
+                'sigla': orientacao.get('siglaPartidoBloco', ''),
+                'tipo_lideranca': orientacao.get('codTipoLideranca'),
+                'orientacao': orientacao.get('orientacaoVoto', '')
+            }
+            for orientacao in orientacoes
+            if orientacao.get('siglaPartidoBloco')
+        ]
+    }
+
+
+def fetch_vote_details(vote_id):
+    """Busca detalhes completos de uma votação (uma requisição por vez)."""
+    votacao = _buscar_dados(f"{BASE_URL}/votacoes/{vote_id}")
+    if votacao is None:
+        return None
+    
+    votos = _buscar_dados(f"{BASE_URL}/votacoes/{vote_id}/votos")
+    orientacoes = _buscar_dados(f"{BASE_URL}/votacoes/{vote_id}/orientacoes")
+    if votos is None or orientacoes is None:
+        # Gravar sem os votos sobrescreveria uma votação completa já no banco
         return None
+    return montar_votacao(votacao, votos, orientacoes)
 
 
-def save_vote_to_db(vote_data):
-    """Salva ou atualiza uma votação no banco de dados."""
-    conn = get_connection()
-    cursor = conn.cursor()
+def enriquecer_votacoes(vote_ids, executor):
+    """
+    Busca detalhes, votos e orientações de várias votações ao mesmo tempo.
+    
+    As três requisições de cada votação vão juntas para o pool, então uma
+    página inteira fica em voo de uma vez; o ritmo continua limitado pelo
+    orçamento compartilhado de api_camara.
+    
+    Args:
+        vote_ids (list): IDs das votações (ex.: uma página da listagem).
+        executor (ThreadPoolExecutor): Pool de requisições.
+    
+    Uma votação só entra nos registros se as três requisições deram certo:
+    gravada sem votos ou orientações, ela substituiria uma linha completa
+    (INSERT OR REPLACE) e a página seria marcada como concluída.
     
+    Returns:
+        tuple: (registros na ordem de vote_ids, IDs das votações com alguma requisição falha)
+    """
+    futuros = [
+        (vote_id, [executor.submit(_buscar_dados, f"{BASE_URL}/votacoes/{vote_id}{sufixo}")
+                   for sufixo in ('', '/votos', '/orientacoes')])
+        for vote_id in vote_ids
+    ]
+    
+    registros = []
+    falhas = []
+    for vote_id, respostas in futuros:
+        votacao, votos, orientacoes = (futuro.result() for futuro in respostas)
+        if votacao is None or votos is None or orientacoes is None:
+            falhas.append(vote_id)
+            continue
+        registros.append(montar_votacao(votacao, votos, orientacoes))
+    
+    return registros, falhas
+
+
+# Votos como array JSON [[deputado_id, tipo_voto], ...]
+SQL_INSERIR_VOTOS = """
+    INSERT INTO votos_deputados (votacao_id, deputado_id, tipo_voto)
+    SELECT ?, json_extract(value, '$[0]'), json_extract(value, '$[1]')
+    FROM json_each(?)
+    WHERE true
+    ON CONFLICT (votacao_id, deputado_id) DO UPDATE SET tipo_voto = excluded.tipo_voto
+"""
+
+# Orientações como array JSON [[sigla, tipo_lideranca, orientacao], ...]
+SQL_INSERIR_ORIENTACOES = """
+    INSERT INTO orientacoes (votacao_id, sigla, tipo_lideranca, orientacao)
+    SELECT ?, json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+    FROM json_each(?)
+    WHERE true
+    ON CONFLICT (votacao_id, sigla) DO UPDATE SET
+        tipo_lideranca = excluded.tipo_lideranca,
+        orientacao = excluded.orientacao
+"""
+
+
+def preparar_votacao(conn, vote_data):
+    """Linha de votacoes com o órgão resolvido para o código da dimensão"""
+    return (
+        vote_data['id'],
+        vote_data['data'],
+        vote_data['descricao'],
+        vote_data['proposicao_numero'],
+        vote_data['proposicao_id'] or None,
+        vote_data['sigla_orgao'],
+        ORGAOS.obter_id(conn, vote_data['sigla_orgao']),
+        vote_data['aprovacao'],
+        vote_data['votos_sim'],
+        vote_data['votos_nao'],
+        vote_data['votos_outros'],
+        vote_data['importancia']
+    )
+
+
+def save_vote_to_db(escritor, vote_data):
+    """Enfileira uma votação e os votos individuais no lote do escritor."""
     try:
         # Classificar importância
-        importancia = classify_vote_importance(vote_data)
+        vote_data['importancia'] = classify_vote_importance(vote_data)
         
         # Inserir votação
-        cursor.execute("""
+        escritor.adicionar("""
             INSERT OR REPLACE INTO votacoes (
-                id, data_hora_registro, descricao, sigla_orgao,
-                aprovacao, votos_sim, votos_nao, votos_outros,
-                importancia, proposicao_id, proposicao_numero,
-                data_ultima_coleta
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (
-            vote_data['id'],
-            vote_data['data'],
-            vote_data['descricao'],
-            vote_data['sigla_orgao'],
-            vote_data['aprovacao'],
-            vote_data['votos_sim'],
-            vote_data['votos_nao'],
-            vote_data['votos_outros'],
-            importancia,
-            vote_data['proposicao_id'],
-            vote_data['proposicao_numero']
-        ))
-        
-        # Inserir votos individuais dos deputados
-        for voto in vote_data.get('votos_deputados', []):
-            try:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO votos_deputados (
-                        votacao_id, deputado_id, tipo_voto
-                    ) VALUES (?, ?, ?)
-                """, (
-                    vote_data['id'],
-                    voto['deputado_id'],
-                    voto['tipo_voto']
-                ))
-            except sqlite3.Error as e:
-                logger.debug(f"Erro ao inserir voto de deputado: {e}")
-        
-        conn.commit()
+                id, data, descricao, proposicao, proposicao_id,
+                orgao, orgao_id, aprovacao, votos_sim, votos_nao,
+                votos_outros, importancia, data_ultima_coleta
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, vote_data, preparar_votacao)
+        
+        # Todos os votos da votação (~513) em um único comando
+        votos = [
+            [voto['deputado_id'], codificar_voto(voto['tipo_voto'])]
+            for voto in vote_data.get('votos_deputados', [])
+        ]
+        if votos:
+            escritor.adicionar(SQL_INSERIR_VOTOS, (vote_data['id'], json.dumps(votos)))
+        
+        orientacoes = [
+            [orientacao['sigla'], orientacao['tipo_lideranca'], codificar_voto(orientacao['orientacao'])]
+            for orientacao in vote_data.get('orientacoes', [])
+        ]
+        if orientacoes:
+            escritor.adicionar(SQL_INSERIR_ORIENTACOES, (vote_data['id'], json.dumps(orientacoes)))
+        
         return True
         
-    except sqlite3.Error as e:
-        logger.error(f"Erro ao salvar votação {vote_data['id']} no banco: {e}")
+    except KeyError as e:
+        logger.error(f"Erro ao preparar votação {vote_data.get('id')} para o banco: {e}")
         return False
-    finally:
-        conn.close()
 
 
-def coletar_votacoes_historico(anos_historico=5, teste_modo=False, max_votes_teste=50):
+def meses_votacoes(anos_historico):
+    """Janelas mensais (ano, mes, início, fim) dos últimos N anos até hoje"""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=anos_historico * 365)
+    
+    ano, mes = start_date.year, start_date.month
+    while (ano, mes) <= (end_date.year, end_date.month):
+        inicio = datetime(ano, mes, 1)
+        fim = min(datetime(ano, mes, calendar.monthrange(ano, mes)[1]), end_date)
+        yield ano, mes, inicio, fim
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+
+def coletar_votacoes_mes(escritor, executor, checkpoints, ano, mes, inicio, fim, limite=None, parar=None):
+    """
+    Coleta um mês de votações, página a página, pulando as páginas já marcadas.
+    
+    Em meses encerrados, cada página gravada por inteiro é marcada junto com
+    os dados e, com a listagem esgotada sem falhas, o mês inteiro também.
+    
+    Args:
+        limite (int): Máximo de votações a gravar (modo teste; None = todas).
+        parar (threading.Event): Sinalizado para encerrar antes da próxima página.
+    
+    Returns:
+        tuple: (votações gravadas, True se o mês foi percorrido sem falhas)
+    """
+    # O mês corrente ainda recebe votações: nada dele é marcado
+    encerrado = (ano, mes) < (datetime.now().year, datetime.now().month)
+    
+    gravadas = 0
+    completo = True
+    page = 1
+    while True:
+        if parar is not None and parar.is_set():
+            return gravadas, False
+        
+        if encerrado and checkpoints.concluido(ano, mes, f'pagina {page}'):
+            page += 1
+            continue
+        
+        votes = fetch_votes_by_period(inicio, fim, page=page)
+        
+        if votes is None:
+            # Mês incompleto: as páginas restantes voltam na próxima execução
+            return gravadas, False
+        
+        if not votes:
+            break
+        
+        if limite is not None:
+            votes = votes[:max(0, limite - gravadas)]
+        
+        # Detalhes, votos e orientações da página inteira em paralelo
+        votos_pagina = 0
+        registros, falhas = enriquecer_votacoes([vote['id'] for vote in votes], executor)
+        if falhas:
+            logger.warning(f"  {len(falhas)} votações da página {page} com falha na API: a página será revista")
+        for details in registros:
+            if save_vote_to_db(escritor, details):
+                votos_pagina += 1
+                logger.debug(f"  Votação {details['id']} salva.")
+            else:
+                logger.warning(f"  Falha ao salvar votação {details['id']}")
+        gravadas += votos_pagina
+        
+        # Votações, votos, orientações e a marca da página em uma única transação
+        if falhas or votos_pagina < len(votes):
+            completo = False
+        elif encerrado:
+            checkpoints.marcar(escritor, ano, mes, f'pagina {page}', votos_pagina)
+        escritor.flush()
+        
+        if limite is not None and gravadas >= limite:
+            return gravadas, False
+        
+        page += 1
+    
+    # O mês só é marcado se todas as páginas foram gravadas por inteiro
+    if completo and encerrado:
+        checkpoints.marcar(escritor, ano, mes)
+        escritor.flush()
+    
+    return gravadas, completo
+
+
+def coletar_votacoes_historico(anos_historico=5, teste_modo=False, max_votes_teste=50, destino=None,
+                               paralelo=CAMARA_ENRIQUECIMENTO_PARALELO, parar=None):
     """
     Coleta votações históricas e salva no banco de dados.
     
+    A coleta anda por meses do calendário (coletar_votacoes_mes). Em meses
+    já encerrados a listagem não muda, então cada página gravada e cada mês
+    esgotado ficam em checkpoints_coleta e são pulados ao retomar.
+    
     Args:
         anos_historico (int): Quantidade de anos para buscar dados.
         teste_modo (bool): Se True, coleta apenas um número limitado de votações.
         max_votes_teste (int): Número máximo de votações para coletar em modo teste.
+        destino (EscritorDedicado): Escritor compartilhado (None = conexão própria).
+        paralelo (int): Requisições simultâneas no enriquecimento de cada página.
+        parar (threading.Event): Sinalizado para encerrar na próxima página (Ctrl+C).
     """
     logger.info(f"--- Iniciando coleta histórica de Votações ({anos_historico} anos) ---")
     
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=anos_historico * 365)
-    
     total_votes_coletadas = 0
-    current_date = start_date
-    
-    # Coletar em chunks de 3 meses para evitar sobrecarga
-    while current_date < end_date:
-        chunk_end = min(current_date + timedelta(days=90), end_date)
-        
-        logger.info(f"Coletando votações de {current_date.strftime('%Y-%m-%d')} até {chunk_end.strftime('%Y-%m-%d')}...")
-        
-        page = 1
-        while True:
-            votes = fetch_votes_by_period(current_date, chunk_end, page=page)
-            
-            if not votes:
-                break
-            
-            if teste_modo and total_votes_coletadas >= max_votes_teste:
-                logger.info(f"Modo teste: Limite de {max_votes_teste} votações atingido.")
-                return
-            
-            for vote_summary in votes:
-                if teste_modo and total_votes_coletadas >= max_votes_teste:
-                    break
-                
-                details = fetch_vote_details(vote_summary['id'])
-                if details:
-                    if save_vote_to_db(details):
-                        total_votes_coletadas += 1
-                        logger.debug(f"  Votação {details['id']} salva. Total: {total_votes_coletadas}")
-                    else:
-                        logger.warning(f"  Falha ao salvar votação {details['id']}")
-                
-                time.sleep(0.15)  # Delay para respeitar rate limit
-            
-            if teste_modo and total_votes_coletadas >= max_votes_teste:
-                break
-            
-            page += 1
-            time.sleep(0.5)
+    
+    # Uma conexão para toda a coleta (ou o escritor dedicado); cada página vira um lote
+    escritor = EscritorLotes(destino=destino)
+    
+    # Páginas e meses completos de execuções anteriores (o modo teste não registra)
+    checkpoints = Checkpoints('votacoes', ativo=not teste_modo)
+    
+    # Workers do enriquecimento contam requisições no fluxo de quem os criou
+    executor = ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='votacoes-enriquecimento',
+                                  initializer=definir_fluxo, initargs=(fluxo_atual(),))
+    
+    for ano, mes, inicio, fim in meses_votacoes(anos_historico):
+        if parar is not None and parar.is_set():
+            logger.warning("⏹️ Coleta de votações interrompida")
+            break
+        
+        if checkpoints.concluido(ano, mes):
+            logger.info(f"⏩ {mes:02d}/{ano}: já coletado")
+            continue
+        
+        logger.info(f"Coletando votações de {inicio.strftime('%Y-%m-%d')} até {fim.strftime('%Y-%m-%d')}...")
+        
+        limite = max_votes_teste - total_votes_coletadas if teste_modo else None
+        gravadas, _ = coletar_votacoes_mes(escritor, executor, checkpoints, ano, mes, inicio, fim, limite, parar)
+        total_votes_coletadas += gravadas
+        
+        if teste_modo and total_votes_coletadas >= max_votes_teste:
+            logger.info(f"Modo teste: Limite de {max_votes_teste} votações atingido.")
+            break
         
         logger.info(f"  {total_votes_coletadas} votações coletadas até agora.")
-        current_date = chunk_end
     
-    logger.info(f"--- Coleta histórica de Votações finalizada. Total: {total_votes_coletadas} votações ---")
+    executor.shutdown()
+    escritor.close()
+    logger.info(f"--- Coleta histórica de Votações finalizada. Total: {total_votes_coletadas} votações "
+                f"({checkpoints.pulados} unidades já concluídas puladas) ---")
 
 
 if __name__ == '__main__':
@@ -234,13 +398,16 @@ if __name__ == '__main__':
     parser.add_argument('--anos', type=int, default=5, help='Número de anos para coletar (padrão: 5)')
     parser.add_argument('--teste', action='store_true', help='Modo teste: coleta apenas 50 votações')
     parser.add_argument('--max-teste', type=int, default=50, help='Máximo de votações em modo teste')
+    parser.add_argument('--paralelo', type=int, default=CAMARA_ENRIQUECIMENTO_PARALELO,
+                        help=f'Requisições simultâneas no enriquecimento (padrão: {CAMARA_ENRIQUECIMENTO_PARALELO})')
     
     args = parser.parse_args()
     
     if args.teste:
         logger.info("=== MODO TESTE ATIVADO ===")
-        coletar_votacoes_historico(anos_historico=1, teste_modo=True, max_votes_teste=args.max_teste)
+        coletar_votacoes_historico(anos_historico=1, teste_modo=True, max_votes_teste=args.max_teste,
+                                   paralelo=args.paralelo)
     else:
         logger.info("=== MODO COMPLETO ===")
-        coletar_votacoes_historico(anos_historico=args.anos)
+        coletar_votacoes_historico(anos_historico=args.anos, paralelo=args.paralelo)
 
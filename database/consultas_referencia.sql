@@ -0,0 +1,290 @@
+-- ============================================
+-- Consultas de referência - Monitor PL Brasil
+-- ============================================
+-- Carga usada por database/consultor_indices.py: cada consulta começa com
+-- "-- consulta: <nome>" e, opcionalmente, "-- origem: <quem a executa>".
+-- Parâmetros aparecem como valores literais típicos. Ao criar uma consulta
+-- nova no chat, no dashboard ou nos bots, acrescente-a aqui.
+--
+-- As buscas feitas na ingestão (coletores, workers, escritor e triggers)
+-- também entram: sem elas, índices que só a gravação usa apareceriam como
+-- sem uso. O consultor executa cada consulta, então UPDATE e DELETE são
+-- escritos como o SELECT com o mesmo WHERE.
+
+-- ==================== CHAT (exemplos do system prompt) ====================
+
+-- consulta: chat_top_gastadores
+-- origem: dashboard/app/api/chat/route.ts
+SELECT d.nome, SUM(g.valor_liquido) as total
+FROM deputados d JOIN gastos g ON d.id = g.deputado_id
+GROUP BY d.id ORDER BY total DESC LIMIT 10;
+
+-- consulta: chat_pls_por_categoria
+-- origem: dashboard/app/api/chat/route.ts
+SELECT categoria, COUNT(*) as total FROM projetos_lei GROUP BY categoria ORDER BY total DESC;
+
+-- consulta: chat_gastos_por_tipo
+-- origem: dashboard/app/api/chat/route.ts
+SELECT t.descricao, SUM(g.valor_liquido) as total
+FROM gastos g JOIN tipos_despesa t ON t.id = g.tipo_despesa_id
+GROUP BY g.tipo_despesa_id ORDER BY total DESC;
+
+-- consulta: chat_estatisticas_gerais
+-- origem: dashboard/app/api/chat/route.ts, init_db.get_statistics
+SELECT * FROM vw_estatisticas_gerais;
+
+-- consulta: chat_cota_mes
+-- origem: dashboard/app/api/chat/route.ts
+SELECT nome, uf, gasto, limite, percentual FROM vw_cota_utilizacao
+WHERE ano = 2024 AND mes = 3 ORDER BY percentual DESC LIMIT 10;
+
+-- consulta: chat_busca_textual
+-- origem: dashboard/app/api/chat/route.ts
+SELECT p.numero, p.ano, snippet(busca_pls, 0, '[', ']', '…', 16) as trecho
+FROM busca_pls JOIN projetos_lei p ON p.id = busca_pls.rowid
+WHERE busca_pls MATCH 'reforma tributaria' AND p.ano = 2024
+ORDER BY bm25(busca_pls) LIMIT 10;
+
+-- ==================== CHAT (perguntas frequentes) ====================
+
+-- consulta: chat_gastos_deputado_ano
+-- origem: chat (gastos de um deputado por mês)
+SELECT mes, SUM(valor_liquido) AS total
+FROM gastos
+WHERE deputado_id = 204554 AND ano = 2024
+GROUP BY mes ORDER BY mes;
+
+-- consulta: chat_gastos_partido
+-- origem: chat (gastos por partido no ano)
+SELECT d.partido, SUM(g.valor_liquido) AS total
+FROM gastos g JOIN deputados d ON d.id = g.deputado_id
+WHERE g.ano = 2024
+GROUP BY d.partido ORDER BY total DESC;
+
+-- consulta: chat_pls_recentes_categoria
+-- origem: chat (últimos PLs de uma categoria)
+SELECT numero, ano, ementa, status
+FROM projetos_lei
+WHERE categoria = 'saude'
+ORDER BY data_apresentacao DESC LIMIT 20;
+
+-- consulta: chat_votacoes_periodo
+-- origem: chat (votações aprovadas no período)
+SELECT id, data, descricao
+FROM votacoes
+WHERE data >= '2024-01-01' AND data < '2024-07-01' AND aprovacao = 1
+ORDER BY data DESC;
+
+-- consulta: chat_votos_deputado
+-- origem: chat (como um deputado votou)
+SELECT votacao_id, voto FROM vw_votos_deputados
+WHERE deputado_id = 204554 ORDER BY votacao_id DESC LIMIT 50;
+
+-- ==================== VIEWS ====================
+
+-- consulta: ranking_gastos_12m
+-- origem: vw_ranking_gastos_12m (ranking do bot e do dashboard)
+SELECT * FROM vw_ranking_gastos_12m LIMIT 10;
+
+-- consulta: pls_categoria_ano
+-- origem: vw_pls_por_categoria_ano
+SELECT * FROM vw_pls_por_categoria_ano WHERE ano = 2024;
+
+-- consulta: taxa_aprovacao_votacoes
+-- origem: vw_taxa_aprovacao_votacoes
+SELECT * FROM vw_taxa_aprovacao_votacoes;
+
+-- ==================== BOTS E MÓDULOS ====================
+
+-- consulta: autores_do_projeto
+-- origem: autorias.autores_do_projeto (thread de PLs)
+SELECT nome, partido, uf FROM vw_autorias WHERE proposicao_id = 2345678 ORDER BY ordem;
+
+-- consulta: projetos_do_deputado
+-- origem: autorias.projetos_do_deputado
+SELECT p.id, p.numero, p.ano, a.ordem, p.categoria, p.status, p.ementa
+FROM autorias a
+JOIN projetos_lei p ON p.id = a.proposicao_id
+WHERE a.deputado_id = 204554
+ORDER BY p.ano DESC, p.id DESC;
+
+-- consulta: producao_deputados
+-- origem: autorias.producao_deputados
+SELECT a.deputado_id, d.nome, d.partido, d.uf, COUNT(*) AS pls, SUM(a.ordem = 1) AS primeiro_autor
+FROM autorias a
+JOIN deputados d ON d.id = a.deputado_id
+GROUP BY a.deputado_id
+ORDER BY pls DESC
+LIMIT 20;
+
+-- consulta: linha_do_tempo
+-- origem: tramitacoes.linha_do_tempo
+SELECT sequencia, data_hora, orgao, descricao, situacao, despacho
+FROM vw_tramitacoes WHERE proposicao_id = 2345678 ORDER BY sequencia;
+
+-- consulta: tramitacoes_pendentes
+-- origem: tramitacoes.proposicoes_pendentes
+SELECT id FROM projetos_lei WHERE id NOT IN (SELECT proposicao_id FROM tramitacoes)
+UNION ALL
+SELECT id FROM medidas_provisorias WHERE id NOT IN (SELECT proposicao_id FROM tramitacoes);
+
+-- consulta: pls_sem_autoria
+-- origem: autorias.pls_sem_autoria
+SELECT id FROM projetos_lei WHERE id NOT IN (SELECT proposicao_id FROM autorias);
+
+-- consulta: ranking_cota
+-- origem: cota.ranking_utilizacao
+SELECT c.deputado_id, d.nome, d.partido, d.uf, c.gasto, c.limite, c.percentual
+FROM cota_utilizacao c
+JOIN deputados d ON d.id = c.deputado_id
+WHERE c.ano = 2024 AND c.mes = 3 AND c.limite IS NOT NULL AND ('SP' IS NULL OR d.uf = 'SP')
+ORDER BY c.percentual DESC
+LIMIT 10;
+
+-- consulta: top_fornecedores_ano
+-- origem: fornecedores.top_fornecedores
+SELECT f.id, f.documento, f.nome, SUM(t.total_liquido) AS total_liquido, SUM(t.quantidade) AS quantidade
+FROM fornecedor_totais t
+JOIN fornecedores f ON f.id = t.fornecedor_id
+WHERE t.ano = 2024
+GROUP BY f.id
+ORDER BY total_liquido DESC
+LIMIT 10;
+
+-- consulta: fornecedores_compartilhados
+-- origem: grafo_fornecedores.fornecedores_compartilhados
+SELECT f.id, f.documento, f.nome, COUNT(DISTINCT t.deputado_id) AS deputados
+FROM fornecedor_totais t
+JOIN fornecedores f ON f.id = t.fornecedor_id
+WHERE t.quantidade > 0
+GROUP BY t.fornecedor_id
+ORDER BY deputados DESC
+LIMIT 20;
+
+-- consulta: vizinhos_deputado
+-- origem: grafo_fornecedores.vizinhos_deputado
+SELECT CASE WHEN a.origem_id = 204554 THEN a.destino_id ELSE a.origem_id END AS deputado_id,
+       d.nome, d.partido, d.uf, a.peso
+FROM grafo_arestas a
+LEFT JOIN deputados d ON d.id = CASE WHEN a.origem_id = 204554 THEN a.destino_id ELSE a.origem_id END
+WHERE a.tipo = 'deputado' AND (a.origem_id = 204554 OR a.destino_id = 204554)
+ORDER BY a.peso DESC
+LIMIT 20;
+
+-- consulta: eventos_deputado
+-- origem: watchlist (eventos recentes de um deputado)
+SELECT tipo, chave, dados, criado_em FROM eventos
+WHERE deputado_id = 204554 ORDER BY criado_em DESC LIMIT 20;
+
+-- consulta: noticias_recentes_fonte
+-- origem: chat (últimas notícias de uma fonte)
+SELECT titulo, link, data_publicacao FROM noticias
+WHERE fonte = 'g1' ORDER BY data_publicacao DESC LIMIT 20;
+
+-- consulta: ultima_data_pls
+-- origem: sincronizacao.ler_marca (banco sem marca d'água)
+SELECT MAX(data_apresentacao) FROM projetos_lei;
+
+-- consulta: shard_pendente
+-- origem: leases.reivindicar
+SELECT entidade, shard FROM work_leases
+WHERE entidade IN ('gastos', 'pls')
+  AND (status = 'pending' OR (status = 'leased' AND expira_em < 1767225600))
+ORDER BY tentativas, shard, entidade
+LIMIT 1;
+
+-- consulta: historico_pipeline
+-- origem: pipeline.historico
+SELECT etapa, status, duracao_segundos, requisicoes, iniciado_em
+FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY etapa ORDER BY id DESC) AS ordem
+    FROM pipeline_execucoes
+)
+WHERE ordem <= 5
+ORDER BY etapa, ordem;
+
+-- ==================== INGESTÃO (coletores, workers e triggers) ====================
+
+-- consulta: leases_esgotados
+-- origem: leases.reivindicar (UPDATE que marca 'error')
+SELECT entidade, shard FROM work_leases
+WHERE entidade IN ('gastos', 'pls') AND status = 'leased' AND expira_em < 1767225600 AND tentativas >= 3;
+
+-- consulta: leases_em_andamento
+-- origem: leases.em_andamento
+SELECT COUNT(*) FROM work_leases
+WHERE entidade IN ('gastos', 'pls') AND status = 'leased' AND expira_em >= 1767225600;
+
+-- consulta: renovar_lease
+-- origem: leases.renovar, leases.liberar, leases.concluir (UPDATE)
+SELECT expira_em FROM work_leases
+WHERE entidade = 'gastos' AND shard = '2024-03:204554-204600' AND worker = 'host:1234' AND status = 'leased';
+
+-- consulta: checkpoints_entidade
+-- origem: checkpoints.Checkpoints
+SELECT ano, mes, unidade FROM checkpoints_coleta WHERE entidade = 'gastos';
+
+-- consulta: fornecedor_por_chave
+-- origem: fornecedores.obter_fornecedor_id (preparador de gastos)
+SELECT id FROM fornecedores WHERE chave = '11222333000181';
+
+-- consulta: dimensao_tipo_despesa
+-- origem: dimensoes.Dimensao.obter_id (preparador de gastos)
+SELECT id FROM tipos_despesa WHERE descricao = 'COMBUSTÍVEIS E LUBRIFICANTES';
+
+-- consulta: totais_fornecedor_gasto
+-- origem: triggers gastos_fornecedor_delete/update (UPDATE fornecedor_totais)
+SELECT total_liquido, quantidade FROM fornecedor_totais
+WHERE fornecedor_id = 1 AND deputado_id = 204554 AND ano = 2024 AND tipo_despesa_id = 1;
+
+-- consulta: cota_mes_deputado
+-- origem: triggers gastos_cota_delete/update (UPDATE cota_utilizacao)
+SELECT gasto FROM cota_utilizacao WHERE deputado_id = 204554 AND ano = 2024 AND mes = 3;
+
+-- consulta: limite_cota_vigente
+-- origem: triggers gastos_cota_insert/update
+SELECT l.valor_mensal
+FROM deputados d
+JOIN cota_limites l ON l.uf = d.uf
+WHERE d.id = 204554
+  AND l.vigencia_inicio <= '2024-03-01'
+  AND (l.vigencia_fim IS NULL OR l.vigencia_fim >= '2024-03-01')
+ORDER BY l.vigencia_inicio DESC
+LIMIT 1;
+
+-- consulta: ultima_despesa_mes
+-- origem: triggers gastos_resumo_delete/update
+SELECT MAX(data_documento) FROM gastos
+WHERE deputado_id = 204554 AND data_documento >= '2024-03' AND data_documento < '2024-03~';
+
+-- consulta: ultimas_tramitacoes
+-- origem: tramitacoes.ultimas_tramitacoes
+SELECT proposicao_id, MAX(sequencia), MAX(data_hora)
+FROM tramitacoes
+WHERE proposicao_id IN (2345678, 2345679)
+GROUP BY proposicao_id;
+
+-- consulta: votacoes_conhecidas_com_votos
+-- origem: sincronizacao.sincronizar_votacoes
+SELECT id FROM votacoes v
+WHERE id IN ('2345678-10', '2345678-12')
+  AND EXISTS (SELECT 1 FROM votos_deputados WHERE votacao_id = v.id);
+
+-- consulta: marca_dagua
+-- origem: sincronizacao.ler_marca
+SELECT ultima_data, ultimo_id FROM sync_watermarks WHERE entidade = 'votacoes';
+
+-- consulta: evento_visto
+-- origem: watchlist.verificar_votacoes
+SELECT 1 FROM eventos WHERE tipo = 'votacao' AND chave = '2345678-10';
+
+-- consulta: validadores_http
+-- origem: watchlist.ClienteCondicional.get_json
+SELECT etag, last_modified FROM http_cache
+WHERE url = 'https://dadosabertos.camara.leg.br/api/v2/deputados/204554/despesas?ano=2024&mes=3';
+
+-- consulta: ultima_assinatura_etapa
+-- origem: pipeline.ultima_assinatura
+SELECT assinatura_entradas FROM pipeline_execucoes
+WHERE etapa = 'gastos' AND status = 'ok'
+ORDER BY id DESC LIMIT 1;
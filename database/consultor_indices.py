@@ -0,0 +1,379 @@
+"""
+Consultor de Índices
+Roda EXPLAIN QUERY PLAN e mede as consultas de referência
+(consultas_referencia.sql): aponta varreduras completas e B-trees
+temporárias, propõe índices compostos/cobrindo medindo o tempo antes e
+depois, e lista os índices que nenhuma consulta usa (só custam na ingestão)
+"""
+import logging
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import DATABASE_DIR, get_connection
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CARGA_PADRAO = DATABASE_DIR / 'consultas_referencia.sql'
+
+# Varreduras em tabelas menores que isso não são apontadas (dimensões, controle)
+LINHAS_MINIMAS = 1000
+
+# Colunas de um índice proposto; acima disso, cobrir a consulta não compensa a escrita
+COLUNAS_MAXIMAS = 5
+
+# Redução mínima do tempo para um índice proposto ser recomendado, e o tempo
+# abaixo do qual a consulta já é rápida demais para a medição diferenciar
+GANHO_MINIMO = 0.2
+TEMPO_MINIMO_MS = 1.0
+
+_CABECALHO_RE = re.compile(r'^--\s*(consulta|origem):\s*(.+?)\s*$')
+_TABELA_RE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_VIEW_RE = re.compile(r'\bvw_\w+')
+_ORDENACAO_RE = re.compile(r'\b(?:GROUP|ORDER)\s+BY\s+(.+?)(?=\bLIMIT\b|\bHAVING\b|\bORDER\b|\)|;|$)',
+                           re.IGNORECASE | re.DOTALL)
+_INDICE_USADO_RE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+_SUBCONSULTA_RE = re.compile(r'^(?:MATERIALIZE|CO-ROUTINE) (\w+)')
+
+# Palavras que podem seguir o nome da tabela em FROM/JOIN sem serem alias
+_PALAVRAS_SQL = {
+    'where', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'natural', 'on', 'using',
+    'group', 'order', 'limit', 'having', 'union', 'as', 'window', 'except', 'intersect',
+}
+
+
+def ler_carga(caminho=CARGA_PADRAO):
+    """
+    Lê o arquivo de consultas de referência.
+
+    Returns:
+        list: Dicts (nome, origem, sql), na ordem do arquivo
+    """
+    consultas = []
+    atual = None
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            cabecalho = _CABECALHO_RE.match(linha.strip())
+            if cabecalho and cabecalho.group(1) == 'consulta':
+                atual = {'nome': cabecalho.group(2), 'origem': '', 'sql': ''}
+                consultas.append(atual)
+            elif cabecalho and atual is not None:
+                atual['origem'] = cabecalho.group(2)
+            elif atual is not None and not linha.lstrip().startswith('--'):
+                atual['sql'] += linha
+
+    for consulta in consultas:
+        consulta['sql'] = consulta['sql'].strip().rstrip(';').strip()
+    return [consulta for consulta in consultas if consulta['sql']]
+
+
+def plano(conn, sql):
+    """Detalhes do EXPLAIN QUERY PLAN, um por passo"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+
+
+def medir(conn, sql, repeticoes=5):
+    """Mediana do tempo (em ms) de executar e ler a consulta inteira, após um aquecimento"""
+    conn.execute(sql).fetchall()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        conn.execute(sql).fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+class Consultor:
+    """
+    Analisa as consultas de uma carga sobre uma conexão.
+
+    Índices propostos são criados dentro de um SAVEPOINT e desfeitos após a
+    medição: o banco não muda, mas a escrita fica bloqueada enquanto cada
+    índice é construído (em produção, rode sobre uma cópia do banco).
+    """
+
+    def __init__(self, conn, repeticoes=5):
+        self.conn = conn
+        self.repeticoes = repeticoes
+        self._linhas = {}
+        self.tabelas = {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'"
+            )
+        }
+        self.views = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'").fetchall())
+
+    def linhas(self, tabela):
+        """Quantidade de linhas da tabela (contada uma vez)"""
+        if tabela not in self._linhas:
+            self._linhas[tabela] = self.conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+        return self._linhas[tabela]
+
+    def texto_expandido(self, sql):
+        """A consulta seguida da definição das views que ela lê (recursivamente)"""
+        partes, vistas = [sql], set()
+        for parte in partes:
+            for view in _VIEW_RE.findall(parte):
+                if view in self.views and view not in vistas:
+                    vistas.add(view)
+                    partes.append(self.views[view])
+        return '\n'.join(partes)
+
+    def apelidos(self, texto):
+        """{nome no plano: tabela} para tabelas e aliases de FROM/JOIN (o primeiro alias vence)"""
+        apelidos = {}
+        for tabela, alias in _TABELA_RE.findall(texto):
+            if tabela not in self.tabelas:
+                continue
+            apelidos.setdefault(tabela, tabela)
+            if alias and alias.lower() not in _PALAVRAS_SQL:
+                apelidos.setdefault(alias, tabela)
+        return apelidos
+
+    def colunas(self, tabela):
+        """Colunas da tabela, exceto a INTEGER PRIMARY KEY (é o próprio rowid)"""
+        info = self.conn.execute(f"PRAGMA table_info({tabela})").fetchall()
+        rowid = [row[1] for row in info if row[5] and row[2].upper() == 'INTEGER']
+        if len(rowid) == 1 and sum(1 for row in info if row[5]) == 1:
+            return [row[1] for row in info if row[1] != rowid[0]]
+        return [row[1] for row in info]
+
+    def indices_da_tabela(self, tabela):
+        """{nome: colunas} dos índices da tabela"""
+        return {
+            row[1]: [info[2] for info in self.conn.execute(f"PRAGMA index_info({row[1]})")]
+            for row in self.conn.execute(f"PRAGMA index_list({tabela})")
+        }
+
+    def propor_indice(self, texto, tabela, apelido):
+        """
+        Índice candidato para a varredura de `tabela` (referida como `apelido`).
+
+        Colunas comparadas por igualdade (inclusive em JOIN ... ON) vêm
+        primeiro, depois as de GROUP BY/ORDER BY e a primeira comparada por
+        faixa; as demais colunas lidas completam o índice para cobrir a
+        consulta enquanto couberem em COLUNAS_MAXIMAS.
+
+        Returns:
+            list: Colunas do índice, ou None sem filtro nem ordenação aproveitáveis
+        """
+        prefixo = rf'\b{apelido}\.' if apelido != tabela else rf'(?:(?<![\w.])|\b{tabela}\.)'
+        ordenacao = ' '.join(_ORDENACAO_RE.findall(texto))
+
+        igualdade, ordem, faixa, lidas = [], [], [], []
+        for coluna in self.colunas(tabela):
+            referencia = rf'{prefixo}{coluna}\b'
+            if not re.search(referencia, texto):
+                continue
+            lidas.append(coluna)
+            if re.search(rf'{referencia}\s*(?:(?<![<>!])=|IN\s*\(|IS\s+(?!NOT))', texto, re.IGNORECASE) \
+                    or re.search(rf'(?<![<>!])=\s*{referencia}', texto):
+                igualdade.append(coluna)
+            elif re.search(referencia, ordenacao):
+                ordem.append(coluna)
+            elif re.search(rf'{referencia}\s*(?:[<>]|BETWEEN\b|LIKE\b)|[<>]=?\s*{referencia}', texto, re.IGNORECASE):
+                faixa.append(coluna)
+
+        # Ordenação na ordem em que aparece na cláusula
+        ordem.sort(key=lambda coluna: re.search(rf'{prefixo}{coluna}\b', ordenacao).start())
+        proposta = igualdade + ordem + faixa[:1]
+        if not proposta:
+            return None
+
+        restantes = [coluna for coluna in lidas if coluna not in proposta]
+        if len(proposta) + len(restantes) <= COLUNAS_MAXIMAS:
+            proposta += restantes
+
+        # Um índice existente com as mesmas colunas iniciais já foi preterido pelo planejador
+        for colunas_existentes in self.indices_da_tabela(tabela).values():
+            if colunas_existentes[:len(proposta)] == proposta:
+                return None
+        return proposta
+
+    def medir_proposta(self, sql, tabela, colunas):
+        """
+        Cria o índice num SAVEPOINT, refaz plano e medição e desfaz o índice.
+
+        Uma proposta que não pode ser criada (ex.: nome truncado igual ao de
+        um índice existente) volta com o erro, sem interromper o relatório.
+
+        Returns:
+            tuple: (comando CREATE INDEX, índice usado no plano, tempo em ms, erro)
+        """
+        nome = f"idx_{tabela}_{'_'.join(colunas)}"[:64]
+        comando = f"CREATE INDEX {nome} ON {tabela}({', '.join(colunas)})"
+        usado, tempo, erro = False, None, None
+
+        self.conn.execute("SAVEPOINT consultor_indices")
+        try:
+            self.conn.execute(comando)
+            usado = any(nome in detalhe for detalhe in plano(self.conn, sql))
+            tempo = medir(self.conn, sql, self.repeticoes) if usado else None
+        except sqlite3.Error as e:
+            usado, tempo, erro = False, None, str(e)
+        finally:
+            self.conn.execute("ROLLBACK TO consultor_indices")
+            self.conn.execute("RELEASE consultor_indices")
+
+        return comando, usado, tempo, erro
+
+    def analisar(self, consulta, propor=True):
+        """
+        Plano, tempo, achados e propostas de uma consulta.
+
+        Returns:
+            dict: nome, origem, tempo_ms, plano, achados (textos), indices_usados,
+                propostas (dicts comando, tabela, tempo_ms, ganho, recomendado, erro) e erro
+        """
+        sql = consulta['sql']
+        resultado = dict(consulta, tempo_ms=None, plano=[], achados=[], indices_usados=set(),
+                         propostas=[], erro=None)
+        try:
+            resultado['plano'] = plano(self.conn, sql)
+            resultado['tempo_ms'] = medir(self.conn, sql, self.repeticoes)
+        except sqlite3.Error as e:
+            resultado['erro'] = str(e)
+            return resultado
+
+        texto = self.texto_expandido(sql)
+        apelidos = self.apelidos(texto)
+        subconsultas = {m.group(1) for m in map(_SUBCONSULTA_RE.match, resultado['plano']) if m}
+
+        varreduras = []
+        for detalhe in resultado['plano']:
+            resultado['indices_usados'].update(_INDICE_USADO_RE.findall(detalhe))
+            if detalhe.startswith('USE TEMP B-TREE'):
+                resultado['achados'].append(detalhe)
+            elif detalhe.startswith('SCAN ') and 'VIRTUAL TABLE' not in detalhe:
+                apelido = detalhe.split()[1]
+                tabela = apelidos.get(apelido)
+                if apelido in subconsultas or tabela is None or self.linhas(tabela) < LINHAS_MINIMAS:
+                    continue
+                resultado['achados'].append(f"{detalhe} ({tabela}: {self.linhas(tabela)} linhas)")
+                varreduras.append((tabela, apelido))
+
+        if not propor:
+            return resultado
+
+        for tabela, apelido in dict.fromkeys(varreduras):
+            colunas = self.propor_indice(texto, tabela, apelido)
+            if not colunas:
+                continue
+            comando, usado, tempo, erro = self.medir_proposta(sql, tabela, colunas)
+            ganho = 1 - tempo / resultado['tempo_ms'] if usado and resultado['tempo_ms'] else 0.0
+            resultado['propostas'].append({
+                'comando': comando,
+                'tabela': tabela,
+                'tempo_ms': tempo,
+                'ganho': ganho,
+                'recomendado': usado and ganho >= GANHO_MINIMO and resultado['tempo_ms'] >= TEMPO_MINIMO_MS,
+                'erro': erro,
+            })
+
+        return resultado
+
+    def indices_sem_uso(self, usados):
+        """
+        Índices secundários que nenhum plano da carga usou.
+
+        Índices UNIQUE ficam de fora: garantem a chave natural das
+        gravações mesmo sem aparecer em consultas.
+
+        Returns:
+            list: Tuplas (índice, tabela, linhas da tabela, índices na tabela)
+        """
+        sem_uso = []
+        for nome, tabela in self.conn.execute("""
+            SELECT name, tbl_name FROM sqlite_master
+            WHERE type = 'index' AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%'
+            ORDER BY tbl_name, name
+        """).fetchall():
+            if nome not in usados:
+                sem_uso.append((nome, tabela, self.linhas(tabela), len(self.indices_da_tabela(tabela))))
+        return sem_uso
+
+
+def consultar(conn, consultas, repeticoes=5, propor=True):
+    """
+    Analisa a carga inteira.
+
+    Returns:
+        tuple: (resultados por consulta, índices sem uso)
+    """
+    consultor = Consultor(conn, repeticoes)
+    resultados = []
+    for consulta in consultas:
+        logger.info(f"🔍 {consulta['nome']}")
+        resultados.append(consultor.analisar(consulta, propor))
+
+    usados = set().union(*(resultado['indices_usados'] for resultado in resultados))
+    return resultados, consultor.indices_sem_uso(usados)
+
+
+def mostrar_relatorio(resultados, sem_uso, mostrar_planos=False):
+    """Relatório das consultas, propostas medidas e índices sem uso"""
+    print("\n📋 CONSULTAS")
+    for resultado in sorted(resultados, key=lambda r: -(r['tempo_ms'] or 0)):
+        if resultado['erro']:
+            print(f"   ❌ {resultado['nome']}: {resultado['erro']}")
+            continue
+        marca = '⚠️ ' if resultado['achados'] else '✅'
+        print(f"   {marca} {resultado['nome']:<30} {resultado['tempo_ms']:>9.2f} ms   ({resultado['origem']})")
+        for detalhe in resultado['plano'] if mostrar_planos else []:
+            print(f"         │ {detalhe}")
+        for achado in resultado['achados']:
+            print(f"         → {achado}")
+
+    propostas = [(resultado, proposta) for resultado in resultados for proposta in resultado['propostas']]
+    print("\n🧱 ÍNDICES PROPOSTOS (medidos antes/depois, não aplicados)")
+    if not propostas:
+        print("   Nenhum")
+    for resultado, proposta in propostas:
+        if proposta['erro']:
+            print(f"   ❌ {proposta['comando']}: {proposta['erro']} ({resultado['nome']})")
+            continue
+        if proposta['tempo_ms'] is None:
+            print(f"   ⏭️  {proposta['comando']}: o planejador não usou ({resultado['nome']})")
+            continue
+        marca = '✅' if proposta['recomendado'] else '➖'
+        print(f"   {marca} {proposta['comando']};")
+        efeito = 'mais rápido' if proposta['ganho'] >= 0 else 'mais lento'
+        print(f"         {resultado['nome']}: {resultado['tempo_ms']:.2f} ms → {proposta['tempo_ms']:.2f} ms "
+              f"({abs(proposta['ganho']):.0%} {efeito})")
+
+    print("\n🗑️  ÍNDICES SEM USO NA CARGA (custam uma escrita de B-tree por INSERT/UPDATE)")
+    if not sem_uso:
+        print("   Nenhum")
+    for nome, tabela, linhas, total in sem_uso:
+        print(f"   {nome:<34} {tabela} ({linhas} linhas, {total} índices na tabela)")
+    if sem_uso:
+        print("   Antes de remover, confira se o índice não serve a consultas fora da carga.")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='EXPLAIN QUERY PLAN e índices das consultas de referência')
+    parser.add_argument('--carga', default=str(CARGA_PADRAO),
+                        help='Arquivo de consultas (padrão: database/consultas_referencia.sql)')
+    parser.add_argument('--consultas', nargs='+', help='Só as consultas com estes nomes')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Execuções medidas por consulta (padrão: 5)')
+    parser.add_argument('--sem-propostas', action='store_true', help='Não cria índices candidatos para medir')
+    parser.add_argument('--planos', action='store_true', help='Mostra o plano completo de cada consulta')
+
+    args = parser.parse_args()
+    consultas = ler_carga(args.carga)
+    if args.consultas:
+        consultas = [consulta for consulta in consultas if consulta['nome'] in args.consultas]
+
+    conn = get_connection()
+    resultados, sem_uso = consultar(conn, consultas, args.repeticoes, not args.sem_propostas)
+    mostrar_relatorio(resultados, sem_uso, args.planos)
+    conn.close()
@@ -0,0 +1,109 @@
+"""
+Utilização da Cota Parlamentar (CEAP)
+Consulta quem está mais perto do teto mensal da cota, por UF e período
+"""
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import get_connection
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def recalcular_utilizacao(conn=None):
+    """
+    Recalcula cota_utilizacao inteira a partir de gastos.
+
+    Os triggers mantêm a tabela atualizada durante a ingestão; este
+    recálculo só é necessário após reajustes em cota_limites, mudança de
+    UF de deputados ou em bancos populados antes da tabela existir.
+    """
+    fechar = conn is None
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+
+    logger.info("🧮 Recalculando utilização da cota...")
+    cursor.execute("DELETE FROM cota_utilizacao")
+    cursor.execute("""
+        INSERT INTO cota_utilizacao (deputado_id, ano, mes, gasto, limite, percentual)
+        SELECT m.deputado_id, m.ano, m.mes, m.gasto, l.valor_mensal,
+               ROUND(100.0 * m.gasto / l.valor_mensal, 2)
+        FROM (
+            SELECT deputado_id, ano, mes, SUM(valor_liquido) AS gasto,
+                   printf('%04d-%02d-01', ano, mes) AS competencia
+            FROM gastos
+            GROUP BY deputado_id, ano, mes
+        ) m
+        LEFT JOIN deputados d ON d.id = m.deputado_id
+        LEFT JOIN cota_limites l ON l.uf = d.uf
+            AND l.vigencia_inicio = (
+                SELECT MAX(vigencia_inicio)
+                FROM cota_limites
+                WHERE uf = d.uf
+                  AND vigencia_inicio <= m.competencia
+                  AND (vigencia_fim IS NULL OR vigencia_fim >= m.competencia)
+            )
+    """)
+    conn.commit()
+    logger.info(f"   ✅ {cursor.rowcount} meses de deputados recalculados")
+
+    if fechar:
+        conn.close()
+
+
+def ranking_utilizacao(conn, ano, mes, limite=20, uf=None):
+    """
+    Deputados mais próximos do teto da cota em um mês (vazio para meses
+    sem limite vigente cadastrado em cota_limites).
+
+    Args:
+        conn: Conexão SQLite
+        ano (int): Ano de competência
+        mes (int): Mês de competência
+        limite (int): Quantidade de deputados retornados
+        uf (str): Restringe o ranking a uma UF
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT c.deputado_id, d.nome, d.partido, d.uf, c.gasto, c.limite, c.percentual
+        FROM cota_utilizacao c
+        JOIN deputados d ON d.id = c.deputado_id
+        WHERE c.ano = ? AND c.mes = ? AND c.limite IS NOT NULL AND (? IS NULL OR d.uf = ?)
+        ORDER BY c.percentual DESC
+        LIMIT ?
+    """, (ano, mes, uf, uf, limite))
+
+    return [dict(row) for row in cursor.fetchall()]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    agora = datetime.now()
+
+    parser = argparse.ArgumentParser(description='Ranking de utilização da cota parlamentar (CEAP)')
+    parser.add_argument('--recalcular', action='store_true', help='Recalcula a utilização a partir de gastos')
+    parser.add_argument('--ano', type=int, default=agora.year, help='Ano de competência (padrão: atual)')
+    parser.add_argument('--mes', type=int, default=agora.month, help='Mês de competência (padrão: atual)')
+    parser.add_argument('--uf', help='Filtra por UF')
+    parser.add_argument('--limite', type=int, default=20, help='Quantidade de deputados (padrão: 20)')
+
+    args = parser.parse_args()
+    conn = get_connection()
+
+    if args.recalcular:
+        recalcular_utilizacao(conn)
+
+    print(f"\n📊 Utilização da cota em {args.mes:02d}/{args.ano}\n")
+    for i, linha in enumerate(ranking_utilizacao(conn, args.ano, args.mes, args.limite, args.uf), 1):
+        percentual = f"{linha['percentual']:.1f}%" if linha['percentual'] is not None else 'N/A'
+        print(f"{i:>3}. {linha['nome']} ({linha['partido']}-{linha['uf']}): "
+              f"R$ {linha['gasto']:,.2f} de R$ {linha['limite'] or 0:,.2f} ({percentual})")
+
+    conn.close()
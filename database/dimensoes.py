@@ -0,0 +1,84 @@
+"""
+Dimensões Codificadas
+Tabelas de dicionário (tipo de despesa, partido, órgão, tipo de voto) que
+trocam textos repetidos por códigos inteiros pequenos, com cache de
+interning na ingestão
+"""
+import re
+import unicodedata
+
+
+def normalizar_tipo_despesa(descricao):
+    """Descrição canônica: maiúscula, espaços simples e sem ponto final"""
+    return re.sub(r'\s+', ' ', descricao or '').strip().rstrip('.').strip().upper() or 'NÃO INFORMADO'
+
+
+def normalizar_sigla(sigla):
+    """Sigla canônica de partido/órgão: maiúscula e sem espaços nas bordas"""
+    return (sigla or '').strip().upper()
+
+
+class Dimensao:
+    """
+    Tabela de dicionário (id INTEGER PRIMARY KEY, <coluna> TEXT UNIQUE).
+
+    O cache é indexado pelo valor bruto vindo da API, então cada texto
+    distinto é normalizado e consultado no banco uma única vez por processo.
+    Os ids entram no cache antes do commit: quem desfaz a transação precisa
+    chamar limpar_cache(), senão um id que deixou de existir seria reusado.
+    """
+
+    def __init__(self, tabela, coluna, normalizar):
+        self.tabela = tabela
+        self.coluna = coluna
+        self.normalizar = normalizar
+        self._cache = {}
+
+    def obter_id(self, conn, valor):
+        """Retorna o código do valor, criando-o se necessário (None para valores vazios)"""
+        codigo = self._cache.get(valor)
+        if codigo is not None:
+            return codigo
+
+        canonico = self.normalizar(valor)
+        if not canonico:
+            return None
+
+        cursor = conn.cursor()
+        cursor.execute(
+            f"INSERT INTO {self.tabela} ({self.coluna}) VALUES (?) ON CONFLICT ({self.coluna}) DO NOTHING",
+            (canonico,)
+        )
+        cursor.execute(f"SELECT id FROM {self.tabela} WHERE {self.coluna} = ?", (canonico,))
+        codigo = cursor.fetchone()[0]
+
+        self._cache[valor] = codigo
+        return codigo
+
+    def limpar_cache(self):
+        """Descarta o cache (após um rollback ou após recriar o banco no mesmo processo)"""
+        self._cache.clear()
+
+
+TIPOS_DESPESA = Dimensao('tipos_despesa', 'descricao', normalizar_tipo_despesa)
+PARTIDOS = Dimensao('partidos', 'sigla', normalizar_sigla)
+ORGAOS = Dimensao('orgaos', 'sigla', normalizar_sigla)
+
+
+# Tipos de voto têm domínio fechado: códigos fixos, espelhados em tipos_voto
+TIPO_VOTO_OUTRO = 0
+TIPOS_VOTO = {
+    'sim': 1,
+    'nao': 2,
+    'abstencao': 3,
+    'obstrucao': 4,
+    'artigo 17': 5,
+    'liberado': 6,  # só em orientações de bancada
+}
+
+
+def codificar_voto(tipo_voto):
+    """Código inteiro do tipo de voto ('Não', 'nao', 'NÃO' -> 2; desconhecido -> 0)"""
+    chave = unicodedata.normalize('NFKD', (tipo_voto or '').strip().lower())
+    chave = ''.join(c for c in chave if not unicodedata.combining(c))
+    return TIPOS_VOTO.get(chave, TIPO_VOTO_OUTRO)
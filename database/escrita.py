@@ -0,0 +1,379 @@
+"""
+Escrita em Lotes
+Acumula linhas por comando SQL e grava tudo com executemany em uma única
+transação, em vez de um execute (e um commit) por registro. Com vários
+coletores em paralelo, um EscritorDedicado concentra todas as gravações
+em uma única thread e conexão
+"""
+import logging
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import fornecedores, init_db
+from database.dimensoes import ORGAOS, PARTIDOS, TIPOS_DESPESA
+from database.filas import FilaLimitada
+from database.init_db import aplicar_pragmas, get_connection
+from src.config import COLETA_CAPACIDADE_ESCRITOR
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE_PADRAO = 1000
+
+# Lote tipado enviado ao escritor dedicado: comando, preparador opcional e linhas
+Lote = namedtuple('Lote', ['sql', 'preparar', 'linhas'])
+
+# Mensagens de controle da fila do escritor dedicado
+_Sincronizar = namedtuple('_Sincronizar', ['evento'])
+_ENCERRAR = object()
+
+
+def _descartar_ids_em_cache():
+    """
+    Limpa os caches de ids de dimensões e fornecedores após um rollback.
+
+    Os preparadores criam linhas de dimensão dentro da transação do lote;
+    desfeita a transação, esses ids deixam de existir e podem ser dados a
+    outro valor no próximo INSERT.
+    """
+    for dimensao in (TIPOS_DESPESA, PARTIDOS, ORGAOS):
+        dimensao.limpar_cache()
+    fornecedores.limpar_cache()
+
+
+def _gravar(cursor, lote):
+    """
+    Executa um lote com executemany.
+
+    Se o lote tem preparador, cada linha é transformada por
+    preparar(conexão, linha) na própria conexão de escrita (ex.: resolver
+    códigos de dimensões) antes de ir para o banco.
+    """
+    linhas = lote.linhas
+    if lote.preparar is not None:
+        linhas = [lote.preparar(cursor.connection, linha) for linha in linhas]
+    cursor.executemany(lote.sql, linhas)
+
+
+class EscritorLotes:
+    """
+    Escritor em lotes usado pelos coletores.
+
+    As linhas ficam em memória agrupadas por comando SQL (na ordem em que
+    cada comando apareceu pela primeira vez) e são gravadas quando o lote
+    atinge tamanho_lote linhas ou quando flush() é chamado, normalmente ao
+    fim de cada página da API.
+
+    Sem `destino`, grava na própria conexão. Com um EscritorDedicado como
+    `destino`, flush() apenas entrega os lotes à fila do escritor dedicado
+    e nenhuma conexão é aberta aqui: as linhas entregues contam em
+    `linhas_enviadas`, e só o escritor dedicado sabe quantas foram de fato
+    gravadas (`linhas_gravadas` e `linhas_com_erro` dele).
+
+    Uso:
+        with EscritorLotes() as escritor:
+            escritor.adicionar("INSERT INTO ... VALUES (?, ?)", (1, 'a'))
+            escritor.flush()
+    """
+
+    def __init__(self, conn=None, tamanho_lote=TAMANHO_LOTE_PADRAO, destino=None):
+        self.destino = destino
+        if destino is not None:
+            self.fechar_conexao = False
+            self.conn = None
+        else:
+            self.fechar_conexao = conn is None
+            self.conn = conn or get_connection()
+        self.tamanho_lote = tamanho_lote
+        self._pendentes = {}
+        self._total_pendente = 0
+        self.linhas_gravadas = 0
+        self.linhas_com_erro = 0
+        self.linhas_enviadas = 0
+        self.lotes = 0
+
+    def adicionar(self, sql, parametros, preparar=None):
+        """
+        Enfileira uma linha; grava o lote se ele atingiu o tamanho máximo.
+
+        Args:
+            sql (str): Comando com placeholders
+            parametros: Tupla de parâmetros, ou o registro bruto quando há preparador
+            preparar: Função (conexão, registro) -> tupla, executada na hora da gravação
+        """
+        self._pendentes.setdefault((sql, preparar), []).append(parametros)
+        self._total_pendente += 1
+
+        if self._total_pendente >= self.tamanho_lote:
+            self.flush()
+
+    def adicionar_varios(self, sql, linhas, preparar=None):
+        """Enfileira várias linhas do mesmo comando"""
+        for parametros in linhas:
+            self.adicionar(sql, parametros, preparar)
+
+    @property
+    def pendentes(self):
+        """Quantidade de linhas aguardando gravação"""
+        return self._total_pendente
+
+    def flush(self):
+        """
+        Grava (ou entrega ao escritor dedicado) todas as linhas pendentes.
+
+        Returns:
+            bool: False se o lote falhou (o lote é descartado e registrado em log)
+        """
+        if not self._pendentes:
+            return True
+
+        pendentes, total = self._pendentes, self._total_pendente
+        self._pendentes = {}
+        self._total_pendente = 0
+        lotes = [Lote(sql, preparar, linhas) for (sql, preparar), linhas in pendentes.items()]
+
+        if self.destino is not None:
+            # Os lotes de um flush vão juntos: o escritor dedicado os grava atomicamente
+            self.destino.enviar(lotes)
+            self.linhas_enviadas += total
+            self.lotes += 1
+            return True
+
+        try:
+            cursor = self.conn.cursor()
+            for lote in lotes:
+                _gravar(cursor, lote)
+            self.conn.commit()
+
+        except (sqlite3.Error, KeyError, TypeError, ValueError) as e:
+            self.conn.rollback()
+            _descartar_ids_em_cache()
+            self.linhas_com_erro += total
+            logger.error(f"❌ Erro ao gravar lote de {total} linhas: {e}")
+            return False
+
+        self.linhas_gravadas += total
+        self.lotes += 1
+        return True
+
+    def resumo(self):
+        """Texto com o que foi gravado (ou só entregue ao escritor dedicado)"""
+        if self.destino is not None:
+            return (f"{self.linhas_enviadas} linhas entregues ao escritor dedicado em {self.lotes} lotes "
+                    f"(gravadas e com erro no resumo do escritor)")
+        return f"{self.linhas_gravadas} linhas gravadas em {self.lotes} lotes, {self.linhas_com_erro} com erro"
+
+    def close(self):
+        """Grava o que estiver pendente e fecha a conexão se ela foi aberta aqui"""
+        self.flush()
+        if self.fechar_conexao:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class EscritorDedicado:
+    """
+    Thread única dona da conexão de escrita.
+
+    Os coletores (de qualquer thread) entregam lotes tipados em uma fila
+    limitada; quando a fila enche, enviar() bloqueia e o coletor desacelera
+    até o escritor alcançar (o tempo parado aparece nas métricas da etapa
+    'escritor'). Os lotes recebidos são executados dentro de
+    uma transação aberta, confirmada a cada `linhas_por_commit` linhas ou
+    a cada `intervalo_commit` segundos, o que vier primeiro. Cada envio
+    (um lote ou a lista de lotes de um flush) roda em um SAVEPOINT: um
+    envio inválido é descartado inteiro, sem desfazer os outros da mesma
+    transação, e nunca é dividido entre dois commits.
+
+    Um erro fora de um envio (BEGIN ou COMMIT com o banco ocupado, disco
+    cheio) encerra a gravação: a transação aberta é perdida, a thread passa
+    a descartar o que chegar na fila (para não travar quem envia) e
+    enviar(), sincronizar() e close() levantam o erro original.
+    `linhas_gravadas` conta só linhas de transações confirmadas.
+
+    Uso:
+        with EscritorDedicado() as dedicado:
+            coletor(EscritorLotes(destino=dedicado))
+    """
+
+    def __init__(self, tamanho_fila=COLETA_CAPACIDADE_ESCRITOR, linhas_por_commit=5000, intervalo_commit=1.0,
+                 database_file=None):
+        self.fila = FilaLimitada('escritor', tamanho_fila)
+        self.linhas_por_commit = linhas_por_commit
+        self.intervalo_commit = intervalo_commit
+        self.database_file = database_file or init_db.DATABASE_FILE
+
+        self.linhas_gravadas = 0
+        self.linhas_com_erro = 0
+        self.commits = 0
+        self._erro = None
+
+        self._thread = threading.Thread(target=self._executar, name='escritor', daemon=True)
+        self._thread.start()
+
+    @property
+    def profundidade(self):
+        """Lotes aguardando na fila"""
+        return self.fila.qsize()
+
+    @property
+    def maior_profundidade(self):
+        """Maior número de lotes que já esperou na fila"""
+        return self.fila.metricas.maior_profundidade
+
+    @property
+    def tempo_bloqueado(self):
+        """Segundos que os coletores passaram esperando espaço na fila"""
+        return self.fila.metricas.bloqueado
+
+    def _verificar(self):
+        """Levanta o erro que encerrou a thread de escrita, se houve"""
+        if self._erro is not None:
+            raise self._erro
+
+    def enviar(self, lote):
+        """Entrega um Lote ou uma lista de Lotes (bloqueia enquanto a fila estiver cheia)"""
+        self._verificar()
+        self.fila.put(lote)
+
+    def sincronizar(self, timeout=None):
+        """Espera até tudo que foi enviado antes desta chamada estar confirmado no banco"""
+        self._verificar()
+        evento = threading.Event()
+        self.fila.put(_Sincronizar(evento))
+        confirmado = evento.wait(timeout)
+        self._verificar()
+        return confirmado
+
+    def close(self):
+        """Confirma o que falta, encerra a thread e fecha a conexão"""
+        self.fila.put(_ENCERRAR)
+        self._thread.join()
+        logger.info(f"💾 Escritor: {self.linhas_gravadas} linhas em {self.commits} commits "
+                    f"(fila máxima: {self.maior_profundidade}/{self.fila.maxsize} lotes, "
+                    f"coletores parados {self.tempo_bloqueado:.1f}s, {self.linhas_com_erro} linhas com erro)")
+        self._verificar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # O erro do bloco tem prioridade; o do escritor já foi registrado em log
+            try:
+                self.close()
+            except Exception:
+                pass
+        return False
+
+    def _executar(self):
+        """Laço da thread de escrita"""
+        conn = None
+        item = None
+        self._em_transacao = False
+        self._linhas_transacao = 0
+        self._linhas_envio = 0
+        self._prazo = None
+
+        try:
+            conn = aplicar_pragmas(sqlite3.connect(self.database_file, isolation_level=None))
+            cursor = conn.cursor()
+
+            while True:
+                espera = None if self._prazo is None else max(0.0, self._prazo - time.monotonic())
+                try:
+                    item = self.fila.get(timeout=espera)
+                except queue.Empty:
+                    item = None
+
+                self._processar(cursor, item)
+
+                if isinstance(item, _Sincronizar):
+                    item.evento.set()
+                elif item is _ENCERRAR:
+                    break
+
+        except Exception as e:
+            self._erro = e
+            # A transação aberta se perdeu junto com os ids criados nela
+            _descartar_ids_em_cache()
+            perdidas = self._linhas_transacao + self._linhas_envio
+            self.linhas_com_erro += perdidas
+            logger.error(f"❌ Escritor interrompido ({perdidas} linhas não confirmadas): {e}")
+            if isinstance(item, _Sincronizar):
+                item.evento.set()
+
+        finally:
+            if conn is not None:
+                conn.close()
+
+        if self._erro is not None and item is not _ENCERRAR:
+            self._descartar()
+
+    def _processar(self, cursor, item):
+        """Grava um item da fila e confirma a transação quando é a hora"""
+        if isinstance(item, (Lote, list)):
+            lotes = [item] if isinstance(item, Lote) else item
+            linhas = self._linhas_envio = sum(len(lote.linhas) for lote in lotes)
+            if not self._em_transacao:
+                cursor.execute("BEGIN")
+                self._em_transacao = True
+                self._prazo = time.monotonic() + self.intervalo_commit
+
+            cursor.execute("SAVEPOINT lote")
+            try:
+                for lote in lotes:
+                    _gravar(cursor, lote)
+                cursor.execute("RELEASE lote")
+                self._linhas_transacao += linhas
+            except (sqlite3.Error, KeyError, TypeError, ValueError) as e:
+                # Erro de dados (inclusive no preparador): só este envio é perdido
+                cursor.execute("ROLLBACK TO lote")
+                cursor.execute("RELEASE lote")
+                _descartar_ids_em_cache()
+                self.linhas_com_erro += linhas
+                logger.error(f"❌ Erro ao gravar lote de {linhas} linhas: {e}")
+            self._linhas_envio = 0
+
+        confirmar = self._em_transacao and (
+            item is None
+            or item is _ENCERRAR
+            or isinstance(item, _Sincronizar)
+            or self._linhas_transacao >= self.linhas_por_commit
+            or time.monotonic() >= self._prazo
+        )
+        if confirmar:
+            cursor.execute("COMMIT")
+            # Só linhas de transações confirmadas contam como gravadas
+            self.commits += 1
+            self.linhas_gravadas += self._linhas_transacao
+            self._em_transacao = False
+            self._linhas_transacao = 0
+            self._prazo = None
+
+    def _descartar(self):
+        """Depois de um erro: esvazia a fila até o encerramento, liberando quem espera"""
+        while True:
+            item = self.fila.get()
+            if isinstance(item, (Lote, list)):
+                lotes = [item] if isinstance(item, Lote) else item
+                self.linhas_com_erro += sum(len(lote.linhas) for lote in lotes)
+            elif isinstance(item, _Sincronizar):
+                item.evento.set()
+            elif item is _ENCERRAR:
+                return
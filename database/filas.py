@@ -0,0 +1,163 @@
+"""
+Filas Limitadas entre Etapas da Coleta
+Cada ligação entre etapas (listagem → enriquecimento → escritor) tem
+capacidade fixa: quando a etapa de baixo atrasa, a de cima espera em vez
+de acumular resultados em memória. Cada etapa registra a profundidade da
+sua fila e quanto tempo ficou parada
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+logger = logging.getLogger(__name__)
+
+
+class MetricasEtapa:
+    """
+    Contadores de uma etapa.
+
+    `bloqueado` é o tempo em que o produtor esperou por espaço (pressão de
+    retorno: a etapa seguinte é o gargalo); `ocioso` é o tempo em que o
+    consumidor esperou por itens (a etapa anterior é o gargalo).
+    """
+
+    def __init__(self, nome, capacidade):
+        self.nome = nome
+        self.capacidade = capacidade
+        self.profundidade = 0
+        self.maior_profundidade = 0
+        self.itens = 0
+        self.bloqueado = 0.0
+        self.ocioso = 0.0
+        self._lock = threading.Lock()
+
+    def entrou(self, espera=0.0):
+        """Um item entrou na fila depois de o produtor esperar `espera` segundos"""
+        with self._lock:
+            self.profundidade += 1
+            self.maior_profundidade = max(self.maior_profundidade, self.profundidade)
+            self.itens += 1
+            self.bloqueado += espera
+
+    def saiu(self, espera=0.0):
+        """Um item saiu da fila depois de o consumidor esperar `espera` segundos"""
+        with self._lock:
+            self.profundidade -= 1
+            self.ocioso += espera
+
+    def parou(self, espera):
+        """O produtor ficou `espera` segundos impedido de enviar (fila cheia)"""
+        with self._lock:
+            self.bloqueado += espera
+
+    def resumo(self):
+        return (f"{self.nome}: {self.itens} itens, fila {self.profundidade}/{self.capacidade} "
+                f"(máx. {self.maior_profundidade}), produtor parado {self.bloqueado:.1f}s, "
+                f"consumidor ocioso {self.ocioso:.1f}s")
+
+
+# Métricas das etapas da execução atual (mostradas no progresso da coleta)
+metricas_por_etapa = {}
+_lock_metricas = threading.Lock()
+
+
+def metricas(nome, capacidade):
+    """
+    Métricas novas da etapa `nome`, registradas para o progresso.
+
+    Quem cria a fila ou a etapa é dono delas: uma nova fila com o mesmo
+    nome (outro escritor, outra execução no mesmo processo) começa do zero
+    em vez de somar às contagens anteriores.
+    """
+    with _lock_metricas:
+        etapa = metricas_por_etapa[nome] = MetricasEtapa(nome, capacidade)
+        return etapa
+
+
+def reiniciar_metricas():
+    """Esquece as etapas de execuções anteriores (chamado no início de uma execução)"""
+    with _lock_metricas:
+        metricas_por_etapa.clear()
+
+
+def mostrar_metricas():
+    """Uma linha de log por etapa"""
+    for etapa in list(metricas_por_etapa.values()):
+        logger.info(f"   🚰 {etapa.resumo()}")
+
+
+class FilaLimitada(queue.Queue):
+    """
+    queue.Queue com capacidade obrigatória e métricas da etapa.
+
+    put() bloqueia enquanto a fila está cheia e o tempo de espera entra em
+    `bloqueado`; get() soma a espera por itens em `ocioso`.
+    """
+
+    def __init__(self, nome, capacidade):
+        super().__init__(maxsize=capacidade)
+        self.metricas = metricas(nome, capacidade)
+
+    def put(self, item, block=True, timeout=None):
+        inicio = time.monotonic()
+        super().put(item, block, timeout)
+        self.metricas.entrou(time.monotonic() - inicio)
+
+    def get(self, block=True, timeout=None):
+        inicio = time.monotonic()
+        item = super().get(block, timeout)
+        self.metricas.saiu(time.monotonic() - inicio)
+        return item
+
+
+def em_ordem_de_conclusao(executor, funcao, itens, capacidade, nome):
+    """
+    Como as_completed sobre executor.submit(funcao, *item), com no máximo
+    `capacidade` itens submetidos e ainda não consumidos.
+
+    Um novo item só é submetido quando o consumidor termina de processar um
+    resultado: enquanto ele processa, os resultados prontos esperam na fila
+    e a etapa de cima fica parada (tempo contado em `bloqueado`).
+
+    Args:
+        itens: Iterável de tuplas de argumentos (consumido sob demanda)
+        capacidade (int): Itens em voo ou aguardando o consumidor
+        nome (str): Nome da etapa nas métricas
+
+    Yields:
+        tuple: (item, futuro concluído)
+    """
+    etapa = metricas(nome, capacidade)
+    itens = iter(itens)
+    em_voo = {}
+    esgotado = False
+
+    while True:
+        while not esgotado and len(em_voo) < capacidade:
+            item = next(itens, None)
+            if item is None:
+                esgotado = True
+                break
+            em_voo[executor.submit(funcao, *item)] = item
+            etapa.entrou()
+
+        if not em_voo:
+            return
+
+        inicio = time.monotonic()
+        prontos, _ = wait(em_voo, return_when=FIRST_COMPLETED)
+        ocioso = time.monotonic() - inicio
+
+        for futuro in prontos:
+            item = em_voo.pop(futuro)
+            etapa.saiu(ocioso)
+            ocioso = 0.0
+
+            # Tempo fora do gerador com a fila cheia: o produtor ficou parado
+            cheia = not esgotado and len(em_voo) + 1 >= capacidade
+            inicio = time.monotonic()
+            yield item, futuro
+            if cheia:
+                etapa.parou(time.monotonic() - inicio)
@@ -0,0 +1,208 @@
+"""
+Dimensão de Fornecedores
+Normaliza CNPJ/CPF e nomes de fornecedores dos gastos parlamentares e
+mantém consultas por fornecedor como buscas indexadas
+"""
+import re
+import logging
+import sys
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import get_connection
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Cache (documento, nome) brutos -> id: cada fornecedor distinto é
+# normalizado e consultado no banco uma única vez por processo (ou até um
+# lote ser desfeito, ver limpar_cache)
+_cache_fornecedores = {}
+
+
+def normalizar_documento(documento):
+    """
+    Extrai apenas os dígitos de um CNPJ/CPF.
+
+    Returns:
+        str: 14 dígitos (CNPJ), 11 dígitos (CPF) ou None se inválido/ausente
+    """
+    digitos = re.sub(r'\D', '', documento or '')
+
+    if len(digitos) > 14 or len(digitos) < 11:
+        return None
+    if len(digitos) == 11:
+        return digitos
+
+    # CNPJs com zeros à esquerda perdidos (ex.: exportados de planilhas)
+    return digitos.zfill(14)
+
+
+def normalizar_nome(nome):
+    """Nome canônico: maiúsculo, sem espaços duplicados ou pontuação nas bordas"""
+    nome = re.sub(r'\s+', ' ', nome or '').strip(' .,-').upper()
+    return nome or 'NÃO INFORMADO'
+
+
+def chave_fornecedor(documento, nome):
+    """Chave única do fornecedor: o documento normalizado ou, na falta dele, o nome"""
+    documento = normalizar_documento(documento)
+    if documento:
+        return documento, documento
+    return f"nome:{normalizar_nome(nome)}", None
+
+
+def obter_fornecedor_id(conn, documento, nome):
+    """
+    Retorna o id do fornecedor, criando-o se necessário.
+
+    Args:
+        conn: Conexão SQLite
+        documento (str): CNPJ/CPF em qualquer formatação
+        nome (str): Nome do fornecedor como veio da API
+    """
+    fornecedor_id = _cache_fornecedores.get((documento, nome))
+    if fornecedor_id is not None:
+        return fornecedor_id
+
+    bruto = (documento, nome)
+    chave, documento = chave_fornecedor(documento, nome)
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO fornecedores (chave, documento, nome)
+        VALUES (?, ?, ?)
+        ON CONFLICT (chave) DO NOTHING
+    """, (chave, documento, normalizar_nome(nome)))
+
+    cursor.execute("SELECT id FROM fornecedores WHERE chave = ?", (chave,))
+    fornecedor_id = cursor.fetchone()[0]
+
+    _cache_fornecedores[bruto] = fornecedor_id
+    return fornecedor_id
+
+
+def limpar_cache():
+    """
+    Descarta o cache de ids.
+
+    Um fornecedor criado em uma transação desfeita some do banco, mas o id
+    continuaria no cache e poderia ser reaproveitado por outro fornecedor.
+    """
+    _cache_fornecedores.clear()
+
+
+def recalcular_totais_fornecedores(conn=None):
+    """
+    Recalcula fornecedor_totais e os totais de fornecedores a partir de gastos.
+
+    Os triggers mantêm os totais durante a ingestão; o recálculo só é
+    necessário para corrigir divergências (ex.: edição manual do banco).
+    """
+    fechar = conn is None
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+
+    logger.info("🧮 Recalculando totais por fornecedor...")
+    cursor.execute("DELETE FROM fornecedor_totais")
+    cursor.execute("""
+        INSERT INTO fornecedor_totais
+        (fornecedor_id, deputado_id, ano, tipo_despesa_id, total_liquido, quantidade)
+        SELECT fornecedor_id, deputado_id, ano, tipo_despesa_id, SUM(valor_liquido), COUNT(*)
+        FROM gastos
+        WHERE fornecedor_id IS NOT NULL
+        GROUP BY fornecedor_id, deputado_id, ano, tipo_despesa_id
+    """)
+    cursor.execute("UPDATE fornecedores SET total_liquido = 0, quantidade = 0")
+    cursor.execute("""
+        UPDATE fornecedores
+        SET total_liquido = t.total, quantidade = t.qtd
+        FROM (
+            SELECT fornecedor_id, SUM(total_liquido) AS total, SUM(quantidade) AS qtd
+            FROM fornecedor_totais
+            GROUP BY fornecedor_id
+        ) t
+        WHERE fornecedores.id = t.fornecedor_id
+    """)
+
+    conn.commit()
+    logger.info("   ✅ Totais recalculados")
+
+    if fechar:
+        conn.close()
+
+
+def top_fornecedores(conn, limite=10, ano=None):
+    """Fornecedores que mais receberam da cota (no total ou em um ano)"""
+    cursor = conn.cursor()
+
+    if ano is None:
+        cursor.execute("""
+            SELECT id, documento, nome, total_liquido, quantidade
+            FROM fornecedores
+            ORDER BY total_liquido DESC
+            LIMIT ?
+        """, (limite,))
+    else:
+        cursor.execute("""
+            SELECT f.id, f.documento, f.nome,
+                   SUM(t.total_liquido) AS total_liquido, SUM(t.quantidade) AS quantidade
+            FROM fornecedor_totais t
+            JOIN fornecedores f ON f.id = t.fornecedor_id
+            WHERE t.ano = ?
+            GROUP BY f.id
+            ORDER BY total_liquido DESC
+            LIMIT ?
+        """, (ano, limite))
+
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def deputados_por_fornecedor(conn, documento):
+    """Deputados que pagaram um fornecedor (CNPJ/CPF em qualquer formatação)"""
+    documento = normalizar_documento(documento)
+    if not documento:
+        return []
+
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT t.deputado_id, d.nome, d.partido, d.uf, t.ano, td.descricao AS tipo_despesa,
+               t.total_liquido, t.quantidade
+        FROM fornecedores f
+        JOIN fornecedor_totais t ON t.fornecedor_id = f.id
+        JOIN tipos_despesa td ON td.id = t.tipo_despesa_id
+        LEFT JOIN deputados d ON d.id = t.deputado_id
+        WHERE f.documento = ?
+        ORDER BY t.total_liquido DESC
+    """, (documento,))
+
+    return [dict(row) for row in cursor.fetchall()]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Consultas e manutenção da dimensão de fornecedores')
+    parser.add_argument('--recalcular', action='store_true', help='Recalcula os totais a partir de gastos')
+    parser.add_argument('--top', type=int, default=0, help='Lista os N fornecedores que mais receberam')
+    parser.add_argument('--ano', type=int, help='Restringe --top a um ano')
+    parser.add_argument('--fornecedor', help='Lista os deputados que pagaram este CNPJ/CPF')
+
+    args = parser.parse_args()
+    conn = get_connection()
+
+    if args.recalcular:
+        recalcular_totais_fornecedores(conn)
+
+    if args.top:
+        for f in top_fornecedores(conn, args.top, args.ano):
+            print(f"{f['documento'] or '-':>14}  R$ {f['total_liquido']:>15,.2f}  {f['nome']}")
+
+    if args.fornecedor:
+        for linha in deputados_por_fornecedor(conn, args.fornecedor):
+            print(f"{linha['ano']}  {linha['nome'] or linha['deputado_id']} ({linha['partido']}-{linha['uf']})"
+                  f"  R$ {linha['total_liquido']:,.2f}  {linha['tipo_despesa']}")
+
+    conn.close()
@@ -0,0 +1,196 @@
+"""
+Grafo de Coocorrência Deputado × Fornecedor
+Monta uma matriz esparsa deputado × fornecedor e calcula fornecedores
+compartilhados, deputados com fornecedores em comum e seus agrupamentos
+"""
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import get_connection
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def carregar_matriz(conn, ano_inicio=None, ano_fim=None):
+    """
+    Monta a matriz CSR deputado × fornecedor (1 = deputado pagou o fornecedor).
+
+    Lê de fornecedor_totais, que já está agregada por deputado/fornecedor,
+    em vez de percorrer gastos linha a linha.
+
+    Returns:
+        tuple: (matriz CSR, ids dos deputados por linha, ids dos fornecedores por coluna)
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT deputado_id, fornecedor_id
+        FROM fornecedor_totais
+        WHERE quantidade > 0
+          AND (? IS NULL OR ano >= ?)
+          AND (? IS NULL OR ano <= ?)
+        GROUP BY deputado_id, fornecedor_id
+    """, (ano_inicio, ano_inicio, ano_fim, ano_fim))
+
+    pares = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+
+    deputados, linhas = np.unique(pares[:, 0], return_inverse=True)
+    fornecedores, colunas = np.unique(pares[:, 1], return_inverse=True)
+
+    matriz = sparse.csr_matrix(
+        (np.ones(len(pares), dtype=np.int32), (linhas, colunas)),
+        shape=(len(deputados), len(fornecedores))
+    )
+
+    return matriz, deputados, fornecedores
+
+
+def _arestas(coocorrencia, ids, peso_minimo):
+    """Extrai as arestas (i < j) com peso >= peso_minimo de uma matriz simétrica"""
+    triangular = sparse.triu(coocorrencia, k=1).tocoo()
+    filtro = triangular.data >= peso_minimo
+
+    return np.column_stack((
+        ids[triangular.row[filtro]],
+        ids[triangular.col[filtro]],
+        triangular.data[filtro]
+    ))
+
+
+def construir_grafo(conn=None, ano_inicio=None, ano_fim=None, peso_minimo=2,
+                    fracao_maxima_deputados=0.1):
+    """
+    Reconstrói as tabelas grafo_arestas e grafo_componentes.
+
+    Args:
+        conn: Conexão SQLite (abre uma nova se None)
+        ano_inicio (int): Primeiro ano considerado (None = todos)
+        ano_fim (int): Último ano considerado (None = todos)
+        peso_minimo (int): Mínimo de vizinhos em comum para gravar uma aresta
+        fracao_maxima_deputados (float): Fornecedores usados por uma fração
+            maior dos deputados (companhias aéreas, Correios...) ligariam
+            todo mundo a todo mundo e deixariam os produtos quase densos;
+            saem da matriz antes das multiplicações
+    """
+    fechar = conn is None
+    conn = conn or get_connection()
+    inicio = time.time()
+
+    logger.info("🕸️  Montando matriz deputado × fornecedor...")
+    matriz, deputados, fornecedores = carregar_matriz(conn, ano_inicio, ano_fim)
+    logger.info(f"   {matriz.shape[0]} deputados × {matriz.shape[1]} fornecedores, {matriz.nnz} pares")
+
+    # Fornecedores onipresentes fora antes de Mᵀ·M e M·Mᵀ
+    deputados_por_fornecedor = matriz.getnnz(axis=0)
+    especificos = deputados_por_fornecedor <= fracao_maxima_deputados * matriz.shape[0]
+    matriz, fornecedores = matriz[:, especificos], fornecedores[especificos]
+    logger.info(f"   {np.count_nonzero(~especificos)} fornecedores onipresentes ignorados "
+                f"(mais de {fracao_maxima_deputados:.0%} dos deputados)")
+
+    if matriz.nnz:
+        # Mᵀ·M: fornecedor × fornecedor, peso = deputados em comum
+        fornecedor_fornecedor = (matriz.T @ matriz).tocsr()
+        # M·Mᵀ: deputado × deputado, peso = fornecedores em comum
+        deputado_deputado = (matriz @ matriz.T).tocsr()
+
+        arestas_fornecedores = _arestas(fornecedor_fornecedor, fornecedores, peso_minimo)
+        arestas_deputados = _arestas(deputado_deputado, deputados, peso_minimo)
+
+        # Componentes conexos sobre o grafo de deputados já filtrado por peso
+        adjacencia = deputado_deputado.multiply(deputado_deputado >= peso_minimo)
+        total_componentes, rotulos = connected_components(adjacencia, directed=False)
+    else:
+        # Sem gastos no período: as tabelas ficam vazias
+        arestas_fornecedores = arestas_deputados = np.empty((0, 3), dtype=np.int64)
+        deputados = np.empty(0, dtype=np.int64)
+        total_componentes, rotulos = 0, np.empty(0, dtype=np.int64)
+
+    logger.info(f"   {len(arestas_deputados)} arestas entre deputados, "
+                f"{len(arestas_fornecedores)} entre fornecedores, {total_componentes} componentes")
+
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM grafo_arestas")
+    cursor.execute("DELETE FROM grafo_componentes")
+    cursor.executemany(
+        "INSERT INTO grafo_arestas (tipo, origem_id, destino_id, peso) VALUES ('deputado', ?, ?, ?)",
+        arestas_deputados.tolist()
+    )
+    cursor.executemany(
+        "INSERT INTO grafo_arestas (tipo, origem_id, destino_id, peso) VALUES ('fornecedor', ?, ?, ?)",
+        arestas_fornecedores.tolist()
+    )
+    cursor.executemany(
+        "INSERT INTO grafo_componentes (deputado_id, componente, tamanho) VALUES (?, ?, ?)",
+        zip(deputados.tolist(), rotulos.tolist(), np.bincount(rotulos)[rotulos].tolist())
+    )
+    conn.commit()
+
+    logger.info(f"✅ Grafo reconstruído em {time.time() - inicio:.2f}s")
+
+    if fechar:
+        conn.close()
+
+
+def fornecedores_compartilhados(conn, limite=20):
+    """Fornecedores pagos pelo maior número de deputados distintos"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT f.id, f.documento, f.nome, COUNT(DISTINCT t.deputado_id) AS deputados
+        FROM fornecedor_totais t
+        JOIN fornecedores f ON f.id = t.fornecedor_id
+        WHERE t.quantidade > 0
+        GROUP BY t.fornecedor_id
+        ORDER BY deputados DESC
+        LIMIT ?
+    """, (limite,))
+
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def vizinhos_deputado(conn, deputado_id, limite=20):
+    """Deputados com mais fornecedores em comum com um deputado"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT CASE WHEN a.origem_id = ? THEN a.destino_id ELSE a.origem_id END AS deputado_id,
+               d.nome, d.partido, d.uf, a.peso
+        FROM grafo_arestas a
+        LEFT JOIN deputados d
+          ON d.id = CASE WHEN a.origem_id = ? THEN a.destino_id ELSE a.origem_id END
+        WHERE a.tipo = 'deputado' AND (a.origem_id = ? OR a.destino_id = ?)
+        ORDER BY a.peso DESC
+        LIMIT ?
+    """, (deputado_id, deputado_id, deputado_id, deputado_id, limite))
+
+    return [dict(row) for row in cursor.fetchall()]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Grafo de coocorrência deputado × fornecedor')
+    parser.add_argument('--ano-inicio', type=int, help='Primeiro ano considerado')
+    parser.add_argument('--ano-fim', type=int, help='Último ano considerado')
+    parser.add_argument('--peso-minimo', type=int, default=2, help='Vizinhos em comum mínimos por aresta (padrão: 2)')
+    parser.add_argument('--fracao-maxima', type=float, default=0.1,
+                        help='Ignora fornecedores usados por uma fração maior dos deputados (padrão: 0.1)')
+    parser.add_argument('--deputado', type=int, help='Lista os deputados com mais fornecedores em comum')
+
+    args = parser.parse_args()
+    conn = get_connection()
+
+    if args.deputado:
+        for v in vizinhos_deputado(conn, args.deputado):
+            print(f"{v['peso']:>5.0f}  {v['nome']} ({v['partido']}-{v['uf']})")
+    else:
+        construir_grafo(conn, args.ano_inicio, args.ano_fim, args.peso_minimo, args.fracao_maxima)
+
+    conn.close()
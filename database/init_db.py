@@ -4,9 +4,15 @@ Cria e inicializa o banco SQLite com o schema completo
 """
 import sqlite3
 import os
+import re
+import sys
 import logging
+from contextlib import contextmanager
 from pathlib import Path
 
+# Adicionar diretório raiz ao path (migrações importam os módulos de database/)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -16,9 +22,35 @@ DATABASE_DIR = BASE_DIR / 'database'
 DATABASE_FILE = DATABASE_DIR / 'monitor_pl.db'
 SCHEMA_FILE = DATABASE_DIR / 'schema.sql'
 
+# Perfil aplicado em toda conexão: WAL deixa leitores e escritor em paralelo
+# e, com WAL, synchronous=NORMAL só perde transações em queda de energia
+PRAGMAS_CONEXAO = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,          # 64 MB (valor negativo = KiB)
+    'mmap_size': 268435456,        # 256 MB
+    'temp_store': 'MEMORY',
+    'busy_timeout': 10000,         # ms esperando o lock antes de falhar
+}
+
+# Índices secundários do schema (os UNIQUE ficam de fora: garantem integridade)
+_INDICE_RE = re.compile(r'CREATE INDEX IF NOT EXISTS (\w+)\s+ON\s+(\w+)\s*\([^)]*\);')
+
+
+def aplicar_pragmas(conn):
+    """Aplica o perfil de desempenho PRAGMAS_CONEXAO a uma conexão"""
+    for pragma, valor in PRAGMAS_CONEXAO.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
 
 def create_database():
-    """Cria o banco de dados e aplica o schema"""
+    """
+    Cria o banco de dados e aplica o schema.
+
+    Em um banco existente, aplica antes as migrações pendentes
+    (database/migracoes.py), preservando os dados já coletados.
+    """
     logger.info("🗄️  Iniciando criação do banco de dados...")
     
     # Criar diretório se não existir
@@ -31,21 +63,22 @@ def create_database():
     
     try:
         # Conectar ao banco (cria se não existir)
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = aplicar_pragmas(sqlite3.connect(DATABASE_FILE))
         cursor = conn.cursor()
         
         logger.info(f"📂 Banco de dados: {DATABASE_FILE}")
         
-        # Ler e executar schema
+        # Ler e executar schema (com as migrações pendentes, se houver)
         logger.info("📝 Aplicando schema...")
         with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
             schema_sql = f.read()
         
-        cursor.executescript(schema_sql)
+        from database.migracoes import aplicar_schema
+        aplicar_schema(conn, schema_sql)
         conn.commit()
         
-        # Verificar tabelas criadas
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        # Verificar tabelas criadas (sem as tabelas internas dos índices FTS5)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND sql NOT LIKE 'CREATE TABLE ''%'")
         tabelas = [row[0] for row in cursor.fetchall()]
         
         logger.info(f"✅ {len(tabelas)} tabelas criadas:")
@@ -74,17 +107,85 @@ def create_database():
         return False
 
 
-def get_connection():
-    """Retorna uma conexão com o banco de dados"""
+def get_connection(migrar=True):
+    """
+    Retorna uma conexão com o banco de dados.
+
+    Um banco em schema antigo é migrado antes (create_database): sem isso,
+    os coletores gravariam colunas que só existem depois das migrações e
+    cada lote falharia.
+
+    Args:
+        migrar (bool): False só para inspecionar o banco como está (migracoes.py --status)
+    """
     if not DATABASE_FILE.exists():
         logger.warning("⚠️  Banco de dados não existe. Criando...")
         create_database()
     
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = aplicar_pragmas(sqlite3.connect(DATABASE_FILE, timeout=PRAGMAS_CONEXAO['busy_timeout'] / 1000))
     conn.row_factory = sqlite3.Row  # Permite acessar colunas por nome
+    
+    if migrar:
+        from database.migracoes import migracoes_pendentes
+        if migracoes_pendentes(conn):
+            logger.warning("⚠️  Schema do banco desatualizado. Migrando...")
+            conn.close()
+            if not create_database():
+                raise sqlite3.OperationalError(f"falha ao migrar o schema de {DATABASE_FILE}")
+            return get_connection(migrar=False)
     return conn
 
 
+def indices_secundarios(tabelas=None):
+    """
+    Lista os índices secundários declarados em schema.sql.
+
+    Returns:
+        list: Tuplas (nome, tabela, comando CREATE INDEX)
+    """
+    with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        schema_sql = f.read()
+
+    return [
+        (m.group(1), m.group(2), m.group(0))
+        for m in _INDICE_RE.finditer(schema_sql)
+        if tabelas is None or m.group(2) in tabelas
+    ]
+
+
+@contextmanager
+def carga_em_massa(tabelas=None):
+    """
+    Modo de carga em massa para backfills.
+
+    Remove os índices secundários de schema.sql (de todas as tabelas ou só
+    das informadas) enquanto os dados são carregados e, ao sair, recria os
+    índices de uma vez e roda ANALYZE. Se o processo morrer no meio, rodar
+    create_database() recria os índices que faltam.
+
+    Uso:
+        with carga_em_massa(['gastos']):
+            coletar_gastos_historicos()
+    """
+    indices = indices_secundarios(tabelas)
+    conn = get_connection()
+
+    logger.info(f"🚚 Carga em massa: adiando {len(indices)} índices secundários")
+    for nome, _, _ in indices:
+        conn.execute(f"DROP INDEX IF EXISTS {nome}")
+    conn.commit()
+
+    try:
+        yield conn
+    finally:
+        logger.info(f"🏗️  Recriando {len(indices)} índices e atualizando estatísticas...")
+        conn.executescript("\n".join(sql for _, _, sql in indices))
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.close()
+        logger.info("   ✅ Índices recriados")
+
+
 def get_statistics():
     """Retorna estatísticas gerais do banco"""
     try:
@@ -113,8 +214,6 @@ def reset_database():
 
 
 if __name__ == '__main__':
-    import sys
-    
     if len(sys.argv) > 1 and sys.argv[1] == '--reset':
         print("\n╔═══════════════════════════════════════════════╗")
         print("║   ⚠️  RESET DO BANCO DE DADOS                ║")
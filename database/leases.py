@@ -0,0 +1,202 @@
+"""
+Leases de Trabalho
+Shards da coleta registrados em work_leases: qualquer número de processos
+(na mesma máquina ou em máquinas que compartilham o banco) reivindica um
+shard com prazo, renova o prazo enquanto trabalha e o marca como concluído
+"""
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Prazo de um lease sem renovação; o batimento renova a cada terço dele
+DURACAO_PADRAO = 300
+
+# Um shard que falhou (ou cujo worker caiu) tantas vezes fica como 'error'
+MAX_TENTATIVAS = 3
+
+# Shards em período aberto voltam a 'pending' ao serem registrados de novo;
+# 'error' sempre volta (registrar é a forma de pedir nova tentativa)
+SQL_REGISTRAR = """
+    INSERT INTO work_leases (entidade, shard) VALUES (?, ?)
+    ON CONFLICT (entidade, shard) DO UPDATE SET
+        status = 'pending', tentativas = 0, erro = NULL, atualizado_em = CURRENT_TIMESTAMP
+    WHERE work_leases.status = 'error' OR (work_leases.status = 'done' AND ?)
+"""
+
+SQL_CONCLUIR = """
+    UPDATE work_leases
+    SET status = 'done', total_registros = ?, erro = NULL, expira_em = NULL,
+        atualizado_em = CURRENT_TIMESTAMP
+    WHERE entidade = ? AND shard = ? AND worker = ?
+"""
+
+
+def identificador_worker():
+    """host:pid do processo atual"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def registrar(conn, entidade, shards):
+    """
+    Registra shards de uma entidade (idempotente).
+
+    Args:
+        shards: Pares (shard, aberto); aberto=True recoloca um shard já
+            concluído na fila (ex.: o mês corrente, que ainda recebe dados)
+
+    Returns:
+        int: Shards novos ou recolocados na fila
+    """
+    antes = conn.total_changes
+    conn.executemany(SQL_REGISTRAR, [(entidade, shard, aberto) for shard, aberto in shards])
+    conn.commit()
+    return conn.total_changes - antes
+
+
+def reivindicar(conn, worker, entidades, duracao=DURACAO_PADRAO):
+    """
+    Reivindica o próximo shard livre: pendente ou com lease vencido.
+
+    A escolha e a posse acontecem em um único UPDATE, então dois processos
+    nunca recebem o mesmo shard. Leases vencidos que já esgotaram
+    MAX_TENTATIVAS passam a 'error' em vez de serem reivindicados.
+
+    Returns:
+        tuple: (entidade, shard, tentativas) ou None se não há shard livre
+    """
+    agora = time.time()
+    marcadores = ','.join('?' * len(entidades))
+
+    conn.execute(f"""
+        UPDATE work_leases
+        SET status = 'error', erro = 'lease expirado após {MAX_TENTATIVAS} tentativas',
+            atualizado_em = CURRENT_TIMESTAMP
+        WHERE entidade IN ({marcadores}) AND status = 'leased' AND expira_em < ? AND tentativas >= ?
+    """, (*entidades, agora, MAX_TENTATIVAS))
+
+    linha = conn.execute(f"""
+        UPDATE work_leases
+        SET status = 'leased', worker = ?, expira_em = ?, tentativas = tentativas + 1,
+            atualizado_em = CURRENT_TIMESTAMP
+        WHERE (entidade, shard) = (
+            SELECT entidade, shard FROM work_leases
+            WHERE entidade IN ({marcadores})
+              AND (status = 'pending' OR (status = 'leased' AND expira_em < ?))
+            ORDER BY tentativas, shard, entidade
+            LIMIT 1
+        )
+        RETURNING entidade, shard, tentativas
+    """, (worker, agora + duracao, *entidades, agora)).fetchall()
+    conn.commit()
+
+    return tuple(linha[0]) if linha else None
+
+
+def renovar(conn, entidade, shard, worker, duracao=DURACAO_PADRAO):
+    """
+    Estende o prazo de um lease (batimento).
+
+    Returns:
+        bool: False se o lease não é mais deste worker (venceu e foi reivindicado)
+    """
+    cursor = conn.execute("""
+        UPDATE work_leases SET expira_em = ?, atualizado_em = CURRENT_TIMESTAMP
+        WHERE entidade = ? AND shard = ? AND worker = ? AND status = 'leased'
+    """, (time.time() + duracao, entidade, shard, worker))
+    conn.commit()
+    return cursor.rowcount == 1
+
+
+def concluir(escritor, entidade, shard, worker, total_registros=0):
+    """
+    Enfileira a conclusão do shard no lote do escritor.
+
+    O flush seguinte grava os últimos dados do shard e a conclusão na mesma
+    transação; se o processo cair antes, o lease vence e o shard é refeito.
+    """
+    escritor.adicionar(SQL_CONCLUIR, (total_registros, entidade, shard, worker))
+
+
+def liberar(conn, entidade, shard, worker, erro):
+    """Devolve um shard que falhou à fila ('error' após MAX_TENTATIVAS)"""
+    conn.execute("""
+        UPDATE work_leases
+        SET status = CASE WHEN tentativas >= ? THEN 'error' ELSE 'pending' END,
+            erro = ?, expira_em = NULL, atualizado_em = CURRENT_TIMESTAMP
+        WHERE entidade = ? AND shard = ? AND worker = ? AND status = 'leased'
+    """, (MAX_TENTATIVAS, erro, entidade, shard, worker))
+    conn.commit()
+
+
+def em_andamento(conn, entidades):
+    """Shards com lease ainda válido em algum worker"""
+    cursor = conn.execute(f"""
+        SELECT COUNT(*) FROM work_leases
+        WHERE entidade IN ({','.join('?' * len(entidades))}) AND status = 'leased' AND expira_em >= ?
+    """, (*entidades, time.time()))
+    return cursor.fetchone()[0]
+
+
+def resumo(conn):
+    """
+    Returns:
+        dict: {entidade: {status: quantidade}}
+    """
+    resultado = {}
+    for entidade, status, quantidade in conn.execute(
+        "SELECT entidade, status, COUNT(*) FROM work_leases GROUP BY entidade, status ORDER BY entidade, status"
+    ):
+        resultado.setdefault(entidade, {})[status] = quantidade
+    return resultado
+
+
+class Batimento:
+    """
+    Thread que renova um lease enquanto o shard é processado.
+
+    Usa conexão própria (a do coletor fica na thread principal). Se uma
+    renovação falha, `perdido` é sinalizado: outro worker reivindicou o
+    shard e a conclusão deste será ignorada.
+
+    Uso:
+        with Batimento(entidade, shard, worker, duracao) as batimento:
+            processar(...)
+    """
+
+    def __init__(self, entidade, shard, worker, duracao=DURACAO_PADRAO):
+        self.entidade = entidade
+        self.shard = shard
+        self.worker = worker
+        self.duracao = duracao
+        self.perdido = threading.Event()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name=f'batimento-{entidade}', daemon=True)
+
+    def _executar(self):
+        conn = get_connection()
+        while not self._parar.wait(self.duracao / 3):
+            if not renovar(conn, self.entidade, self.shard, self.worker, self.duracao):
+                logger.warning(f"⚠️  Lease perdido: {self.entidade} {self.shard}")
+                self.perdido.set()
+                break
+        conn.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._parar.set()
+        self._thread.join()
+        return False
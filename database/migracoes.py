@@ -0,0 +1,359 @@
+"""
+Migrações de Schema
+Leva um banco já populado até a versão atual de schema.sql sem recoleta:
+migrações numeradas, registradas em schema_version, que adicionam
+colunas, criam índices e reconstroem tabelas em lotes
+"""
+import logging
+import re
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import init_db
+from database.busca import reconstruir_indices
+from database.cota import recalcular_utilizacao
+from database.coletor_historico_gastos import compactar_gastos
+from database.dimensoes import ORGAOS, PARTIDOS, TIPOS_DESPESA, codificar_voto
+from database.fornecedores import obter_fornecedor_id, recalcular_totais_fornecedores
+from database.resumos import recalcular_resumos
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Linhas copiadas por transação nas reconstruções de tabela
+TAMANHO_LOTE_RECONSTRUCAO = 50000
+
+# `antes` roda antes de schema.sql (colunas e tabelas que os índices e
+# views do schema esperam); `depois` são recálculos de dados derivados,
+# executados uma única vez ao final mesmo que várias migrações os peçam
+Migracao = namedtuple('Migracao', ['versao', 'descricao', 'antes', 'depois'])
+
+
+def colunas(conn, tabela):
+    """Nomes das colunas de uma tabela (vazio se ela não existe)"""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({tabela})")}
+
+
+def adicionar_coluna(conn, tabela, definicao):
+    """ALTER TABLE ADD COLUMN, se a tabela existe e a coluna ainda não"""
+    existentes = colunas(conn, tabela)
+    if existentes and definicao.split()[0] not in existentes:
+        conn.execute(f"ALTER TABLE {tabela} ADD COLUMN {definicao}")
+        logger.info(f"   ➕ {tabela}.{definicao.split()[0]}")
+
+
+def _ler_schema():
+    """Conteúdo de schema.sql"""
+    with open(init_db.SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def definicao_tabela(tabela):
+    """Comando CREATE TABLE da tabela como está em schema.sql"""
+    encontrado = re.search(
+        rf'CREATE TABLE IF NOT EXISTS {tabela} \(.*?\n\)( WITHOUT ROWID)?;', _ler_schema(), re.DOTALL
+    )
+    return encontrado.group(0)
+
+
+def indices_unicos(tabela):
+    """Índices UNIQUE da tabela em schema.sql: (nome, colunas)"""
+    return re.findall(
+        rf'CREATE UNIQUE INDEX IF NOT EXISTS (\w+)\s+ON\s+{tabela}\s*\(([^)]*)\);', _ler_schema()
+    )
+
+
+def reconstruir_tabela(conn, tabela, insercao, tamanho_lote=TAMANHO_LOTE_RECONSTRUCAO):
+    """
+    Recria `tabela` com a definição atual de schema.sql, copiando as linhas
+    em faixas de rowid.
+
+    `insercao` é um INSERT INTO {nova} ... SELECT ... FROM <tabela>
+    WHERE <tabela>.rowid BETWEEN ? AND ?. Cada faixa é uma transação, então
+    leitores (WAL) continuam atendidos e o WAL não cresce com a tabela
+    inteira; só a troca final (DROP + RENAME) é feita de uma vez. Os
+    índices UNIQUE existem desde o início (o ON CONFLICT da cópia depende
+    deles); os demais índices e os triggers são recriados por schema.sql.
+    """
+    nova = f"{tabela}_nova"
+    inicio = time.time()
+
+    conn.execute(f"DROP TABLE IF EXISTS {nova}")
+    conn.execute(definicao_tabela(tabela).replace(f"IF NOT EXISTS {tabela} (", f"{nova} (", 1))
+    for nome, colunas_indice in indices_unicos(tabela):
+        conn.execute(f"DROP INDEX IF EXISTS {nome}")
+        conn.execute(f"CREATE UNIQUE INDEX {nome} ON {nova} ({colunas_indice})")
+    conn.commit()
+
+    minimo, maximo = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {tabela}").fetchone()
+    copiadas = 0
+    if maximo is not None:
+        for faixa in range(minimo, maximo + 1, tamanho_lote):
+            cursor = conn.execute(insercao.format(nova=nova), (faixa, faixa + tamanho_lote - 1))
+            conn.commit()
+            copiadas += cursor.rowcount
+            progresso = (min(faixa + tamanho_lote - 1, maximo) - minimo + 1) / (maximo - minimo + 1)
+            logger.info(f"   📦 {tabela}: {copiadas} linhas copiadas ({100 * progresso:.0f}%)")
+
+    conn.execute("BEGIN")
+    conn.execute(f"DROP TABLE {tabela}")
+    conn.execute(f"ALTER TABLE {nova} RENAME TO {tabela}")
+    conn.commit()
+
+    logger.info(f"   ✅ {tabela} reconstruída: {copiadas} linhas em {time.time() - inicio:.1f}s")
+
+
+def remover_derivados(conn):
+    """
+    Remove views e triggers antes das migrações.
+
+    Todos estão em schema.sql com IF NOT EXISTS e são recriados em seguida
+    já com a definição nova; sem isso, views antigas quebrariam o RENAME
+    das reconstruções e CREATE ... IF NOT EXISTS manteria as definições
+    desatualizadas.
+    """
+    derivados = conn.execute(
+        "SELECT type, name FROM sqlite_master WHERE type IN ('view', 'trigger')"
+    ).fetchall()
+    for tipo, nome in derivados:
+        conn.execute(f"DROP {tipo.upper()} IF EXISTS {nome}")
+    conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Passos das migrações
+# ---------------------------------------------------------------------------
+
+def _dimensoes_codificadas(conn):
+    """v6: gastos com códigos de tipo de despesa e fornecedor; partido_id e orgao_id"""
+    for tabela in ('tipos_despesa', 'partidos', 'orgaos', 'fornecedores'):
+        conn.execute(definicao_tabela(tabela))
+    adicionar_coluna(conn, 'deputados', 'partido_id INTEGER REFERENCES partidos(id)')
+    adicionar_coluna(conn, 'votacoes', 'orgao_id INTEGER REFERENCES orgaos(id)')
+
+    # Totais indexados pelo texto do tipo: recriados por schema.sql e recalculados
+    if 'tipo_despesa' in colunas(conn, 'fornecedor_totais'):
+        conn.execute("DROP TABLE fornecedor_totais")
+    conn.commit()
+
+    if 'tipo_despesa' not in colunas(conn, 'gastos'):
+        return
+
+    # Textos distintos -> códigos, resolvidos uma vez cada pelas dimensões
+    conn.execute("DROP TABLE IF EXISTS temp.mapa_tipos")
+    conn.execute("DROP TABLE IF EXISTS temp.mapa_fornecedores")
+    conn.execute("CREATE TEMP TABLE mapa_tipos (texto TEXT PRIMARY KEY, id INTEGER NOT NULL)")
+    conn.execute("""
+        CREATE TEMP TABLE mapa_fornecedores (
+            documento TEXT, nome TEXT, id INTEGER NOT NULL, PRIMARY KEY (documento, nome)
+        )
+    """)
+    tipos = conn.execute("SELECT DISTINCT tipo_despesa FROM gastos").fetchall()
+    conn.executemany("INSERT INTO mapa_tipos VALUES (?, ?)",
+                     [(texto, TIPOS_DESPESA.obter_id(conn, texto)) for (texto,) in tipos])
+    fornecedores = conn.execute(
+        "SELECT DISTINCT IFNULL(cnpj_fornecedor, ''), IFNULL(fornecedor, '') FROM gastos"
+    ).fetchall()
+    conn.executemany("INSERT INTO mapa_fornecedores VALUES (?, ?, ?)",
+                     [(documento, nome, obter_fornecedor_id(conn, documento, nome))
+                      for documento, nome in fornecedores])
+    conn.commit()
+    logger.info(f"   🔤 {len(tipos)} tipos de despesa e {len(fornecedores)} fornecedores codificados")
+
+    # Duplicatas da chave natural colapsam na cópia, valendo a linha mais recente
+    reconstruir_tabela(conn, 'gastos', """
+        INSERT INTO {nova} (
+            id, deputado_id, ano, mes, tipo_despesa_id, valor_documento, valor_liquido,
+            fornecedor_id, numero_documento, data_documento, url_documento, created_at
+        )
+        SELECT g.id, g.deputado_id, g.ano, g.mes, t.id, g.valor_documento, g.valor_liquido,
+               f.id, IFNULL(g.numero_documento, ''), IFNULL(g.data_documento, ''),
+               g.url_documento, g.created_at
+        FROM gastos g
+        JOIN temp.mapa_tipos t ON t.texto = g.tipo_despesa
+        JOIN temp.mapa_fornecedores f
+          ON f.documento = IFNULL(g.cnpj_fornecedor, '') AND f.nome = IFNULL(g.fornecedor, '')
+        WHERE g.rowid BETWEEN ? AND ?
+        ON CONFLICT (deputado_id, cod_documento, numero_documento, data_documento,
+                     valor_documento, fornecedor_id, parcela) DO UPDATE SET
+            ano = excluded.ano,
+            mes = excluded.mes,
+            tipo_despesa_id = excluded.tipo_despesa_id,
+            valor_liquido = excluded.valor_liquido,
+            url_documento = excluded.url_documento
+    """)
+
+    conn.execute("DROP TABLE temp.mapa_tipos")
+    conn.execute("DROP TABLE temp.mapa_fornecedores")
+    conn.commit()
+
+
+def _preencher_dimensoes(conn):
+    """v6: partido_id e orgao_id de linhas gravadas antes das dimensões"""
+    for tabela, coluna, coluna_id, dimensao in (('deputados', 'partido', 'partido_id', PARTIDOS),
+                                                ('votacoes', 'orgao', 'orgao_id', ORGAOS)):
+        valores = conn.execute(
+            f"SELECT DISTINCT {coluna} FROM {tabela} WHERE {coluna_id} IS NULL AND {coluna} IS NOT NULL"
+        ).fetchall()
+        conn.executemany(
+            f"UPDATE {tabela} SET {coluna_id} = ? WHERE {coluna} = ? AND {coluna_id} IS NULL",
+            [(dimensao.obter_id(conn, valor), valor) for (valor,) in valores]
+        )
+    conn.commit()
+
+
+def _chave_natural_gastos(conn):
+    """v7: colunas da chave natural, remoção de duplicatas e índice único"""
+    compactar_gastos(conn, vacuum=False)
+
+
+def _votos_codificados(conn):
+    """v8: votos_deputados WITHOUT ROWID com o tipo de voto como código"""
+    if 'voto' not in colunas(conn, 'votos_deputados'):
+        return
+
+    conn.create_function('codificar_voto', 1, codificar_voto, deterministic=True)
+    reconstruir_tabela(conn, 'votos_deputados', """
+        INSERT INTO {nova} (votacao_id, deputado_id, tipo_voto)
+        SELECT votacao_id, deputado_id, codificar_voto(voto)
+        FROM votos_deputados
+        WHERE rowid BETWEEN ? AND ?
+        ON CONFLICT (votacao_id, deputado_id) DO UPDATE SET tipo_voto = excluded.tipo_voto
+    """)
+
+
+def _colunas_coletores(conn):
+    """v9: colunas que os coletores de votações e MPs gravam"""
+    adicionar_coluna(conn, 'votacoes', 'proposicao_id INTEGER')
+    adicionar_coluna(conn, 'votacoes', 'data_ultima_coleta TIMESTAMP')
+    adicionar_coluna(conn, 'medidas_provisorias', 'prazo_vencido BOOLEAN DEFAULT 0')
+    adicionar_coluna(conn, 'medidas_provisorias', 'data_ultima_coleta TIMESTAMP')
+    conn.commit()
+
+
+def _partido_autorias(conn):
+    """v19: partido e UF dos autores como vieram da API"""
+    adicionar_coluna(conn, 'autorias', 'partido TEXT')
+    adicionar_coluna(conn, 'autorias', 'uf TEXT')
+    conn.commit()
+
+
+def _vigencia_cota(conn):
+    """v20: limites da CEAP semeados com vigência retroativa a 2019 (schema.sql semeia de novo)"""
+    if colunas(conn, 'cota_limites'):
+        conn.execute("DELETE FROM cota_limites WHERE vigencia_inicio = '2019-01-01' AND vigencia_fim IS NULL")
+        conn.commit()
+
+
+# Em ordem de versão; a descrição registrada é a de schema.sql
+MIGRACOES = [
+    Migracao(2, 'Dimensão fornecedores', None, (recalcular_totais_fornecedores,)),
+    Migracao(3, 'Utilização da cota', None, (recalcular_utilizacao,)),
+    Migracao(4, 'Grafo de coocorrência', None, ()),
+    Migracao(5, 'Watchlist, cache HTTP e eventos', None, ()),
+    Migracao(6, 'Dimensões codificadas', _dimensoes_codificadas,
+             (_preencher_dimensoes, recalcular_totais_fornecedores)),
+    Migracao(7, 'Chave natural em gastos', _chave_natural_gastos,
+             (recalcular_totais_fornecedores, recalcular_utilizacao)),
+    Migracao(8, 'votos_deputados codificado', _votos_codificados, ()),
+    Migracao(9, 'Colunas dos coletores de votações e MPs', _colunas_coletores, ()),
+    Migracao(10, 'Orientações de bancada', None, ()),
+    Migracao(11, 'Sincronização incremental', None, ()),
+    Migracao(12, 'Checkpoints da coleta histórica', None, ()),
+    Migracao(13, 'Leases da coleta distribuída', None, ()),
+    Migracao(14, 'Execuções do pipeline', None, ()),
+    Migracao(15, 'Histórico de tramitação', None, ()),
+    Migracao(16, 'Autorias', None, ()),
+    Migracao(17, 'Resumos materializados', None, (recalcular_resumos,)),
+    Migracao(18, 'Busca textual', None, (reconstruir_indices,)),
+    Migracao(19, 'Partido e UF dos autores', _partido_autorias, ()),
+    Migracao(20, 'Vigência da cota', _vigencia_cota, (recalcular_utilizacao,)),
+]
+
+
+def versao_atual(conn):
+    """
+    Versão do schema do banco.
+
+    Returns:
+        int: Maior versão em schema_version (1 para bancos anteriores ao
+        controle de versão) ou None se o banco está vazio
+    """
+    tabelas = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'schema_version' in tabelas:
+        return conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 1
+    return 1 if 'gastos' in tabelas else None
+
+
+def migracoes_pendentes(conn):
+    """Migrações ainda não aplicadas (nenhuma para um banco vazio)"""
+    versao = versao_atual(conn)
+    if versao is None:
+        return []
+    return [m for m in MIGRACOES if m.versao > versao]
+
+
+def aplicar_schema(conn, schema_sql):
+    """
+    Aplica as migrações pendentes e o schema.sql.
+
+    Os passos `antes` de cada migração rodam em ordem, depois o schema
+    (que cria tabelas, índices, views e triggers e registra as versões) e,
+    por fim, os recálculos pedidos. Se um recálculo falhar, as versões
+    pendentes são desmarcadas: os passos são idempotentes e a próxima
+    execução refaz o que faltou.
+
+    Returns:
+        list: Migrações aplicadas
+    """
+    pendentes = migracoes_pendentes(conn)
+
+    if pendentes:
+        logger.info(f"🔧 Migrando schema da versão {pendentes[0].versao - 1} "
+                    f"para {pendentes[-1].versao} ({len(pendentes)} migrações)")
+        remover_derivados(conn)
+        for migracao in pendentes:
+            if migracao.antes is not None:
+                logger.info(f"   🔧 v{migracao.versao}: {migracao.descricao}")
+                migracao.antes(conn)
+
+    conn.executescript(schema_sql)
+
+    try:
+        for recalculo in dict.fromkeys(f for m in pendentes for f in m.depois):
+            recalculo(conn)
+    except Exception:
+        conn.rollback()
+        conn.executemany("DELETE FROM schema_version WHERE version = ?", [(m.versao,) for m in pendentes])
+        conn.commit()
+        raise
+
+    if pendentes:
+        conn.execute("ANALYZE")
+        conn.commit()
+        logger.info(f"✅ Schema na versão {versao_atual(conn)}")
+
+    return pendentes
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Migrações do schema do banco')
+    parser.add_argument('--status', action='store_true', help='Mostra a versão atual e as migrações pendentes')
+
+    args = parser.parse_args()
+
+    if args.status:
+        conn = init_db.get_connection(migrar=False)
+        print(f"🗄️  Versão do schema: {versao_atual(conn)}")
+        for migracao in migracoes_pendentes(conn):
+            print(f"   ⏳ v{migracao.versao}: {migracao.descricao}")
+        conn.close()
+    elif not init_db.create_database():
+        sys.exit(1)
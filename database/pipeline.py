@@ -0,0 +1,330 @@
+"""
+Pipeline de Coleta
+Executa as etapas de coleta como um grafo de dependências: etapas
+independentes rodam em paralelo, etapas derivadas são puladas quando as
+tabelas de entrada não mudaram desde a última execução e cada execução
+fica registrada em pipeline_execucoes
+"""
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.api_camara import definir_fluxo, requisicoes_por_fluxo
+from database.init_db import get_connection
+from src.config import CAMARA_ENRIQUECIMENTO_PARALELO
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# dependencias: etapas que precisam terminar antes; entradas: tabelas cuja
+# mudança faz a etapa rodar de novo (sem entradas, a etapa lê a API e roda
+# sempre); saidas: tabelas ou arquivos escritos, que duas etapas não
+# escrevem ao mesmo tempo
+Etapa = namedtuple('Etapa', ['nome', 'funcao', 'dependencias', 'entradas', 'saidas'])
+
+
+def etapa_deputados():
+    """Lista de deputados da API"""
+    from database.coletor_historico_gastos import buscar_todos_deputados, salvar_deputado
+    from database.escrita import EscritorLotes
+
+    with EscritorLotes() as escritor:
+        for deputado in buscar_todos_deputados():
+            salvar_deputado(escritor, deputado)
+
+
+def etapa_gastos(anos):
+    """Gastos dos deputados gravados pela etapa anterior (checkpoints pulam meses fechados)"""
+    from database.coletor_historico_gastos import coletar_gastos_historicos
+
+    conn = get_connection()
+    deputados = [{'id': row[0]} for row in conn.execute("SELECT id FROM deputados ORDER BY nome")]
+    conn.close()
+    coletar_gastos_historicos(anos=anos, deputados=deputados)
+
+
+def etapa_sincronizacao(entidade, paralelo):
+    """PLs, votações (com votos e orientações) ou MPs alterados desde a marca d'água"""
+    from database.sincronizacao import sincronizar
+
+    if sincronizar((entidade,), paralelo=paralelo)[entidade] is None:
+        raise RuntimeError(f"sincronização de {entidade} falhou")
+
+
+def etapa_tramitacoes(paralelo):
+    """Histórico de tramitação das proposições que ainda não têm nenhum"""
+    from database.tramitacoes import coletar_tramitacoes
+
+    coletar_tramitacoes(paralelo=paralelo)
+
+
+def etapa_autorias(paralelo):
+    """Autorias dos PLs que ainda não têm nenhuma"""
+    from database.autorias import coletar_autorias
+
+    coletar_autorias(paralelo=paralelo)
+
+
+def etapa_grafo():
+    """Grafo deputado × fornecedor"""
+    from database.grafo_fornecedores import construir_grafo
+
+    construir_grafo()
+
+
+def etapa_estado_pls():
+    """PLs rastreados do estado.json (coletar_pls_apenas.py)"""
+    import coletar_pls_apenas
+
+    coletar_pls_apenas.main()
+
+
+def etapa_estado_votacoes_mps():
+    """Votações recentes e MPs ativas do estado.json (coletar_todos_dados.py)"""
+    import coletar_todos_dados
+
+    coletar_todos_dados.main()
+
+
+def definir_etapas(anos=1, paralelo=CAMARA_ENRIQUECIMENTO_PARALELO):
+    """
+    Etapas do pipeline completo.
+
+    Args:
+        anos (int): Anos de gastos verificados (meses fechados já coletados são pulados)
+        paralelo (int): Requisições simultâneas no enriquecimento de cada etapa
+    """
+    return [
+        Etapa('deputados', etapa_deputados, (), (), ('deputados',)),
+        Etapa('gastos', partial(etapa_gastos, anos), ('deputados',), (), ('gastos',)),
+        Etapa('pls', partial(etapa_sincronizacao, 'pls', paralelo), (), (), ('projetos_lei',)),
+        Etapa('votacoes', partial(etapa_sincronizacao, 'votacoes', paralelo), (), (),
+              ('votacoes', 'votos_deputados', 'orientacoes')),
+        Etapa('mps', partial(etapa_sincronizacao, 'mps', paralelo), (), (), ('medidas_provisorias',)),
+        Etapa('tramitacoes', partial(etapa_tramitacoes, paralelo), ('pls', 'mps'),
+              ('projetos_lei', 'medidas_provisorias'), ('tramitacoes',)),
+        Etapa('autorias', partial(etapa_autorias, paralelo), ('pls',), ('projetos_lei',),
+              ('autorias', 'projetos_lei')),
+        Etapa('grafo', etapa_grafo, ('gastos',), ('gastos',), ('grafo_arestas', 'grafo_componentes')),
+        Etapa('estado_pls', etapa_estado_pls, (), (), ('estado.json',)),
+        Etapa('estado_votacoes_mps', etapa_estado_votacoes_mps, (), (), ('estado.json',)),
+    ]
+
+
+def assinatura(conn, tabelas):
+    """
+    Estado resumido das tabelas: quantidade de linhas e maior rowid.
+
+    Inclusões e substituições (INSERT OR REPLACE gera um rowid novo) mudam
+    a assinatura; correções no lugar de uma linha existente, não.
+    """
+    partes = []
+    for tabela in tabelas:
+        try:
+            contagem, maximo = conn.execute(f"SELECT COUNT(*), MAX(rowid) FROM {tabela}").fetchone()
+        except sqlite3.OperationalError:
+            # Tabelas WITHOUT ROWID
+            contagem, maximo = conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0], None
+        partes.append(f"{tabela}:{contagem}:{maximo}")
+    return '|'.join(partes)
+
+
+def ultima_assinatura(conn, etapa):
+    """Assinatura das entradas na última execução bem-sucedida da etapa"""
+    cursor = conn.execute("""
+        SELECT assinatura_entradas FROM pipeline_execucoes
+        WHERE etapa = ? AND status = 'ok'
+        ORDER BY id DESC LIMIT 1
+    """, (etapa,))
+    linha = cursor.fetchone()
+    return linha[0] if linha else None
+
+
+def ordenar(etapas, selecionadas=None):
+    """
+    Valida o grafo e devolve as etapas a executar.
+
+    Com `selecionadas`, inclui também as dependências (diretas e
+    indiretas) de cada etapa pedida.
+
+    Raises:
+        ValueError: Dependência desconhecida ou ciclo
+    """
+    por_nome = {etapa.nome: etapa for etapa in etapas}
+    for etapa in etapas:
+        for dependencia in etapa.dependencias:
+            if dependencia not in por_nome:
+                raise ValueError(f"Etapa {etapa.nome} depende de {dependencia}, que não existe")
+
+    incluidas = {}
+    visitando = set()
+
+    def visitar(nome):
+        if nome in incluidas:
+            return
+        if nome in visitando:
+            raise ValueError(f"Ciclo de dependências passando por {nome}")
+        visitando.add(nome)
+        for dependencia in por_nome[nome].dependencias:
+            visitar(dependencia)
+        visitando.discard(nome)
+        incluidas[nome] = por_nome[nome]
+
+    for nome in selecionadas or por_nome:
+        if nome not in por_nome:
+            raise ValueError(f"Etapa desconhecida: {nome}")
+        visitar(nome)
+
+    return list(incluidas.values())
+
+
+def executar_etapa(etapa, forcar=False):
+    """
+    Roda uma etapa (na thread do pool) e registra a execução.
+
+    Returns:
+        dict: status ('ok', 'pulada' ou 'erro'), duracao, requisicoes e erro
+    """
+    # O nome da thread e o fluxo identificam a etapa nos logs e na contagem de requisições
+    threading.current_thread().name = etapa.nome
+    definir_fluxo(etapa.nome)
+    requisicoes_antes = requisicoes_por_fluxo[etapa.nome]
+    inicio = time.time()
+
+    conn = get_connection()
+    assinatura_entradas = assinatura(conn, etapa.entradas) if etapa.entradas else None
+    resultado = {'status': 'ok', 'erro': None}
+
+    if assinatura_entradas is not None and not forcar and assinatura_entradas == ultima_assinatura(conn, etapa.nome):
+        resultado['status'] = 'pulada'
+        logger.info(f"⏭️  {etapa.nome}: entradas sem mudança desde a última execução")
+    else:
+        logger.info(f"▶️  {etapa.nome}")
+        try:
+            etapa.funcao()
+        except Exception as e:
+            logger.exception(f"❌ Erro na etapa {etapa.nome}: {e}")
+            resultado.update(status='erro', erro=str(e))
+
+    resultado['duracao'] = time.time() - inicio
+    resultado['requisicoes'] = requisicoes_por_fluxo[etapa.nome] - requisicoes_antes
+
+    conn.execute("""
+        INSERT INTO pipeline_execucoes
+        (etapa, status, assinatura_entradas, duracao_segundos, requisicoes, erro)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (etapa.nome, resultado['status'], assinatura_entradas, resultado['duracao'],
+          resultado['requisicoes'], resultado['erro']))
+    conn.commit()
+    conn.close()
+
+    return resultado
+
+
+def executar(etapas=None, selecionadas=None, forcar=False, max_paralelas=4):
+    """
+    Executa o pipeline respeitando as dependências.
+
+    Uma etapa começa assim que todas as suas dependências terminam (ok ou
+    pulada) e nenhuma etapa em andamento escreve as mesmas saídas. Se uma
+    dependência falha, as etapas que dependem dela não rodam.
+
+    Args:
+        etapas (list): Etapas do pipeline (None = definir_etapas())
+        selecionadas (list): Nomes das etapas a executar, com suas dependências (None = todas)
+        forcar (bool): Roda as etapas derivadas mesmo sem mudança nas entradas
+        max_paralelas (int): Etapas simultâneas
+
+    Returns:
+        dict: Resultado de cada etapa (status 'bloqueada' quando uma dependência falhou)
+    """
+    etapas = ordenar(etapas or definir_etapas(), selecionadas)
+    pendentes = {etapa.nome: etapa for etapa in etapas}
+    resultados = {}
+    em_andamento = {}
+    inicio = time.time()
+
+    logger.info(f"🧭 Pipeline: {len(etapas)} etapas ({', '.join(pendentes)})")
+
+    with ThreadPoolExecutor(max_workers=max_paralelas, thread_name_prefix='pipeline') as executor:
+        while pendentes or em_andamento:
+            saidas_ocupadas = {saida for etapa in em_andamento.values() for saida in etapa.saidas}
+
+            for nome, etapa in list(pendentes.items()):
+                status_dependencias = [resultados.get(d, {}).get('status') for d in etapa.dependencias]
+                if any(status in ('erro', 'bloqueada') for status in status_dependencias):
+                    resultados[nome] = {'status': 'bloqueada', 'duracao': 0, 'requisicoes': 0,
+                                        'erro': 'dependência falhou'}
+                    del pendentes[nome]
+                    logger.warning(f"⛔ {nome}: não executada (dependência falhou)")
+                elif all(status in ('ok', 'pulada') for status in status_dependencias) \
+                        and saidas_ocupadas.isdisjoint(etapa.saidas):
+                    em_andamento[executor.submit(executar_etapa, etapa, forcar)] = etapa
+                    saidas_ocupadas.update(etapa.saidas)
+                    del pendentes[nome]
+
+            if not em_andamento:
+                continue
+
+            concluidas, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+            for futuro in concluidas:
+                resultados[em_andamento.pop(futuro).nome] = futuro.result()
+
+    logger.info(f"🏁 Pipeline em {time.time() - inicio:.1f}s")
+    for nome, resultado in resultados.items():
+        logger.info(f"   {nome:<20} {resultado['status']:<9} {resultado['duracao']:7.1f}s  "
+                    f"{resultado['requisicoes']} requisições")
+
+    return resultados
+
+
+def historico(conn, limite=5):
+    """Últimas execuções de cada etapa (status, duração, requisições)"""
+    cursor = conn.execute("""
+        SELECT etapa, status, duracao_segundos, requisicoes, iniciado_em
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY etapa ORDER BY id DESC) AS ordem
+            FROM pipeline_execucoes
+        )
+        WHERE ordem <= ?
+        ORDER BY etapa, id DESC
+    """, (limite,))
+    return cursor.fetchall()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Executa o pipeline de coleta (etapas em paralelo e incrementais)')
+    parser.add_argument('--etapas', nargs='+', help='Executa só estas etapas e suas dependências')
+    parser.add_argument('--forcar', action='store_true', help='Roda as etapas derivadas mesmo sem mudança nas entradas')
+    parser.add_argument('--anos', type=int, default=1, help='Anos de gastos verificados (padrão: 1)')
+    parser.add_argument('--paralelo', type=int, default=CAMARA_ENRIQUECIMENTO_PARALELO,
+                        help=f'Requisições simultâneas no enriquecimento (padrão: {CAMARA_ENRIQUECIMENTO_PARALELO})')
+    parser.add_argument('--max-etapas', type=int, default=4, help='Etapas simultâneas (padrão: 4)')
+    parser.add_argument('--listar', action='store_true', help='Lista as etapas e suas dependências')
+    parser.add_argument('--historico', action='store_true', help='Mostra as últimas execuções de cada etapa')
+
+    args = parser.parse_args()
+    etapas = definir_etapas(args.anos, args.paralelo)
+
+    if args.listar:
+        for etapa in ordenar(etapas):
+            print(f"   • {etapa.nome:<20} ← {', '.join(etapa.dependencias) or '(API)'}"
+                  f"  → {', '.join(etapa.saidas)}")
+    elif args.historico:
+        conn = get_connection()
+        for etapa, status, duracao, requisicoes, iniciado_em in historico(conn):
+            print(f"   {iniciado_em}  {etapa:<20} {status:<7} {duracao or 0:7.1f}s  {requisicoes} requisições")
+        conn.close()
+    else:
+        executar(etapas, args.etapas, args.forcar, args.max_etapas)
@@ -0,0 +1,116 @@
+"""
+Resumos Materializados
+Tabelas de resumo mantidas por trigger que substituem as agregações
+completas de vw_ranking_gastos_12m (resumo_gastos_mensal) e de
+vw_pls_por_categoria_ano (resumo_pls_categoria_ano)
+"""
+import logging
+import sys
+from pathlib import Path
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import get_connection
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Cada resumo: a agregação completa equivalente, com as mesmas colunas da tabela
+AGREGACOES = {
+    'resumo_gastos_mensal': """
+        SELECT substr(data_documento, 1, 7) AS mes_documento, deputado_id,
+               SUM(valor_liquido) AS total_gasto, COUNT(*) AS total_despesas,
+               MAX(data_documento) AS ultima_despesa
+        FROM gastos
+        WHERE data_documento <> ''
+        GROUP BY mes_documento, deputado_id
+    """,
+    'resumo_pls_categoria_ano': """
+        SELECT ano, IFNULL(categoria, '') AS categoria, COUNT(*) AS total,
+               SUM(IFNULL(status, '') LIKE '%Aprovad%') AS aprovados,
+               IFNULL(SUM(importancia), 0) AS soma_importancia,
+               COUNT(importancia) AS com_importancia
+        FROM projetos_lei
+        GROUP BY ano, IFNULL(categoria, '')
+    """,
+}
+
+# Chave de cada resumo e a contagem que, zerada, significa chave sem linhas na base
+CHAVES = {
+    'resumo_gastos_mensal': (('mes_documento', 'deputado_id'), 'total_despesas'),
+    'resumo_pls_categoria_ano': (('ano', 'categoria'), 'total'),
+}
+
+
+def recalcular_resumos(conn=None):
+    """
+    Recalcula as tabelas de resumo inteiras a partir de gastos e projetos_lei.
+
+    Os triggers mantêm os resumos durante a ingestão; o recálculo só é
+    necessário em bancos populados antes das tabelas existirem ou se
+    verificar_resumos() apontar divergências.
+    """
+    fechar = conn is None
+    conn = conn or get_connection()
+
+    logger.info("🧮 Recalculando resumos materializados...")
+    for tabela, agregacao in AGREGACOES.items():
+        conn.execute(f"DELETE FROM {tabela}")
+        cursor = conn.execute(f"INSERT INTO {tabela} {agregacao}")
+        conn.commit()
+        logger.info(f"   ✅ {tabela}: {cursor.rowcount} chaves")
+
+    if fechar:
+        conn.close()
+
+
+def verificar_resumos(conn, tolerancia=0.01):
+    """
+    Compara cada resumo com a agregação completa.
+
+    Returns:
+        dict: {tabela: chaves divergentes (faltando, sobrando ou com valores diferentes)}
+    """
+    divergencias = {}
+    for tabela, agregacao in AGREGACOES.items():
+        chaves, contagem = CHAVES[tabela]
+        esperado = {tuple(row[c] for c in chaves): dict(row) for row in conn.execute(agregacao)}
+        atual = {tuple(row[c] for c in chaves): dict(row)
+                 for row in conn.execute(f"SELECT * FROM {tabela} WHERE {contagem} > 0")}
+
+        erradas = set(esperado) ^ set(atual)
+        for chave in set(esperado) & set(atual):
+            for coluna, valor in esperado[chave].items():
+                outro = atual[chave][coluna]
+                if isinstance(valor, float) or isinstance(outro, float):
+                    if abs((valor or 0) - (outro or 0)) > tolerancia:
+                        erradas.add(chave)
+                elif valor != outro:
+                    erradas.add(chave)
+        divergencias[tabela] = sorted(erradas, key=str)
+
+    return divergencias
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Resumos materializados de gastos e PLs')
+    parser.add_argument('--recalcular', action='store_true', help='Recalcula os resumos a partir das tabelas base')
+    parser.add_argument('--verificar', action='store_true', help='Compara os resumos com a agregação completa')
+
+    args = parser.parse_args()
+    conn = get_connection()
+
+    if args.recalcular:
+        recalcular_resumos(conn)
+
+    if args.verificar or not args.recalcular:
+        for tabela, erradas in verificar_resumos(conn).items():
+            if erradas:
+                print(f"   ❌ {tabela}: {len(erradas)} chaves divergentes (ex.: {erradas[:5]})")
+            else:
+                print(f"   ✅ {tabela}: em dia")
+
+    conn.close()
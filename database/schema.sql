@@ -2,11 +2,28 @@
 -- SQLite Database for Historical Data
 -- ============================================
 
+-- Dimensões codificadas (textos repetidos viram códigos inteiros)
+CREATE TABLE IF NOT EXISTS tipos_despesa (
+    id INTEGER PRIMARY KEY,
+    descricao TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS partidos (
+    id INTEGER PRIMARY KEY,
+    sigla TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS orgaos (
+    id INTEGER PRIMARY KEY,
+    sigla TEXT NOT NULL UNIQUE
+);
+
 -- Tabela de Deputados
 CREATE TABLE IF NOT EXISTS deputados (
     id INTEGER PRIMARY KEY,
     nome TEXT NOT NULL,
     partido TEXT,
+    partido_id INTEGER REFERENCES partidos(id),
     uf TEXT,
     email TEXT,
     data_nascimento DATE,
@@ -19,6 +36,7 @@ CREATE TABLE IF NOT EXISTS deputados (
 -- Índices para deputados
 CREATE INDEX IF NOT EXISTS idx_deputados_nome ON deputados(nome);
 CREATE INDEX IF NOT EXISTS idx_deputados_partido ON deputados(partido);
+CREATE INDEX IF NOT EXISTS idx_deputados_partido_id ON deputados(partido_id);
 CREATE INDEX IF NOT EXISTS idx_deputados_uf ON deputados(uf);
 
 -- Tabela de Gastos Parlamentares
@@ -27,23 +45,158 @@ CREATE TABLE IF NOT EXISTS gastos (
     deputado_id INTEGER NOT NULL,
     ano INTEGER NOT NULL,
     mes INTEGER NOT NULL,
-    tipo_despesa TEXT NOT NULL,
+    tipo_despesa_id INTEGER NOT NULL,
     valor_documento REAL NOT NULL,
     valor_liquido REAL NOT NULL,
-    fornecedor TEXT,
-    cnpj_fornecedor TEXT,
-    numero_documento TEXT,
-    data_documento DATE,
+    fornecedor_id INTEGER NOT NULL,
+    cod_documento INTEGER NOT NULL DEFAULT 0,
+    numero_documento TEXT NOT NULL DEFAULT '',
+    data_documento DATE NOT NULL DEFAULT '',
+    parcela INTEGER NOT NULL DEFAULT 0,
     url_documento TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (deputado_id) REFERENCES deputados(id)
+    FOREIGN KEY (deputado_id) REFERENCES deputados(id),
+    FOREIGN KEY (tipo_despesa_id) REFERENCES tipos_despesa(id),
+    FOREIGN KEY (fornecedor_id) REFERENCES fornecedores(id)
+);
+
+-- Chave natural: o mesmo documento coletado de novo atualiza a linha existente
+-- (também atende às buscas por deputado_id, por ser a primeira coluna)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_gastos_chave_natural ON gastos(
+    deputado_id, cod_documento, numero_documento, data_documento,
+    valor_documento, fornecedor_id, parcela
 );
 
 -- Índices para gastos
-CREATE INDEX IF NOT EXISTS idx_gastos_deputado ON gastos(deputado_id);
 CREATE INDEX IF NOT EXISTS idx_gastos_ano_mes ON gastos(ano, mes);
-CREATE INDEX IF NOT EXISTS idx_gastos_tipo ON gastos(tipo_despesa);
+CREATE INDEX IF NOT EXISTS idx_gastos_tipo ON gastos(tipo_despesa_id);
 CREATE INDEX IF NOT EXISTS idx_gastos_data ON gastos(data_documento);
+CREATE INDEX IF NOT EXISTS idx_gastos_fornecedor ON gastos(fornecedor_id);
+
+-- Tabela de Fornecedores (dimensão normalizada por CNPJ/CPF)
+CREATE TABLE IF NOT EXISTS fornecedores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chave TEXT NOT NULL UNIQUE, -- dígitos do CNPJ/CPF ou 'nome:<NOME>' quando não há documento
+    documento TEXT, -- apenas dígitos (14 = CNPJ, 11 = CPF)
+    nome TEXT NOT NULL, -- nome canônico (maiúsculo, espaços normalizados)
+    total_liquido REAL NOT NULL DEFAULT 0,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Índices para fornecedores
+CREATE INDEX IF NOT EXISTS idx_fornecedores_documento ON fornecedores(documento);
+CREATE INDEX IF NOT EXISTS idx_fornecedores_nome ON fornecedores(nome);
+CREATE INDEX IF NOT EXISTS idx_fornecedores_total ON fornecedores(total_liquido DESC);
+
+-- Totais acumulados por fornecedor, deputado, ano e categoria (mantidos por trigger)
+CREATE TABLE IF NOT EXISTS fornecedor_totais (
+    fornecedor_id INTEGER NOT NULL,
+    deputado_id INTEGER NOT NULL,
+    ano INTEGER NOT NULL,
+    tipo_despesa_id INTEGER NOT NULL,
+    total_liquido REAL NOT NULL DEFAULT 0,
+    quantidade INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (fornecedor_id, deputado_id, ano, tipo_despesa_id),
+    FOREIGN KEY (fornecedor_id) REFERENCES fornecedores(id),
+    FOREIGN KEY (deputado_id) REFERENCES deputados(id)
+) WITHOUT ROWID;
+
+-- Índices para totais por fornecedor
+CREATE INDEX IF NOT EXISTS idx_fornecedor_totais_deputado ON fornecedor_totais(deputado_id, ano);
+
+-- Tabela de Limites da Cota Parlamentar (CEAP) por UF e período
+CREATE TABLE IF NOT EXISTS cota_limites (
+    uf TEXT NOT NULL,
+    vigencia_inicio DATE NOT NULL, -- primeiro dia de vigência (YYYY-MM-DD)
+    vigencia_fim DATE, -- último dia de vigência (NULL = vigente)
+    valor_mensal REAL NOT NULL,
+    PRIMARY KEY (uf, vigencia_inicio)
+);
+
+-- Valores mensais da CEAP publicados pela Câmara (reajuste de 2023). A vigência
+-- começa no primeiro mês em que estes valores foram conferidos: meses anteriores
+-- ficam sem limite (e fora de vw_cota_utilizacao) até que os períodos antigos
+-- sejam cadastrados aqui. Em caso de reajuste, preencha vigencia_fim do período
+-- atual, insira o novo período e rode `python3 database/cota.py --recalcular`
+INSERT OR IGNORE INTO cota_limites (uf, vigencia_inicio, valor_mensal) VALUES
+    ('AC', '2024-01-01', 50426.26),
+    ('AL', '2024-01-01', 46737.90),
+    ('AM', '2024-01-01', 49363.92),
+    ('AP', '2024-01-01', 49168.58),
+    ('BA', '2024-01-01', 44804.65),
+    ('CE', '2024-01-01', 48245.57),
+    ('DF', '2024-01-01', 36582.46),
+    ('ES', '2024-01-01', 43217.71),
+    ('GO', '2024-01-01', 41300.86),
+    ('MA', '2024-01-01', 47945.49),
+    ('MG', '2024-01-01', 41886.51),
+    ('MS', '2024-01-01', 46336.64),
+    ('MT', '2024-01-01', 45221.83),
+    ('PA', '2024-01-01', 48021.25),
+    ('PB', '2024-01-01', 47826.36),
+    ('PE', '2024-01-01', 47470.60),
+    ('PI', '2024-01-01', 46765.57),
+    ('PR', '2024-01-01', 44665.66),
+    ('RJ', '2024-01-01', 41553.77),
+    ('RN', '2024-01-01', 48525.79),
+    ('RO', '2024-01-01', 49466.29),
+    ('RR', '2024-01-01', 51406.33),
+    ('RS', '2024-01-01', 46669.70),
+    ('SC', '2024-01-01', 45671.58),
+    ('SE', '2024-01-01', 45933.06),
+    ('SP', '2024-01-01', 42837.33),
+    ('TO', '2024-01-01', 45297.41);
+
+-- Utilização da cota por deputado e mês (mantida por trigger a partir de gastos)
+CREATE TABLE IF NOT EXISTS cota_utilizacao (
+    deputado_id INTEGER NOT NULL,
+    ano INTEGER NOT NULL,
+    mes INTEGER NOT NULL,
+    gasto REAL NOT NULL DEFAULT 0,
+    limite REAL, -- NULL quando a UF do deputado ainda não é conhecida
+    percentual REAL,
+    PRIMARY KEY (deputado_id, ano, mes),
+    FOREIGN KEY (deputado_id) REFERENCES deputados(id)
+) WITHOUT ROWID;
+
+-- Índices para utilização da cota
+CREATE INDEX IF NOT EXISTS idx_cota_utilizacao_mes ON cota_utilizacao(ano, mes, percentual DESC);
+
+-- Gastos por mês do documento e deputado (mantido por trigger a partir de gastos;
+-- base de vw_ranking_gastos_12m). Gastos sem data_documento não entram, como na view
+CREATE TABLE IF NOT EXISTS resumo_gastos_mensal (
+    mes_documento TEXT NOT NULL, -- 'YYYY-MM' de data_documento
+    deputado_id INTEGER NOT NULL,
+    total_gasto REAL NOT NULL DEFAULT 0,
+    total_despesas INTEGER NOT NULL DEFAULT 0,
+    ultima_despesa DATE,
+    PRIMARY KEY (mes_documento, deputado_id),
+    FOREIGN KEY (deputado_id) REFERENCES deputados(id)
+) WITHOUT ROWID;
+
+-- Grafo de coocorrência deputado × fornecedor (reconstruído por grafo_fornecedores.py)
+CREATE TABLE IF NOT EXISTS grafo_arestas (
+    tipo TEXT NOT NULL, -- 'deputado' (fornecedores em comum) ou 'fornecedor' (deputados em comum)
+    origem_id INTEGER NOT NULL,
+    destino_id INTEGER NOT NULL, -- sempre origem_id < destino_id
+    peso REAL NOT NULL,
+    PRIMARY KEY (tipo, origem_id, destino_id)
+) WITHOUT ROWID;
+
+-- Índices para arestas do grafo
+CREATE INDEX IF NOT EXISTS idx_grafo_arestas_destino ON grafo_arestas(tipo, destino_id);
+CREATE INDEX IF NOT EXISTS idx_grafo_arestas_peso ON grafo_arestas(tipo, peso DESC);
+
+CREATE TABLE IF NOT EXISTS grafo_componentes (
+    deputado_id INTEGER PRIMARY KEY,
+    componente INTEGER NOT NULL,
+    tamanho INTEGER NOT NULL,
+    FOREIGN KEY (deputado_id) REFERENCES deputados(id)
+);
+
+-- Índices para componentes do grafo
+CREATE INDEX IF NOT EXISTS idx_grafo_componentes ON grafo_componentes(componente);
 
 -- Tabela de Projetos de Lei
 CREATE TABLE IF NOT EXISTS projetos_lei (
@@ -72,19 +225,65 @@ CREATE INDEX IF NOT EXISTS idx_pls_data ON projetos_lei(data_apresentacao);
 CREATE INDEX IF NOT EXISTS idx_pls_categoria ON projetos_lei(categoria);
 CREATE INDEX IF NOT EXISTS idx_pls_status ON projetos_lei(status);
 
+-- Histórico de tramitação de PLs e MPs (só entradas com sequência nova são inseridas)
+CREATE TABLE IF NOT EXISTS tramitacoes (
+    proposicao_id INTEGER NOT NULL, -- projetos_lei.id ou medidas_provisorias.id
+    sequencia INTEGER NOT NULL,
+    data_hora TEXT NOT NULL,
+    orgao_id INTEGER, -- código em orgaos
+    descricao TEXT, -- descricaoTramitacao
+    situacao TEXT, -- descricaoSituacao
+    despacho TEXT,
+    PRIMARY KEY (proposicao_id, sequencia),
+    FOREIGN KEY (orgao_id) REFERENCES orgaos(id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_data ON tramitacoes(data_hora);
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_orgao ON tramitacoes(orgao_id, data_hora);
+
+-- Autores de cada PL na ordem de assinatura (deputado_id nulo para autores que não são deputados)
+CREATE TABLE IF NOT EXISTS autorias (
+    proposicao_id INTEGER NOT NULL, -- projetos_lei.id
+    ordem INTEGER NOT NULL, -- ordemAssinatura
+    deputado_id INTEGER, -- extraído da uri do autor
+    nome TEXT NOT NULL,
+    tipo TEXT, -- Deputado, Órgão do Poder Executivo, Senado Federal...
+    proponente BOOLEAN,
+    partido TEXT, -- siglaPartido do autor na API (vale sem o deputado em deputados)
+    uf TEXT, -- siglaUf do autor na API
+    PRIMARY KEY (proposicao_id, ordem)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_autorias_deputado ON autorias(deputado_id, proposicao_id);
+
+-- PLs por ano e categoria (mantido por trigger a partir de projetos_lei; base de
+-- vw_pls_por_categoria_ano). Categoria nula é gravada como ''
+CREATE TABLE IF NOT EXISTS resumo_pls_categoria_ano (
+    ano INTEGER NOT NULL,
+    categoria TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    aprovados INTEGER NOT NULL DEFAULT 0,
+    soma_importancia INTEGER NOT NULL DEFAULT 0,
+    com_importancia INTEGER NOT NULL DEFAULT 0, -- PLs com importancia não nula (divisor da média)
+    PRIMARY KEY (ano, categoria)
+) WITHOUT ROWID;
+
 -- Tabela de Votações
 CREATE TABLE IF NOT EXISTS votacoes (
     id TEXT PRIMARY KEY,
     data TIMESTAMP NOT NULL,
     descricao TEXT,
     proposicao TEXT,
+    proposicao_id INTEGER,
     votos_sim INTEGER DEFAULT 0,
     votos_nao INTEGER DEFAULT 0,
     votos_outros INTEGER DEFAULT 0,
     aprovacao BOOLEAN,
     importancia INTEGER DEFAULT 1,
     orgao TEXT,
+    orgao_id INTEGER REFERENCES orgaos(id),
     url TEXT,
+    data_ultima_coleta TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -92,22 +291,52 @@ CREATE TABLE IF NOT EXISTS votacoes (
 CREATE INDEX IF NOT EXISTS idx_votacoes_data ON votacoes(data);
 CREATE INDEX IF NOT EXISTS idx_votacoes_aprovacao ON votacoes(aprovacao);
 CREATE INDEX IF NOT EXISTS idx_votacoes_importancia ON votacoes(importancia);
+CREATE INDEX IF NOT EXISTS idx_votacoes_proposicao ON votacoes(proposicao_id);
+
+-- Tipos de voto (código inteiro em votos_deputados)
+CREATE TABLE IF NOT EXISTS tipos_voto (
+    id INTEGER PRIMARY KEY,
+    descricao TEXT NOT NULL UNIQUE
+);
+
+INSERT OR IGNORE INTO tipos_voto (id, descricao) VALUES
+    (0, 'Outro'),
+    (1, 'Sim'),
+    (2, 'Não'),
+    (3, 'Abstenção'),
+    (4, 'Obstrução'),
+    (5, 'Artigo 17'),
+    (6, 'Liberado');
 
 -- Tabela de Votos de Deputados (detalhamento de cada votação)
+-- Um voto por deputado por votação; sem rowid, a chave é o próprio registro
 CREATE TABLE IF NOT EXISTS votos_deputados (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
     votacao_id TEXT NOT NULL,
     deputado_id INTEGER NOT NULL,
-    voto TEXT NOT NULL, -- 'Sim', 'Não', 'Abstenção', etc.
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    tipo_voto INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (votacao_id, deputado_id),
     FOREIGN KEY (votacao_id) REFERENCES votacoes(id),
-    FOREIGN KEY (deputado_id) REFERENCES deputados(id)
-);
+    FOREIGN KEY (deputado_id) REFERENCES deputados(id),
+    FOREIGN KEY (tipo_voto) REFERENCES tipos_voto(id)
+) WITHOUT ROWID;
 
--- Índices para votos de deputados
-CREATE INDEX IF NOT EXISTS idx_votos_votacao ON votos_deputados(votacao_id);
-CREATE INDEX IF NOT EXISTS idx_votos_deputado ON votos_deputados(deputado_id);
-CREATE INDEX IF NOT EXISTS idx_votos_tipo ON votos_deputados(voto);
+-- Índices para votos de deputados (buscas por votação usam a chave primária;
+-- por deputado, o índice já cobre votacao_id e tipo_voto)
+CREATE INDEX IF NOT EXISTS idx_votos_deputado ON votos_deputados(deputado_id, tipo_voto);
+
+-- Orientação de cada partido/bloco (e da liderança do governo) por votação
+CREATE TABLE IF NOT EXISTS orientacoes (
+    votacao_id TEXT NOT NULL,
+    sigla TEXT NOT NULL, -- siglaPartidoBloco
+    tipo_lideranca TEXT, -- 'P' partido, 'B' bloco, 'G' governo...
+    orientacao INTEGER NOT NULL DEFAULT 0, -- código em tipos_voto (6 = Liberado)
+    PRIMARY KEY (votacao_id, sigla),
+    FOREIGN KEY (votacao_id) REFERENCES votacoes(id),
+    FOREIGN KEY (orientacao) REFERENCES tipos_voto(id)
+) WITHOUT ROWID;
+
+-- Índices para orientações
+CREATE INDEX IF NOT EXISTS idx_orientacoes_sigla ON orientacoes(sigla, orientacao);
 
 -- Tabela de Medidas Provisórias
 CREATE TABLE IF NOT EXISTS medidas_provisorias (
@@ -118,12 +347,14 @@ CREATE TABLE IF NOT EXISTS medidas_provisorias (
     data_apresentacao DATE,
     prazo_vencimento DATE,
     dias_restantes INTEGER,
+    prazo_vencido BOOLEAN DEFAULT 0,
     nivel_urgencia INTEGER DEFAULT 1,
     status TEXT,
     categoria TEXT,
     importancia INTEGER DEFAULT 1,
     aprovacao BOOLEAN,
     url TEXT,
+    data_ultima_coleta TIMESTAMP,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -151,6 +382,55 @@ CREATE INDEX IF NOT EXISTS idx_noticias_fonte ON noticias(fonte);
 CREATE INDEX IF NOT EXISTS idx_noticias_data ON noticias(data_publicacao);
 CREATE INDEX IF NOT EXISTS idx_noticias_posted ON noticias(posted_at);
 
+-- Busca textual (FTS5) sobre ementas de PLs e MPs e títulos de notícias, sem
+-- distinção de acentos. Conteúdo externo: o texto fica só na tabela base e o
+-- índice é mantido pelos triggers *_busca_* (database/busca.py consulta)
+CREATE VIRTUAL TABLE IF NOT EXISTS busca_pls USING fts5(
+    ementa, content='projetos_lei', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS busca_mps USING fts5(
+    ementa, content='medidas_provisorias', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS busca_noticias USING fts5(
+    titulo, content='noticias', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+-- Watchlist: deputados acompanhados em alta frequência
+CREATE TABLE IF NOT EXISTS watchlist (
+    deputado_id INTEGER PRIMARY KEY,
+    origem TEXT DEFAULT 'config', -- 'config' (DEPUTADOS_MONITORADOS) ou 'manual'
+    ativo BOOLEAN DEFAULT 1, -- removidos ficam inativos para não voltarem pela configuração
+    adicionado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Cache de validadores HTTP para requisições condicionais (ETag / Last-Modified)
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Eventos: registros vistos pela primeira vez (despesas, votos, votações)
+CREATE TABLE IF NOT EXISTS eventos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL, -- 'despesa', 'votacao', 'voto'
+    chave TEXT NOT NULL, -- identificador natural do registro dentro do tipo
+    deputado_id INTEGER,
+    dados TEXT, -- JSON do registro original
+    criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (tipo, chave)
+);
+
+-- Índices para eventos
+CREATE INDEX IF NOT EXISTS idx_eventos_deputado ON eventos(deputado_id, criado_em);
+CREATE INDEX IF NOT EXISTS idx_eventos_criado ON eventos(criado_em);
+
 -- Tabela de Coleta (controle de progresso)
 CREATE TABLE IF NOT EXISTS coleta_historica (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -170,33 +450,92 @@ CREATE INDEX IF NOT EXISTS idx_coleta_tipo ON coleta_historica(tipo);
 CREATE INDEX IF NOT EXISTS idx_coleta_status ON coleta_historica(status);
 CREATE INDEX IF NOT EXISTS idx_coleta_ano ON coleta_historica(ano);
 
+-- Unidades de coleta concluídas (checkpoint para retomar coletas interrompidas)
+CREATE TABLE IF NOT EXISTS checkpoints_coleta (
+    entidade TEXT NOT NULL, -- 'gastos', 'pls', 'votacoes', 'mps'
+    ano INTEGER NOT NULL,
+    mes INTEGER NOT NULL DEFAULT 0, -- 0 = ano inteiro
+    unidade TEXT NOT NULL DEFAULT '', -- deputado, página ou '' (partição inteira)
+    total_registros INTEGER DEFAULT 0,
+    concluido_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entidade, ano, mes, unidade)
+) WITHOUT ROWID;
+
+-- Marca d'água da sincronização incremental: até onde cada entidade já foi lida
+CREATE TABLE IF NOT EXISTS sync_watermarks (
+    entidade TEXT PRIMARY KEY, -- 'pls', 'votacoes', 'mps'
+    ultima_data TEXT NOT NULL, -- dataHoraRegistro (votações) ou data da última sincronização
+    ultimo_id TEXT, -- último id visto nessa data
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Shards da coleta distribuída: cada processo reivindica um shard com prazo (lease)
+CREATE TABLE IF NOT EXISTS work_leases (
+    entidade TEXT NOT NULL, -- 'gastos', 'pls', 'votacoes', 'mps'
+    shard TEXT NOT NULL, -- 'AAAA-MM:id_inicial-id_final' (gastos), 'AAAA-MM' ou 'AAAA'
+    status TEXT NOT NULL DEFAULT 'pending', -- 'pending', 'leased', 'done', 'error'
+    worker TEXT, -- host:pid de quem detém (ou deteve) o lease
+    expira_em REAL, -- epoch em segundos; vencido, o shard pode ser reivindicado de novo
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    total_registros INTEGER DEFAULT 0,
+    erro TEXT,
+    atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entidade, shard)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_work_leases_status ON work_leases(status, expira_em);
+
+-- Execuções das etapas do pipeline de coleta (database/pipeline.py)
+CREATE TABLE IF NOT EXISTS pipeline_execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    etapa TEXT NOT NULL,
+    status TEXT NOT NULL, -- 'ok', 'pulada', 'erro'
+    assinatura_entradas TEXT, -- estado das tabelas de entrada quando a etapa rodou
+    duracao_segundos REAL,
+    requisicoes INTEGER DEFAULT 0,
+    erro TEXT,
+    iniciado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_etapa ON pipeline_execucoes(etapa, status, id);
+
 -- View: Ranking de Gastos por Deputado (últimos 12 meses)
+-- Meses inteiros da janela vêm de resumo_gastos_mensal; do mês de borda, só os
+-- documentos a partir de date('now', '-12 months'), lidos de gastos pelo índice de data
 CREATE VIEW IF NOT EXISTS vw_ranking_gastos_12m AS
 SELECT 
     d.id,
     d.nome,
     d.partido,
     d.uf,
-    SUM(g.valor_liquido) as total_gasto,
-    COUNT(g.id) as total_despesas,
-    AVG(g.valor_liquido) as media_despesa,
-    MAX(g.data_documento) as ultima_despesa
-FROM deputados d
-LEFT JOIN gastos g ON d.id = g.deputado_id
-WHERE g.data_documento >= date('now', '-12 months')
+    SUM(r.total_gasto) as total_gasto,
+    SUM(r.total_despesas) as total_despesas,
+    SUM(r.total_gasto) / SUM(r.total_despesas) as media_despesa,
+    MAX(r.ultima_despesa) as ultima_despesa
+FROM (
+    SELECT deputado_id, total_gasto, total_despesas, ultima_despesa
+    FROM resumo_gastos_mensal
+    WHERE mes_documento > strftime('%Y-%m', 'now', '-12 months')
+    UNION ALL
+    SELECT deputado_id, valor_liquido, 1, data_documento
+    FROM gastos
+    WHERE data_documento >= date('now', '-12 months')
+      AND data_documento < date('now', '-12 months', 'start of month', '+1 month')
+) r
+JOIN deputados d ON d.id = r.deputado_id
 GROUP BY d.id, d.nome, d.partido, d.uf
 ORDER BY total_gasto DESC;
 
--- View: PLs por Categoria e Ano
+-- View: PLs por Categoria e Ano (lida de resumo_pls_categoria_ano)
 CREATE VIEW IF NOT EXISTS vw_pls_por_categoria_ano AS
 SELECT 
     ano,
-    categoria,
-    COUNT(*) as total,
-    SUM(CASE WHEN status LIKE '%Aprovad%' THEN 1 ELSE 0 END) as aprovados,
-    ROUND(AVG(importancia), 2) as importancia_media
-FROM projetos_lei
-GROUP BY ano, categoria
+    NULLIF(categoria, '') as categoria,
+    total,
+    aprovados,
+    ROUND(1.0 * soma_importancia / NULLIF(com_importancia, 0), 2) as importancia_media
+FROM resumo_pls_categoria_ano
+WHERE total > 0
 ORDER BY ano DESC, total DESC;
 
 -- View: Taxa de Aprovação por Votação
@@ -211,6 +550,95 @@ FROM votacoes
 GROUP BY DATE(data)
 ORDER BY data DESC;
 
+-- View: Gastos com dimensões decodificadas (mesmas colunas textuais de antes)
+CREATE VIEW IF NOT EXISTS vw_gastos AS
+SELECT 
+    g.id,
+    g.deputado_id,
+    g.ano,
+    g.mes,
+    t.descricao as tipo_despesa,
+    g.valor_documento,
+    g.valor_liquido,
+    f.nome as fornecedor,
+    f.documento as cnpj_fornecedor,
+    g.cod_documento,
+    g.numero_documento,
+    g.data_documento,
+    g.parcela,
+    g.url_documento,
+    g.created_at
+FROM gastos g
+JOIN tipos_despesa t ON t.id = g.tipo_despesa_id
+LEFT JOIN fornecedores f ON f.id = g.fornecedor_id;
+
+-- View: Votos de deputados com o tipo de voto decodificado
+CREATE VIEW IF NOT EXISTS vw_votos_deputados AS
+SELECT 
+    v.votacao_id,
+    v.deputado_id,
+    t.descricao as voto
+FROM votos_deputados v
+JOIN tipos_voto t ON t.id = v.tipo_voto;
+
+-- View: Tramitações com o órgão decodificado (linha do tempo por proposição)
+CREATE VIEW IF NOT EXISTS vw_tramitacoes AS
+SELECT 
+    t.proposicao_id,
+    t.sequencia,
+    t.data_hora,
+    o.sigla as orgao,
+    t.descricao,
+    t.situacao,
+    t.despacho
+FROM tramitacoes t
+LEFT JOIN orgaos o ON o.id = t.orgao_id;
+
+-- View: Autorias com partido e UF do deputado (ou os da API, sem o deputado) e os dados do PL
+CREATE VIEW IF NOT EXISTS vw_autorias AS
+SELECT
+    a.proposicao_id,
+    a.ordem,
+    a.deputado_id,
+    a.nome,
+    a.tipo,
+    a.proponente,
+    COALESCE(d.partido, a.partido) as partido,
+    COALESCE(d.uf, a.uf) as uf,
+    p.numero,
+    p.ano,
+    p.categoria,
+    p.status
+FROM autorias a
+LEFT JOIN deputados d ON a.deputado_id = d.id
+LEFT JOIN projetos_lei p ON a.proposicao_id = p.id;
+
+-- View: Orientações de bancada com o tipo decodificado
+CREATE VIEW IF NOT EXISTS vw_orientacoes AS
+SELECT 
+    o.votacao_id,
+    o.sigla,
+    o.tipo_lideranca,
+    t.descricao as orientacao
+FROM orientacoes o
+JOIN tipos_voto t ON t.id = o.orientacao;
+
+-- View: Utilização da Cota por Deputado e Mês (só meses com limite vigente cadastrado)
+CREATE VIEW IF NOT EXISTS vw_cota_utilizacao AS
+SELECT 
+    c.ano,
+    c.mes,
+    d.id,
+    d.nome,
+    d.partido,
+    d.uf,
+    c.gasto,
+    c.limite,
+    c.percentual
+FROM cota_utilizacao c
+JOIN deputados d ON d.id = c.deputado_id
+WHERE c.limite IS NOT NULL;
+
 -- View: Estatísticas Gerais do Banco
 CREATE VIEW IF NOT EXISTS vw_estatisticas_gerais AS
 SELECT 
@@ -245,6 +673,293 @@ BEGIN
     UPDATE medidas_provisorias SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
+-- Trigger: Acumular totais de fornecedor ao inserir gasto
+CREATE TRIGGER IF NOT EXISTS gastos_fornecedor_insert
+AFTER INSERT ON gastos
+WHEN NEW.fornecedor_id IS NOT NULL
+BEGIN
+    INSERT INTO fornecedor_totais (fornecedor_id, deputado_id, ano, tipo_despesa_id, total_liquido, quantidade)
+    VALUES (NEW.fornecedor_id, NEW.deputado_id, NEW.ano, NEW.tipo_despesa_id, NEW.valor_liquido, 1)
+    ON CONFLICT (fornecedor_id, deputado_id, ano, tipo_despesa_id) DO UPDATE SET
+        total_liquido = total_liquido + excluded.total_liquido,
+        quantidade = quantidade + 1;
+    UPDATE fornecedores
+    SET total_liquido = total_liquido + NEW.valor_liquido, quantidade = quantidade + 1
+    WHERE id = NEW.fornecedor_id;
+END;
+
+-- Trigger: Descontar totais de fornecedor ao remover gasto
+CREATE TRIGGER IF NOT EXISTS gastos_fornecedor_delete
+AFTER DELETE ON gastos
+WHEN OLD.fornecedor_id IS NOT NULL
+BEGIN
+    UPDATE fornecedor_totais
+    SET total_liquido = total_liquido - OLD.valor_liquido, quantidade = quantidade - 1
+    WHERE fornecedor_id = OLD.fornecedor_id AND deputado_id = OLD.deputado_id
+      AND ano = OLD.ano AND tipo_despesa_id = OLD.tipo_despesa_id;
+    UPDATE fornecedores
+    SET total_liquido = total_liquido - OLD.valor_liquido, quantidade = quantidade - 1
+    WHERE id = OLD.fornecedor_id;
+END;
+
+-- Trigger: Reatribuir totais de fornecedor ao alterar gasto
+CREATE TRIGGER IF NOT EXISTS gastos_fornecedor_update
+AFTER UPDATE OF fornecedor_id, deputado_id, ano, tipo_despesa_id, valor_liquido ON gastos
+BEGIN
+    UPDATE fornecedor_totais
+    SET total_liquido = total_liquido - OLD.valor_liquido, quantidade = quantidade - 1
+    WHERE fornecedor_id = OLD.fornecedor_id AND deputado_id = OLD.deputado_id
+      AND ano = OLD.ano AND tipo_despesa_id = OLD.tipo_despesa_id;
+    UPDATE fornecedores
+    SET total_liquido = total_liquido - OLD.valor_liquido, quantidade = quantidade - 1
+    WHERE id = OLD.fornecedor_id;
+    INSERT INTO fornecedor_totais (fornecedor_id, deputado_id, ano, tipo_despesa_id, total_liquido, quantidade)
+    SELECT NEW.fornecedor_id, NEW.deputado_id, NEW.ano, NEW.tipo_despesa_id, NEW.valor_liquido, 1
+    WHERE NEW.fornecedor_id IS NOT NULL
+    ON CONFLICT (fornecedor_id, deputado_id, ano, tipo_despesa_id) DO UPDATE SET
+        total_liquido = total_liquido + excluded.total_liquido,
+        quantidade = quantidade + 1;
+    UPDATE fornecedores
+    SET total_liquido = total_liquido + NEW.valor_liquido, quantidade = quantidade + 1
+    WHERE id = NEW.fornecedor_id;
+END;
+
+-- Trigger: Acumular utilização da cota ao inserir gasto
+CREATE TRIGGER IF NOT EXISTS gastos_cota_insert
+AFTER INSERT ON gastos
+BEGIN
+    INSERT INTO cota_utilizacao (deputado_id, ano, mes, gasto, limite, percentual)
+    SELECT NEW.deputado_id, NEW.ano, NEW.mes, NEW.valor_liquido, limite,
+           ROUND(100.0 * NEW.valor_liquido / limite, 2)
+    FROM (SELECT (
+        SELECT l.valor_mensal
+        FROM deputados d
+        JOIN cota_limites l ON l.uf = d.uf
+        WHERE d.id = NEW.deputado_id
+          AND l.vigencia_inicio <= printf('%04d-%02d-01', NEW.ano, NEW.mes)
+          AND (l.vigencia_fim IS NULL OR l.vigencia_fim >= printf('%04d-%02d-01', NEW.ano, NEW.mes))
+        ORDER BY l.vigencia_inicio DESC
+        LIMIT 1
+    ) AS limite)
+    WHERE true
+    ON CONFLICT (deputado_id, ano, mes) DO UPDATE SET
+        gasto = gasto + excluded.gasto,
+        limite = excluded.limite,
+        percentual = ROUND(100.0 * (gasto + excluded.gasto) / excluded.limite, 2);
+END;
+
+-- Trigger: Descontar utilização da cota ao remover gasto
+CREATE TRIGGER IF NOT EXISTS gastos_cota_delete
+AFTER DELETE ON gastos
+BEGIN
+    UPDATE cota_utilizacao
+    SET gasto = gasto - OLD.valor_liquido,
+        percentual = ROUND(100.0 * (gasto - OLD.valor_liquido) / limite, 2)
+    WHERE deputado_id = OLD.deputado_id AND ano = OLD.ano AND mes = OLD.mes;
+END;
+
+-- Trigger: Reatribuir utilização da cota ao alterar gasto
+CREATE TRIGGER IF NOT EXISTS gastos_cota_update
+AFTER UPDATE OF deputado_id, ano, mes, valor_liquido ON gastos
+BEGIN
+    UPDATE cota_utilizacao
+    SET gasto = gasto - OLD.valor_liquido,
+        percentual = ROUND(100.0 * (gasto - OLD.valor_liquido) / limite, 2)
+    WHERE deputado_id = OLD.deputado_id AND ano = OLD.ano AND mes = OLD.mes;
+    INSERT INTO cota_utilizacao (deputado_id, ano, mes, gasto, limite, percentual)
+    SELECT NEW.deputado_id, NEW.ano, NEW.mes, NEW.valor_liquido, limite,
+           ROUND(100.0 * NEW.valor_liquido / limite, 2)
+    FROM (SELECT (
+        SELECT l.valor_mensal
+        FROM deputados d
+        JOIN cota_limites l ON l.uf = d.uf
+        WHERE d.id = NEW.deputado_id
+          AND l.vigencia_inicio <= printf('%04d-%02d-01', NEW.ano, NEW.mes)
+          AND (l.vigencia_fim IS NULL OR l.vigencia_fim >= printf('%04d-%02d-01', NEW.ano, NEW.mes))
+        ORDER BY l.vigencia_inicio DESC
+        LIMIT 1
+    ) AS limite)
+    WHERE true
+    ON CONFLICT (deputado_id, ano, mes) DO UPDATE SET
+        gasto = gasto + excluded.gasto,
+        limite = excluded.limite,
+        percentual = ROUND(100.0 * (gasto + excluded.gasto) / excluded.limite, 2);
+END;
+
+-- Trigger: Acumular resumo mensal de gastos ao inserir gasto
+CREATE TRIGGER IF NOT EXISTS gastos_resumo_insert
+AFTER INSERT ON gastos
+WHEN NEW.data_documento <> ''
+BEGIN
+    INSERT INTO resumo_gastos_mensal (mes_documento, deputado_id, total_gasto, total_despesas, ultima_despesa)
+    VALUES (substr(NEW.data_documento, 1, 7), NEW.deputado_id, NEW.valor_liquido, 1, NEW.data_documento)
+    ON CONFLICT (mes_documento, deputado_id) DO UPDATE SET
+        total_gasto = total_gasto + excluded.total_gasto,
+        total_despesas = total_despesas + 1,
+        ultima_despesa = MAX(ultima_despesa, excluded.ultima_despesa);
+END;
+
+-- Trigger: Descontar resumo mensal de gastos ao remover gasto
+CREATE TRIGGER IF NOT EXISTS gastos_resumo_delete
+AFTER DELETE ON gastos
+WHEN OLD.data_documento <> ''
+BEGIN
+    UPDATE resumo_gastos_mensal
+    SET total_gasto = total_gasto - OLD.valor_liquido,
+        total_despesas = total_despesas - 1,
+        ultima_despesa = (
+            SELECT MAX(data_documento) FROM gastos
+            WHERE deputado_id = OLD.deputado_id
+              AND data_documento >= substr(OLD.data_documento, 1, 7)
+              AND data_documento < substr(OLD.data_documento, 1, 7) || '~'
+        )
+    WHERE mes_documento = substr(OLD.data_documento, 1, 7) AND deputado_id = OLD.deputado_id;
+    DELETE FROM resumo_gastos_mensal
+    WHERE mes_documento = substr(OLD.data_documento, 1, 7) AND deputado_id = OLD.deputado_id
+      AND total_despesas <= 0;
+END;
+
+-- Trigger: Reatribuir resumo mensal de gastos ao alterar gasto
+CREATE TRIGGER IF NOT EXISTS gastos_resumo_update
+AFTER UPDATE OF deputado_id, valor_liquido, data_documento ON gastos
+BEGIN
+    UPDATE resumo_gastos_mensal
+    SET total_gasto = total_gasto - OLD.valor_liquido,
+        total_despesas = total_despesas - 1,
+        ultima_despesa = (
+            SELECT MAX(data_documento) FROM gastos
+            WHERE deputado_id = OLD.deputado_id
+              AND data_documento >= substr(OLD.data_documento, 1, 7)
+              AND data_documento < substr(OLD.data_documento, 1, 7) || '~'
+        )
+    WHERE mes_documento = substr(OLD.data_documento, 1, 7) AND deputado_id = OLD.deputado_id;
+    DELETE FROM resumo_gastos_mensal
+    WHERE mes_documento = substr(OLD.data_documento, 1, 7) AND deputado_id = OLD.deputado_id
+      AND total_despesas <= 0;
+    INSERT INTO resumo_gastos_mensal (mes_documento, deputado_id, total_gasto, total_despesas, ultima_despesa)
+    SELECT substr(NEW.data_documento, 1, 7), NEW.deputado_id, NEW.valor_liquido, 1, NEW.data_documento
+    WHERE NEW.data_documento <> ''
+    ON CONFLICT (mes_documento, deputado_id) DO UPDATE SET
+        total_gasto = total_gasto + excluded.total_gasto,
+        total_despesas = total_despesas + 1,
+        ultima_despesa = MAX(ultima_despesa, excluded.ultima_despesa);
+END;
+
+-- Trigger: Contar PL no resumo por ano e categoria ao inserir
+CREATE TRIGGER IF NOT EXISTS pls_resumo_insert
+AFTER INSERT ON projetos_lei
+BEGIN
+    INSERT INTO resumo_pls_categoria_ano (ano, categoria, total, aprovados, soma_importancia, com_importancia)
+    VALUES (NEW.ano, IFNULL(NEW.categoria, ''), 1, IFNULL(NEW.status, '') LIKE '%Aprovad%',
+            IFNULL(NEW.importancia, 0), NEW.importancia IS NOT NULL)
+    ON CONFLICT (ano, categoria) DO UPDATE SET
+        total = total + 1,
+        aprovados = aprovados + excluded.aprovados,
+        soma_importancia = soma_importancia + excluded.soma_importancia,
+        com_importancia = com_importancia + excluded.com_importancia;
+END;
+
+-- Trigger: Descontar PL do resumo ao remover
+CREATE TRIGGER IF NOT EXISTS pls_resumo_delete
+AFTER DELETE ON projetos_lei
+BEGIN
+    UPDATE resumo_pls_categoria_ano
+    SET total = total - 1,
+        aprovados = aprovados - (IFNULL(OLD.status, '') LIKE '%Aprovad%'),
+        soma_importancia = soma_importancia - IFNULL(OLD.importancia, 0),
+        com_importancia = com_importancia - (OLD.importancia IS NOT NULL)
+    WHERE ano = OLD.ano AND categoria = IFNULL(OLD.categoria, '');
+END;
+
+-- Trigger: Reatribuir PL no resumo ao alterar ano, categoria, situação ou importância
+CREATE TRIGGER IF NOT EXISTS pls_resumo_update
+AFTER UPDATE OF ano, categoria, status, importancia ON projetos_lei
+BEGIN
+    UPDATE resumo_pls_categoria_ano
+    SET total = total - 1,
+        aprovados = aprovados - (IFNULL(OLD.status, '') LIKE '%Aprovad%'),
+        soma_importancia = soma_importancia - IFNULL(OLD.importancia, 0),
+        com_importancia = com_importancia - (OLD.importancia IS NOT NULL)
+    WHERE ano = OLD.ano AND categoria = IFNULL(OLD.categoria, '');
+    INSERT INTO resumo_pls_categoria_ano (ano, categoria, total, aprovados, soma_importancia, com_importancia)
+    VALUES (NEW.ano, IFNULL(NEW.categoria, ''), 1, IFNULL(NEW.status, '') LIKE '%Aprovad%',
+            IFNULL(NEW.importancia, 0), NEW.importancia IS NOT NULL)
+    ON CONFLICT (ano, categoria) DO UPDATE SET
+        total = total + 1,
+        aprovados = aprovados + excluded.aprovados,
+        soma_importancia = soma_importancia + excluded.soma_importancia,
+        com_importancia = com_importancia + excluded.com_importancia;
+END;
+
+-- Trigger: Indexar ementa de PL na busca textual
+CREATE TRIGGER IF NOT EXISTS pls_busca_insert
+AFTER INSERT ON projetos_lei
+BEGIN
+    INSERT INTO busca_pls (rowid, ementa) VALUES (NEW.id, NEW.ementa);
+END;
+
+-- Trigger: Remover ementa de PL da busca textual
+CREATE TRIGGER IF NOT EXISTS pls_busca_delete
+AFTER DELETE ON projetos_lei
+BEGIN
+    INSERT INTO busca_pls (busca_pls, rowid, ementa) VALUES ('delete', OLD.id, OLD.ementa);
+END;
+
+-- Trigger: Reindexar ementa de PL alterada
+CREATE TRIGGER IF NOT EXISTS pls_busca_update
+AFTER UPDATE OF id, ementa ON projetos_lei
+WHEN OLD.id IS NOT NEW.id OR OLD.ementa IS NOT NEW.ementa
+BEGIN
+    INSERT INTO busca_pls (busca_pls, rowid, ementa) VALUES ('delete', OLD.id, OLD.ementa);
+    INSERT INTO busca_pls (rowid, ementa) VALUES (NEW.id, NEW.ementa);
+END;
+
+-- Trigger: Indexar ementa de MP na busca textual
+CREATE TRIGGER IF NOT EXISTS mps_busca_insert
+AFTER INSERT ON medidas_provisorias
+BEGIN
+    INSERT INTO busca_mps (rowid, ementa) VALUES (NEW.id, NEW.ementa);
+END;
+
+-- Trigger: Remover ementa de MP da busca textual
+CREATE TRIGGER IF NOT EXISTS mps_busca_delete
+AFTER DELETE ON medidas_provisorias
+BEGIN
+    INSERT INTO busca_mps (busca_mps, rowid, ementa) VALUES ('delete', OLD.id, OLD.ementa);
+END;
+
+-- Trigger: Reindexar ementa de MP alterada
+CREATE TRIGGER IF NOT EXISTS mps_busca_update
+AFTER UPDATE OF id, ementa ON medidas_provisorias
+WHEN OLD.id IS NOT NEW.id OR OLD.ementa IS NOT NEW.ementa
+BEGIN
+    INSERT INTO busca_mps (busca_mps, rowid, ementa) VALUES ('delete', OLD.id, OLD.ementa);
+    INSERT INTO busca_mps (rowid, ementa) VALUES (NEW.id, NEW.ementa);
+END;
+
+-- Trigger: Indexar título de notícia na busca textual
+CREATE TRIGGER IF NOT EXISTS noticias_busca_insert
+AFTER INSERT ON noticias
+BEGIN
+    INSERT INTO busca_noticias (rowid, titulo) VALUES (NEW.id, NEW.titulo);
+END;
+
+-- Trigger: Remover título de notícia da busca textual
+CREATE TRIGGER IF NOT EXISTS noticias_busca_delete
+AFTER DELETE ON noticias
+BEGIN
+    INSERT INTO busca_noticias (busca_noticias, rowid, titulo) VALUES ('delete', OLD.id, OLD.titulo);
+END;
+
+-- Trigger: Reindexar título de notícia alterado
+CREATE TRIGGER IF NOT EXISTS noticias_busca_update
+AFTER UPDATE OF id, titulo ON noticias
+WHEN OLD.id IS NOT NEW.id OR OLD.titulo IS NOT NEW.titulo
+BEGIN
+    INSERT INTO busca_noticias (busca_noticias, rowid, titulo) VALUES ('delete', OLD.id, OLD.titulo);
+    INSERT INTO busca_noticias (rowid, titulo) VALUES (NEW.id, NEW.titulo);
+END;
+
 -- ============================================
 -- Schema Version Control
 -- ============================================
@@ -257,3 +972,59 @@ CREATE TABLE IF NOT EXISTS schema_version (
 INSERT OR IGNORE INTO schema_version (version, description) 
 VALUES (1, 'Schema inicial com todas as tabelas, índices e views');
 
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (2, 'Dimensão fornecedores com CNPJ/CPF normalizado e totais por fornecedor');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (3, 'Limites da CEAP por UF e utilização da cota por deputado e mês');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (4, 'Grafo de coocorrência deputado × fornecedor');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (5, 'Watchlist de deputados, cache HTTP condicional e eventos');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (6, 'Dimensões codificadas: tipos_despesa, partidos, orgaos; gastos sem textos repetidos');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (7, 'Chave natural única em gastos (UPSERT na coleta)');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (8, 'votos_deputados com chave (votacao_id, deputado_id) WITHOUT ROWID e tipo de voto codificado');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (9, 'Colunas gravadas pelos coletores: votacoes.proposicao_id/data_ultima_coleta, medidas_provisorias.prazo_vencido/data_ultima_coleta');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (10, 'Orientações de bancada por votação (orientacoes)');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (11, 'Marcas d''água da sincronização incremental (sync_watermarks)');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (12, 'Checkpoints da coleta histórica (checkpoints_coleta)');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (13, 'Leases da coleta distribuída (work_leases)');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (14, 'Execuções do pipeline de coleta (pipeline_execucoes)');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (15, 'Histórico de tramitação de PLs e MPs (tramitacoes)');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (16, 'Autorias de PLs (autorias)');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (17, 'Resumos materializados de gastos por mês e PLs por categoria e ano');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (18, 'Busca textual FTS5 em ementas de PLs e MPs e títulos de notícias');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (19, 'Partido e UF dos autores em autorias');
+
+INSERT OR IGNORE INTO schema_version (version, description) 
+VALUES (20, 'Vigência dos limites da CEAP restrita ao período conferido');
@@ -0,0 +1,281 @@
+"""
+Sincronização Incremental
+Mantém PLs, votações e MPs em dia pedindo à API só o que mudou desde a
+última execução, com uma marca d'água por entidade em sync_watermarks
+"""
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.api_camara import BASE_URL, definir_fluxo, fluxo_atual, paginar, requisicoes_por_fluxo
+from database.autorias import enriquecer_autorias, pls_sem_autoria
+from database.coletor_historico_mps import fetch_mp_details, save_mp_to_db
+from database.coletor_historico_pls import ITENS_POR_PAGINA, enriquecer_pls, salvar_pl
+from database.coletor_historico_votacoes import enriquecer_votacoes, save_vote_to_db
+from database.escrita import EscritorLotes
+from database.tramitacoes import atualizar_tramitacoes
+from src.config import CAMARA_ENRIQUECIMENTO_PARALELO
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ENTIDADES = ('pls', 'votacoes', 'mps')
+
+# Sem marca d'água nem dados no banco, a primeira sincronização olha esses dias para trás
+DIAS_SEM_MARCA = 7
+
+# Janela máxima por consulta de votações (a mesma dos coletores históricos)
+DIAS_POR_JANELA_VOTACOES = 90
+
+# Votações gravadas sem votos há menos que isso seguram a marca até os votos
+# saírem; mais antigas são tratadas como simbólicas (nunca terão votos nominais)
+DIAS_AGUARDANDO_VOTOS = 3
+
+# Marca inicial de bancos populados pelos coletores históricos
+_ULTIMO_REGISTRO = {
+    'pls': "SELECT MAX(data_apresentacao) FROM projetos_lei",
+    'votacoes': "SELECT MAX(data) FROM votacoes",
+    'mps': "SELECT MAX(data_apresentacao) FROM medidas_provisorias",
+}
+
+SQL_AVANCAR_MARCA = """
+    INSERT INTO sync_watermarks (entidade, ultima_data, ultimo_id, atualizado_em)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT (entidade) DO UPDATE SET
+        ultima_data = excluded.ultima_data,
+        ultimo_id = excluded.ultimo_id,
+        atualizado_em = excluded.atualizado_em
+"""
+
+
+def ler_marca(conn, entidade):
+    """
+    Marca d'água atual da entidade.
+
+    Sem registro em sync_watermarks, usa o dado mais recente já gravado
+    (bancos vindos da coleta histórica) ou, com a tabela vazia, DIAS_SEM_MARCA.
+
+    Returns:
+        tuple: (ultima_data, ultimo_id)
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT ultima_data, ultimo_id FROM sync_watermarks WHERE entidade = ?", (entidade,))
+    marca = cursor.fetchone()
+    if marca:
+        return marca[0], marca[1]
+
+    cursor.execute(_ULTIMO_REGISTRO[entidade])
+    ultimo = cursor.fetchone()[0]
+    if ultimo:
+        return ultimo, None
+    return (datetime.now() - timedelta(days=DIAS_SEM_MARCA)).strftime('%Y-%m-%d'), None
+
+
+def avancar_marca(escritor, entidade, ultima_data, ultimo_id=None):
+    """
+    Enfileira o avanço da marca d'água no mesmo lote dos dados.
+
+    O flush seguinte grava dados e marca na mesma transação: se o lote
+    falhar, a marca não anda e a próxima execução repete o intervalo. Os
+    chamadores só avançam a marca até o item mais antigo que falhou na API,
+    para que ele seja buscado de novo.
+    """
+    escritor.adicionar(SQL_AVANCAR_MARCA, (entidade, ultima_data, ultimo_id))
+
+
+def sincronizar_proposicoes(escritor, executor, entidade, desde):
+    """
+    PLs ou MPs com tramitação desde a data da marca.
+
+    O filtro dataInicio/dataFim da API é por data de tramitação, então a
+    listagem traz exatamente as proposições que mudaram; cada uma tem os
+    detalhes (situação, prazos) recarregados e as tramitações novas
+    acrescentadas ao histórico. PLs que ainda não têm autoria gravada
+    ganham a autoria na mesma passada.
+
+    A listagem não informa quando cada proposição mudou: se os detalhes, as
+    tramitações ou a autoria de alguma falharem, a marca fica em `desde` e
+    a próxima execução repete o intervalo inteiro (regravar é idempotente).
+
+    Returns:
+        int: Proposições gravadas
+    """
+    hoje = datetime.now().strftime('%Y-%m-%d')
+    itens = list(paginar(f"{BASE_URL}/proposicoes", {
+        'siglaTipo': 'PL' if entidade == 'pls' else 'MPV',
+        'dataInicio': desde[:10],
+        'dataFim': hoje,
+        'ordem': 'ASC',
+        'ordenarPor': 'id',
+        'itens': ITENS_POR_PAGINA
+    }))
+
+    falhas_autorias = []
+    if entidade == 'pls':
+        completos, falhas = enriquecer_pls(itens, executor)
+        gravados = sum(salvar_pl(escritor, pl) for pl in completos)
+        _, falhas_autorias = enriquecer_autorias(escritor, executor,
+                                                 pls_sem_autoria(escritor.conn, [pl['id'] for pl in itens]))
+    else:
+        ids = [mp['id'] for mp in itens]
+        detalhes = list(executor.map(fetch_mp_details, ids))
+        falhas = [mp_id for mp_id, mp in zip(ids, detalhes) if mp is None]
+        gravados = sum(save_mp_to_db(escritor, mp) for mp in detalhes if mp)
+
+    _, falhas_tramitacoes = atualizar_tramitacoes(escritor, executor, [item['id'] for item in itens])
+    falhas = set(falhas) | set(falhas_autorias) | set(falhas_tramitacoes)
+
+    if falhas:
+        logger.warning(f"⚠️  {entidade}: {len(falhas)} proposições com falha na API; a marca fica em {desde}")
+    else:
+        # A API filtra por dia: a próxima execução recomeça de hoje (repetir o dia é idempotente)
+        avancar_marca(escritor, entidade, hoje, str(max((item['id'] for item in itens), default='')) or None)
+    escritor.flush()
+    return gravados
+
+
+def sincronizar_votacoes(escritor, executor, desde, ultimo_id):
+    """
+    Votações registradas a partir da marca (dataHoraRegistro).
+
+    Votações da própria data da marca que já estão no banco com votos são
+    puladas sem buscar detalhes; cada janela avança a marca ao ser gravada.
+    Se alguma votação falhar na API, ou vier sem votos (publicados depois,
+    como na watchlist) nos últimos DIAS_AGUARDANDO_VOTOS dias, a marca para
+    no seu dataHoraRegistro (o mais antigo pendente) e não anda mais nesta
+    execução: a próxima execução a busca de novo.
+
+    Returns:
+        int: Votações gravadas
+    """
+    inicio = datetime.fromisoformat(desde[:10])
+    fim = datetime.now()
+    aguardando_desde = (fim - timedelta(days=DIAS_AGUARDANDO_VOTOS)).isoformat()
+    gravadas = 0
+    retida = None
+
+    while inicio <= fim:
+        janela_fim = min(inicio + timedelta(days=DIAS_POR_JANELA_VOTACOES), fim)
+        votacoes = list(paginar(f"{BASE_URL}/votacoes", {
+            'dataInicio': inicio.strftime('%Y-%m-%d'),
+            'dataFim': janela_fim.strftime('%Y-%m-%d'),
+            'ordem': 'ASC',
+            'ordenarPor': 'dataHoraRegistro',
+            'itens': ITENS_POR_PAGINA
+        }))
+
+        repetidas = [v['id'] for v in votacoes if v.get('dataHoraRegistro', '') <= desde]
+        conhecidas = set()
+        if repetidas:
+            cursor = escritor.conn.cursor()
+            cursor.execute(f"""
+                SELECT id FROM votacoes v
+                WHERE id IN ({','.join('?' * len(repetidas))})
+                  AND EXISTS (SELECT 1 FROM votos_deputados WHERE votacao_id = v.id)
+            """, repetidas)
+            conhecidas = {row[0] for row in cursor.fetchall()}
+
+        novas = [v['id'] for v in votacoes if v['id'] not in conhecidas]
+        registros, falhas = enriquecer_votacoes(novas, executor)
+        for details in registros:
+            if save_vote_to_db(escritor, details):
+                gravadas += 1
+
+        sem_votos = {details['id'] for details in registros
+                     if not details.get('votos_deputados') and details.get('data', '') >= aguardando_desde}
+        pendentes = set(falhas) | sem_votos
+
+        if pendentes and retida is None:
+            retida = min(v.get('dataHoraRegistro', '') for v in votacoes if v['id'] in pendentes)
+            logger.warning(f"⚠️  votacoes: {len(falhas)} votações com falha na API e {len(sem_votos)} "
+                           f"sem votos publicados; a marca fica em {retida}")
+            avancar_marca(escritor, 'votacoes', max(retida, desde), None)
+        elif pendentes:
+            logger.warning(f"⚠️  votacoes: {len(falhas)} votações com falha na API e {len(sem_votos)} "
+                           f"sem votos publicados")
+        elif retida is None:
+            if votacoes:
+                ultima = max(votacoes, key=lambda v: (v.get('dataHoraRegistro', ''), v['id']))
+                if ultima.get('dataHoraRegistro', '') > desde:
+                    desde, ultimo_id = ultima['dataHoraRegistro'], ultima['id']
+            avancar_marca(escritor, 'votacoes', desde, ultimo_id)
+        escritor.flush()
+
+        inicio = janela_fim + timedelta(days=1)
+
+    return gravadas
+
+
+def sincronizar(entidades=ENTIDADES, desde=None, paralelo=CAMARA_ENRIQUECIMENTO_PARALELO):
+    """
+    Sincroniza as entidades a partir das marcas d'água.
+
+    Args:
+        entidades (tuple): Subconjunto de ENTIDADES
+        desde (str): Ignora as marcas e sincroniza a partir desta data (YYYY-MM-DD)
+        paralelo (int): Requisições simultâneas no enriquecimento
+
+    Returns:
+        dict: Registros gravados por entidade (None se a entidade falhou)
+    """
+    escritor = EscritorLotes()
+    resultado = {}
+    requisicoes_antes = sum(requisicoes_por_fluxo.values())
+    inicio = time.time()
+
+    with ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='sincronizacao',
+                            initializer=definir_fluxo, initargs=(fluxo_atual(),)) as executor:
+        for entidade in entidades:
+            marca, ultimo_id = (desde, None) if desde else ler_marca(escritor.conn, entidade)
+            logger.info(f"🔄 {entidade}: alterações desde {marca}")
+
+            try:
+                if entidade == 'votacoes':
+                    resultado[entidade] = sincronizar_votacoes(escritor, executor, marca, ultimo_id)
+                else:
+                    resultado[entidade] = sincronizar_proposicoes(escritor, executor, entidade, marca)
+            except requests.RequestException as e:
+                # Nada desta entidade foi confirmado além do já gravado: a marca fica onde estava
+                logger.error(f"❌ Erro ao sincronizar {entidade}: {e}")
+                resultado[entidade] = None
+                continue
+
+            logger.info(f"   ✅ {entidade}: {resultado[entidade]} registros atualizados")
+
+    escritor.close()
+    logger.info(f"🏁 Sincronização em {time.time() - inicio:.1f}s com "
+                f"{sum(requisicoes_por_fluxo.values()) - requisicoes_antes} requisições")
+    return resultado
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Sincronização incremental de PLs, votações e MPs')
+    parser.add_argument('--entidades', nargs='+', choices=ENTIDADES, default=list(ENTIDADES),
+                        help='Entidades a sincronizar (padrão: todas)')
+    parser.add_argument('--desde', help='Ignora as marcas d\'água e sincroniza a partir desta data (YYYY-MM-DD)')
+    parser.add_argument('--paralelo', type=int, default=CAMARA_ENRIQUECIMENTO_PARALELO,
+                        help=f'Requisições simultâneas no enriquecimento (padrão: {CAMARA_ENRIQUECIMENTO_PARALELO})')
+    parser.add_argument('--status', action='store_true', help='Mostra as marcas d\'água atuais')
+
+    args = parser.parse_args()
+
+    if args.status:
+        from database.init_db import get_connection
+
+        conn = get_connection()
+        for entidade in ENTIDADES:
+            marca, ultimo_id = ler_marca(conn, entidade)
+            print(f"   • {entidade}: {marca}" + (f" (id {ultimo_id})" if ultimo_id else ""))
+        conn.close()
+    else:
+        sincronizar(args.entidades, args.desde, args.paralelo)
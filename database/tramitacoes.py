@@ -0,0 +1,192 @@
+"""
+Histórico de Tramitação
+Mantém a tabela tramitacoes de PLs e MPs: cada proposição pede à API só as
+tramitações a partir da última gravada e insere apenas as de sequência nova
+"""
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.api_camara import BASE_URL, definir_fluxo, fluxo_atual, paginar
+from database.dimensoes import ORGAOS
+from database.escrita import EscritorLotes
+from src.config import CAMARA_ENRIQUECIMENTO_PARALELO
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Proposições por lote gravado na atualização em massa
+PROPOSICOES_POR_LOTE = 200
+
+SQL_INSERIR_TRAMITACAO = """
+    INSERT INTO tramitacoes (proposicao_id, sequencia, data_hora, orgao_id, descricao, situacao, despacho)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (proposicao_id, sequencia) DO NOTHING
+"""
+
+
+def preparar_tramitacao(conn, registro):
+    """Linha de tramitacoes a partir de (proposicao_id, tramitação da API), com o órgão codificado"""
+    proposicao_id, tramitacao = registro
+    return (
+        proposicao_id,
+        tramitacao['sequencia'],
+        tramitacao.get('dataHora') or '',
+        ORGAOS.obter_id(conn, tramitacao.get('siglaOrgao')),
+        tramitacao.get('descricaoTramitacao'),
+        tramitacao.get('descricaoSituacao'),
+        tramitacao.get('despacho')
+    )
+
+
+def ultimas_tramitacoes(conn, ids):
+    """
+    Última tramitação gravada de cada proposição.
+
+    Returns:
+        dict: {proposicao_id: (maior sequência, data_hora mais recente)}
+    """
+    ultimas = {}
+    ids = list(ids)
+    for i in range(0, len(ids), 500):
+        parte = ids[i:i + 500]
+        cursor = conn.execute(f"""
+            SELECT proposicao_id, MAX(sequencia), MAX(data_hora)
+            FROM tramitacoes
+            WHERE proposicao_id IN ({','.join('?' * len(parte))})
+            GROUP BY proposicao_id
+        """, parte)
+        ultimas.update({row[0]: (row[1], row[2]) for row in cursor.fetchall()})
+    return ultimas
+
+
+def buscar_tramitacoes(proposicao_id, desde=None):
+    """
+    Tramitações de uma proposição, a partir da data `desde` (None = todas).
+
+    Returns:
+        list: Tramitações da API (levanta requests.RequestException em falha)
+    """
+    params = {'dataInicio': desde[:10]} if desde else None
+    return list(paginar(f"{BASE_URL}/proposicoes/{proposicao_id}/tramitacoes", params, timeout=15))
+
+
+def atualizar_tramitacoes(escritor, executor, ids):
+    """
+    Busca em paralelo as tramitações novas das proposições e as enfileira.
+
+    Cada proposição pede à API só o que veio desde o dia da última
+    tramitação gravada; entradas daquele dia já gravadas são descartadas
+    pela sequência. O escritor precisa de conexão própria (lê as últimas
+    sequências gravadas).
+
+    Returns:
+        tuple: (tramitações novas enfileiradas, IDs das proposições cuja busca falhou)
+    """
+    ultimas = ultimas_tramitacoes(escritor.conn, ids)
+    futuros = {
+        executor.submit(buscar_tramitacoes, proposicao_id, ultimas.get(proposicao_id, (0, None))[1]): proposicao_id
+        for proposicao_id in ids
+    }
+
+    novas = 0
+    falhas = []
+    for futuro in as_completed(futuros):
+        proposicao_id = futuros[futuro]
+        try:
+            tramitacoes = futuro.result()
+        except requests.RequestException as e:
+            logger.warning(f"⚠️  Erro ao buscar tramitações da proposição {proposicao_id}: {e}")
+            falhas.append(proposicao_id)
+            continue
+
+        ultima_sequencia = ultimas.get(proposicao_id, (0, None))[0]
+        for tramitacao in tramitacoes:
+            if (tramitacao.get('sequencia') or 0) > ultima_sequencia:
+                escritor.adicionar(SQL_INSERIR_TRAMITACAO, (proposicao_id, tramitacao), preparar=preparar_tramitacao)
+                novas += 1
+
+    return novas, falhas
+
+
+def proposicoes_pendentes(conn, todas=False):
+    """IDs de PLs e MPs (só os sem nenhuma tramitação gravada, salvo com todas=True)"""
+    filtro = "" if todas else "WHERE id NOT IN (SELECT proposicao_id FROM tramitacoes)"
+    cursor = conn.execute(f"""
+        SELECT id FROM projetos_lei {filtro}
+        UNION ALL
+        SELECT id FROM medidas_provisorias {filtro}
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def coletar_tramitacoes(todas=False, paralelo=CAMARA_ENRIQUECIMENTO_PARALELO):
+    """
+    Preenche o histórico de tramitação das proposições já gravadas.
+
+    Args:
+        todas (bool): Atualiza todas as proposições (padrão: só as sem histórico)
+        paralelo (int): Requisições simultâneas
+
+    Returns:
+        int: Tramitações novas gravadas
+    """
+    escritor = EscritorLotes()
+    ids = proposicoes_pendentes(escritor.conn, todas)
+    inicio = time.time()
+    novas = 0
+
+    logger.info(f"📜 Tramitações de {len(ids)} proposições...")
+
+    with ThreadPoolExecutor(max_workers=paralelo, thread_name_prefix='tramitacoes',
+                            initializer=definir_fluxo, initargs=(fluxo_atual(),)) as executor:
+        for i in range(0, len(ids), PROPOSICOES_POR_LOTE):
+            novas += atualizar_tramitacoes(escritor, executor, ids[i:i + PROPOSICOES_POR_LOTE])[0]
+            escritor.flush()
+            logger.info(f"   {min(i + PROPOSICOES_POR_LOTE, len(ids))}/{len(ids)} proposições ({novas} tramitações novas)")
+
+    escritor.close()
+    logger.info(f"✅ {novas} tramitações novas em {time.time() - inicio:.1f}s")
+    return novas
+
+
+def linha_do_tempo(conn, proposicao_id):
+    """Tramitações de uma proposição em ordem cronológica"""
+    cursor = conn.execute("""
+        SELECT sequencia, data_hora, orgao, descricao, situacao, despacho
+        FROM vw_tramitacoes
+        WHERE proposicao_id = ?
+        ORDER BY sequencia
+    """, (proposicao_id,))
+    return cursor.fetchall()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Histórico de tramitação de PLs e MPs')
+    parser.add_argument('--todas', action='store_true',
+                        help='Atualiza todas as proposições (padrão: só as sem histórico)')
+    parser.add_argument('--paralelo', type=int, default=CAMARA_ENRIQUECIMENTO_PARALELO,
+                        help=f'Requisições simultâneas (padrão: {CAMARA_ENRIQUECIMENTO_PARALELO})')
+    parser.add_argument('--proposicao', type=int, help='Mostra a linha do tempo de uma proposição')
+
+    args = parser.parse_args()
+
+    if args.proposicao:
+        from database.init_db import get_connection
+
+        conn = get_connection()
+        for sequencia, data_hora, orgao, descricao, situacao, despacho in linha_do_tempo(conn, args.proposicao):
+            print(f"   {sequencia:>4}  {data_hora[:16]}  {orgao or '-':<10} {descricao or ''}"
+                  + (f" → {situacao}" if situacao else ""))
+        conn.close()
+    else:
+        coletar_tramitacoes(args.todas, args.paralelo)
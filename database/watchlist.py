@@ -0,0 +1,322 @@
+"""
+Watchlist de Deputados - Monitoramento em Alta Frequência
+Consulta apenas os deputados da watchlist (despesas do mês corrente e
+votos recentes) em intervalos curtos, com requisições condicionais, e
+registra como eventos os registros vistos pela primeira vez
+"""
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.init_db import get_connection
+from src.config import WATCHLIST_DEPUTADOS, WATCHLIST_INTERVALO_SEGUNDOS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
+HEADERS = {"Accept": "application/json"}
+
+
+def sincronizar_watchlist(conn, deputados=None):
+    """Garante que os deputados da configuração estejam na watchlist (sem duplicatas)"""
+    deputados = WATCHLIST_DEPUTADOS if deputados is None else list(dict.fromkeys(deputados))
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO watchlist (deputado_id, origem) VALUES (?, 'config')",
+        [(deputado_id,) for deputado_id in deputados]
+    )
+    conn.commit()
+
+
+def listar_watchlist(conn):
+    """Retorna os ids dos deputados ativos na watchlist"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT deputado_id FROM watchlist WHERE ativo = 1 ORDER BY deputado_id")
+    return [row[0] for row in cursor.fetchall()]
+
+
+class ClienteCondicional:
+    """
+    Cliente HTTP que reaproveita ETag/Last-Modified salvos em http_cache.
+
+    Quando o servidor responde 304 Not Modified, get_json retorna None e
+    nada precisa ser reprocessado. Se a resposta só estará processada mais
+    tarde, guardar=False deixa os validadores pendentes até confirmar():
+    sem a confirmação, a próxima requisição baixa a resposta inteira de novo.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.sessao = requests.Session()
+        self.sessao.headers.update(HEADERS)
+        self.requisicoes = 0
+        self.nao_modificadas = 0
+        self._pendentes = {}
+
+    @staticmethod
+    def chave(url, params=None):
+        """URL completa usada como chave em http_cache"""
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def get_json(self, url, params=None, timeout=15, condicional=True, guardar=True):
+        """
+        GET condicional; retorna o JSON ou None se não houve mudança.
+
+        Args:
+            condicional (bool): Envia os validadores salvos (False sempre baixa a resposta)
+            guardar (bool): Salva os validadores da resposta já (False: só em confirmar())
+        """
+        chave = self.chave(url, params)
+
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT etag, last_modified FROM http_cache WHERE url = ?", (chave,))
+        validadores = cursor.fetchone() if condicional else None
+
+        headers = {}
+        if validadores:
+            if validadores['etag']:
+                headers['If-None-Match'] = validadores['etag']
+            if validadores['last_modified']:
+                headers['If-Modified-Since'] = validadores['last_modified']
+
+        response = self.sessao.get(chave, headers=headers, timeout=timeout)
+        self.requisicoes += 1
+
+        if response.status_code == 304:
+            self.nao_modificadas += 1
+            return None
+
+        response.raise_for_status()
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._pendentes[chave] = (etag, last_modified)
+            if guardar:
+                self.confirmar(url, params)
+
+        return response.json()
+
+    def confirmar(self, url, params=None):
+        """Salva os validadores da última resposta de `url` (a próxima requisição vira condicional)"""
+        chave = self.chave(url, params)
+        if chave not in self._pendentes:
+            return
+        etag, last_modified = self._pendentes.pop(chave)
+        self.conn.execute("""
+            INSERT INTO http_cache (url, etag, last_modified, atualizado_em)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                atualizado_em = excluded.atualizado_em
+        """, (chave, etag, last_modified))
+
+
+def emitir_evento(conn, tipo, chave, deputado_id=None, dados=None):
+    """
+    Registra um evento se o registro ainda não foi visto.
+
+    Returns:
+        bool: True se o evento é novo
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO eventos (tipo, chave, deputado_id, dados)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (tipo, chave) DO NOTHING
+    """, (tipo, chave, deputado_id, json.dumps(dados, ensure_ascii=False) if dados else None))
+
+    return cursor.rowcount > 0
+
+
+def chave_despesa(deputado_id, despesa):
+    """Identificador natural de uma despesa (codDocumento quando disponível)"""
+    if despesa.get('codDocumento'):
+        return f"{deputado_id}:{despesa['codDocumento']}"
+    return (f"{deputado_id}:{despesa.get('numeroDocumento', '')}:{despesa.get('dataDocumento', '')}:"
+            f"{despesa.get('cnpjCpfFornecedor', '')}:{despesa.get('valorDocumento', 0)}")
+
+
+def verificar_despesas(conn, cliente, deputado_id, ano, mes):
+    """Emite eventos para despesas novas do deputado no mês"""
+    novos = []
+    url = f"{BASE_URL}/deputados/{deputado_id}/despesas"
+    # Mais recentes primeiro: se a primeira página não mudou, não há despesa nova
+    params = {'ano': ano, 'mes': mes, 'itens': 100, 'pagina': 1,
+              'ordem': 'DESC', 'ordenarPor': 'dataDocumento'}
+
+    while url:
+        data = cliente.get_json(url, params)
+        if data is None:
+            break
+
+        for despesa in data.get('dados', []):
+            if emitir_evento(conn, 'despesa', chave_despesa(deputado_id, despesa), deputado_id, despesa):
+                novos.append(('despesa', deputado_id, despesa))
+
+        url = next((link['href'] for link in data.get('links', []) if link['rel'] == 'next'), None)
+        params = None
+
+    return novos
+
+
+def verificar_votacoes(conn, cliente, deputados, dias=2):
+    """
+    Emite eventos para votações novas e para os votos dos deputados da watchlist nelas.
+
+    Uma votação só vira evento depois que os votos são publicados. Até lá
+    ela é revista a cada ciclo: os validadores da listagem só são salvos
+    quando nenhuma votação ficou pendente (senão um 304 esconderia as
+    pendentes), e /votos de votação sem evento é sempre pedido por inteiro.
+    Só a primeira página é condicional: se ela mudou, a janela inteira é
+    percorrida pelos links 'next' (dias de plenário cheio passam de uma página).
+    """
+    novos = []
+    url = f"{BASE_URL}/votacoes"
+    params = {
+        'dataInicio': (datetime.now() - timedelta(days=dias)).strftime('%Y-%m-%d'),
+        'ordem': 'DESC',
+        'ordenarPor': 'dataHoraRegistro',
+        'itens': 100
+    }
+    data = cliente.get_json(url, params, guardar=False)
+    if data is None:
+        return novos
+
+    cursor = conn.cursor()
+    monitorados = set(deputados)
+    pendentes = 0
+
+    while data is not None:
+        for votacao in data.get('dados', []):
+            cursor.execute("SELECT 1 FROM eventos WHERE tipo = 'votacao' AND chave = ?", (votacao['id'],))
+            if cursor.fetchone():
+                continue
+
+            votos = cliente.get_json(f"{BASE_URL}/votacoes/{votacao['id']}/votos", condicional=False)
+            if not votos or not votos.get('dados'):
+                # Votos ainda não publicados: a votação é revista no próximo ciclo
+                pendentes += 1
+                continue
+
+            for voto in votos['dados']:
+                deputado_id = voto.get('deputado_', {}).get('id')
+                if deputado_id in monitorados:
+                    voto['idVotacao'] = votacao['id']
+                    if emitir_evento(conn, 'voto', f"{votacao['id']}:{deputado_id}", deputado_id, voto):
+                        novos.append(('voto', deputado_id, voto))
+
+            emitir_evento(conn, 'votacao', votacao['id'], None, votacao)
+            novos.append(('votacao', None, votacao))
+
+        proxima = next((link['href'] for link in data.get('links', []) if link['rel'] == 'next'), None)
+        data = cliente.get_json(proxima, condicional=False, guardar=False) if proxima else None
+
+    if not pendentes:
+        cliente.confirmar(url, params)
+
+    return novos
+
+
+def executar_ciclo(conn, cliente):
+    """Executa uma rodada de verificação para toda a watchlist"""
+    deputados = listar_watchlist(conn)
+    hoje = datetime.now()
+    novos = []
+
+    for deputado_id in deputados:
+        try:
+            novos.extend(verificar_despesas(conn, cliente, deputado_id, hoje.year, hoje.month))
+        except requests.RequestException as e:
+            logger.warning(f"Erro ao verificar despesas do deputado {deputado_id}: {e}")
+        conn.commit()
+
+    try:
+        novos.extend(verificar_votacoes(conn, cliente, deputados))
+    except requests.RequestException as e:
+        logger.warning(f"Erro ao verificar votações: {e}")
+    conn.commit()
+
+    for tipo, deputado_id, dados in novos:
+        if tipo == 'despesa':
+            logger.info(f"💰 Nova despesa de {deputado_id}: R$ {dados.get('valorLiquido', 0):,.2f} "
+                        f"({dados.get('tipoDespesa', '')})")
+        elif tipo == 'voto':
+            logger.info(f"🗳️  Deputado {deputado_id} votou '{dados.get('tipoVoto', '')}' "
+                        f"na votação {dados['idVotacao']}")
+
+    return novos
+
+
+def monitorar(intervalo=WATCHLIST_INTERVALO_SEGUNDOS, ciclos=None):
+    """
+    Monitora a watchlist em loop.
+
+    Args:
+        intervalo (int): Segundos entre ciclos
+        ciclos (int): Número de ciclos (None = infinito)
+    """
+    conn = get_connection()
+    sincronizar_watchlist(conn)
+    cliente = ClienteCondicional(conn)
+
+    logger.info(f"👀 Monitorando {len(listar_watchlist(conn))} deputados a cada {intervalo}s")
+
+    ciclo = 0
+    try:
+        while ciclos is None or ciclo < ciclos:
+            requisicoes_antes = cliente.requisicoes
+            novos = executar_ciclo(conn, cliente)
+            ciclo += 1
+
+            logger.info(f"   Ciclo {ciclo}: {len(novos)} eventos novos, "
+                        f"{cliente.requisicoes - requisicoes_antes} requisições "
+                        f"({cliente.nao_modificadas} não modificadas no total)")
+
+            if ciclos is None or ciclo < ciclos:
+                time.sleep(intervalo)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Monitoramento em alta frequência da watchlist de deputados')
+    parser.add_argument('--intervalo', type=int, default=WATCHLIST_INTERVALO_SEGUNDOS,
+                        help=f'Segundos entre ciclos (padrão: {WATCHLIST_INTERVALO_SEGUNDOS})')
+    parser.add_argument('--ciclos', type=int, help='Número de ciclos (padrão: infinito)')
+    parser.add_argument('--adicionar', type=int, nargs='+', help='Adiciona deputados à watchlist')
+    parser.add_argument('--remover', type=int, nargs='+', help='Remove deputados da watchlist')
+    parser.add_argument('--listar', action='store_true', help='Lista a watchlist')
+
+    args = parser.parse_args()
+
+    if args.adicionar or args.remover or args.listar:
+        conn = get_connection()
+        sincronizar_watchlist(conn)
+        for deputado_id in args.adicionar or []:
+            conn.execute("""
+                INSERT INTO watchlist (deputado_id, origem) VALUES (?, 'manual')
+                ON CONFLICT (deputado_id) DO UPDATE SET ativo = 1
+            """, (deputado_id,))
+        for deputado_id in args.remover or []:
+            conn.execute("UPDATE watchlist SET ativo = 0 WHERE deputado_id = ?", (deputado_id,))
+        conn.commit()
+        print(f"👀 Watchlist: {', '.join(map(str, listar_watchlist(conn)))}")
+        conn.close()
+    else:
+        try:
+            monitorar(args.intervalo, args.ciclos)
+        except KeyboardInterrupt:
+            print("\n⚠️  Monitoramento interrompido")
@@ -5,6 +5,7 @@ Este script monitora projetos de lei da Câmara dos Deputados,
 classifica por importância e posta threads informativas no X.
 """
 import logging
+import sqlite3
 from datetime import datetime, timezone
 
 # Importando funções dos módulos criados
@@ -23,6 +24,10 @@ from src.analisador.analisador_projetos import (
 )
 from src.formatadores.formatador_projetos import format_project_thread
 
+# Autores vêm da tabela autorias (enriquecida pelo pipeline de coleta)
+from database.autorias import autores_do_projeto
+from database.init_db import get_connection
+
 # Importando funções do código já existente
 from src.api_client import post_tweet
 from src.main import load_json, save_json
@@ -95,9 +100,18 @@ def main():
         logging.info("Critérios de postagem não atendidos. Encerrando ciclo.")
         return
     
-    # 7. Buscar autores do projeto
+    # 7. Autores do projeto (do banco; só PLs ainda sem autoria vão à API, uma vez)
     logging.info("Buscando autores do projeto %s...", selected_project['numero'])
-    autores = get_project_authors(selected_project['id'])
+    try:
+        conn = get_connection()
+        try:
+            autores = autores_do_projeto(conn, selected_project['id'])
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        # Banco indisponível ou em schema antigo: autores direto da API
+        logging.warning("Banco indisponível para autorias (%s); buscando autores na API.", e)
+        autores = get_project_authors(selected_project['id'])
     
     # 8. Formatar thread
     logging.info("Formatando thread para o projeto %s...", selected_project['numero'])
@@ -0,0 +1,51 @@
+"""Módulo para agregação das despesas da cota parlamentar."""
+from collections import defaultdict
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def normalize_category(expense_type):
+    """Normaliza o nome de uma categoria de despesa (memoizado: há poucas categorias distintas)."""
+    return expense_type.replace(".", "").strip().title()
+
+
+class ExpenseAggregator:
+    """
+    Agrega despesas de forma incremental, uma por vez.
+
+    Mantém apenas o total gasto, um acumulador por categoria e a maior
+    despesa única, então pode consumir diretamente o gerador de
+    iter_deputy_expenses sem materializar a lista de despesas.
+    """
+
+    __slots__ = ('total_spent', 'grouped_expenses', 'largest_expense')
+
+    def __init__(self):
+        self.total_spent = 0
+        self.grouped_expenses = defaultdict(float)
+        self.largest_expense = None
+
+    def add(self, expense):
+        """Acumula uma despesa."""
+        value = expense['valorLiquido']
+        self.total_spent += value
+
+        category_name = normalize_category(expense['tipoDespesa'])
+        self.grouped_expenses[category_name] += value
+
+        if value > 0 and (self.largest_expense is None
+                          or value > self.largest_expense['valorLiquido']):
+            self.largest_expense = expense
+
+    def consume(self, expenses):
+        """Acumula todas as despesas de um iterável e retorna o próprio agregador."""
+        for expense in expenses:
+            self.add(expense)
+        return self
+
+    def result(self):
+        """Retorna (total gasto, categorias ordenadas por valor, maior despesa)."""
+        sorted_grouped_expenses = sorted(self.grouped_expenses.items(),
+                                         key=lambda item: item[1],
+                                         reverse=True)
+        return self.total_spent, dict(sorted_grouped_expenses), self.largest_expense
@@ -24,20 +24,24 @@ def get_deputies_list():
         return []
 
 
-def get_deputy_expenses(deputy_id, months=3):
+def iter_deputy_expenses(deputy_id, months=3):
     """
-    Busca todas as despesas de um deputado nos últimos X meses.
+    Percorre as despesas de um deputado nos últimos X meses, página a página.
+
+    Diferente de get_deputy_expenses, não acumula as despesas: cada registro é
+    entregue assim que a página chega, então a memória usada não cresce com o
+    número de despesas.
 
     Args:
         deputy_id (int): O ID do deputado.
         months (int): O número de meses para buscar as despesas (padrão: 3).
 
     Retorna:
-        list: Uma lista de dicionários, onde cada dicionário representa uma despesa.
-              Retorna uma lista vazia em caso de erro.
+        generator: Dicionários, cada um representando uma despesa.
+                   Um mês com erro de rede é interrompido silenciosamente.
     """
-    all_expenses = []
     today = datetime.date.today()
+    headers = {"Accept": "application/json"}
     # Itera pelos meses para fazer buscas mais focadas e evitar timeouts
     for i in range(months):
         target_date = today - datetime.timedelta(days=i * 30)
@@ -48,7 +52,6 @@ def get_deputy_expenses(deputy_id, months=3):
             "itens": 100,
             "pagina": 1
         }
-        headers = {"Accept": "application/json"}
 
         # Loop de paginação para o mês corrente
         page_url = url
@@ -58,15 +61,29 @@ def get_deputy_expenses(deputy_id, months=3):
                                         params=params, timeout=15)
                 response.raise_for_status()
                 data = response.json()
-                all_expenses.extend(data["dados"])
-
-                next_link = next((link["href"] for link in data["links"]
-                                  if link["rel"] == "next"), None)
-                page_url = next_link
-                params = {}  # Params só são necessários na primeira requisição
             except requests.RequestException:
                 break
-    return all_expenses
+
+            yield from data["dados"]
+
+            page_url = next((link["href"] for link in data["links"]
+                             if link["rel"] == "next"), None)
+            params = {}  # Params só são necessários na primeira requisição
+
+
+def get_deputy_expenses(deputy_id, months=3):
+    """
+    Busca todas as despesas de um deputado nos últimos X meses.
+
+    Args:
+        deputy_id (int): O ID do deputado.
+        months (int): O número de meses para buscar as despesas (padrão: 3).
+
+    Retorna:
+        list: Uma lista de dicionários, onde cada dicionário representa uma despesa.
+              Retorna uma lista vazia em caso de erro.
+    """
+    return list(iter_deputy_expenses(deputy_id, months))
 
 
 def post_tweet(text, reply_to_id=None):
@@ -47,7 +47,7 @@ DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-# IDs dos deputados monitorados
+# IDs dos deputados monitorados (ids repetidos são ignorados na watchlist)
 DEPUTADOS_MONITORADOS = [
     74173,   # Adail Filho (REPUBLICANOS-AM)
     220599,  # Afonso Motta (PDT-RS)
@@ -66,6 +66,19 @@ DEPUTADOS_MONITORADOS = [
     74173,   # Nikolas Ferreira (PL-MG)
 ]
 
+# Watchlist (database/watchlist.py)
+WATCHLIST_DEPUTADOS = list(dict.fromkeys(DEPUTADOS_MONITORADOS))
+WATCHLIST_INTERVALO_SEGUNDOS = int(os.getenv("WATCHLIST_INTERVALO_SEGUNDOS", "300"))
+
+# Orçamento de requisições à API da Câmara compartilhado pelos coletores históricos
+CAMARA_REQUISICOES_POR_SEGUNDO = float(os.getenv("CAMARA_REQUISICOES_POR_SEGUNDO", "5"))
+# Requisições simultâneas nas etapas de enriquecimento (detalhes de cada registro)
+CAMARA_ENRIQUECIMENTO_PARALELO = int(os.getenv("CAMARA_ENRIQUECIMENTO_PARALELO", "8"))
+# Capacidade das filas entre etapas da coleta: partições listadas à espera do
+# enriquecimento e lotes (até 1000 linhas cada) à espera do escritor dedicado
+COLETA_CAPACIDADE_FILA = int(os.getenv("COLETA_CAPACIDADE_FILA", "8"))
+COLETA_CAPACIDADE_ESCRITOR = int(os.getenv("COLETA_CAPACIDADE_ESCRITOR", "256"))
+
 # Timeouts
 HTTP_TIMEOUT = 30
 API_TIMEOUT = 60
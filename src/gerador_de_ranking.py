@@ -1,15 +1,16 @@
 """Módulo para gerar um ranking de gastos de deputados."""
 import json
 import time
-from src.api_client import get_deputies_list, get_deputy_expenses
+from src.api_client import get_deputies_list, iter_deputy_expenses
+from src.analisador.analisador_gastos import ExpenseAggregator
 
 
 RANKING_FILE = 'ranking_gastos.json'
 
 
 def calculate_total_spent(expenses):
-    """Calcula o total gasto a partir de uma lista de despesas."""
-    return sum(expense['valorLiquido'] for expense in expenses)
+    """Calcula o total gasto a partir de um iterável de despesas."""
+    return ExpenseAggregator().consume(expenses).total_spent
 
 
 def main():
@@ -33,7 +34,7 @@ def main():
         print(f"Processando [{i+1}/{total_deputies}]: {deputy_name}...",
               end="", flush=True)
 
-        expenses = get_deputy_expenses(deputy_id)
+        expenses = iter_deputy_expenses(deputy_id)
         total_spent = calculate_total_spent(expenses)
 
         if total_spent > 0:
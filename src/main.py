@@ -1,9 +1,9 @@
 """Módulo principal para o Monitor PL Brasil."""
 import json
-from collections import defaultdict
 from dotenv import load_dotenv
 
-from src.api_client import get_deputy_expenses, post_tweet
+from src.analisador.analisador_gastos import ExpenseAggregator
+from src.api_client import iter_deputy_expenses, post_tweet
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -29,28 +29,12 @@ def save_json(data, file_path):
 
 def process_expenses(expenses):
     """
-    Processa uma lista de despesas para calcular o total gasto,
+    Processa despesas para calcular o total gasto,
     agrupar despesas por categoria e identificar a maior despesa única.
-    """
-    if not expenses:
-        return 0, {}, None
-
-    total_spent = 0
-    grouped_expenses = defaultdict(float)
-    largest_single_expense = {"valorLiquido": 0}
-
-    for expense in expenses:
-        total_spent += expense['valorLiquido']
-        category_name = expense['tipoDespesa'].replace(".", "").strip().title()
-        grouped_expenses[category_name] += expense['valorLiquido']
 
-        if expense['valorLiquido'] > largest_single_expense['valorLiquido']:
-            largest_single_expense = expense
-
-    sorted_grouped_expenses = sorted(grouped_expenses.items(),
-                                     key=lambda item: item[1],
-                                     reverse=True)
-    return total_spent, dict(sorted_grouped_expenses), largest_single_expense
+    Aceita qualquer iterável, inclusive o gerador de iter_deputy_expenses.
+    """
+    return ExpenseAggregator().consume(expenses).result()
 
 
 def generate_thread_content(deputy_id, deputy_name, deputy_party,
@@ -127,7 +111,7 @@ def main():
     print(f"Processando: {deputy_name} ({deputy_party})")
 
     # Buscar despesas
-    expenses = get_deputy_expenses(deputy_id)
+    expenses = iter_deputy_expenses(deputy_id)
     total_spent, grouped_expenses, largest_expense = process_expenses(expenses)
 
     if total_spent == 0:
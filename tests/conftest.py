@@ -0,0 +1,43 @@
+"""Fixtures compartilhadas: cada teste usa um banco SQLite próprio em tmp_path"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import fornecedores, init_db
+from database.dimensoes import ORGAOS, PARTIDOS, TIPOS_DESPESA
+
+DADOS = Path(__file__).parent / 'dados'
+
+
+@pytest.fixture
+def arquivo_banco(tmp_path, monkeypatch):
+    """Caminho do banco do teste; caches de dimensões zerados (os ids mudam de banco para banco)"""
+    monkeypatch.setattr(init_db, 'DATABASE_DIR', tmp_path)
+    monkeypatch.setattr(init_db, 'DATABASE_FILE', tmp_path / 'monitor_pl.db')
+    for dimensao in (TIPOS_DESPESA, PARTIDOS, ORGAOS):
+        dimensao.limpar_cache()
+    fornecedores.limpar_cache()
+    return init_db.DATABASE_FILE
+
+
+@pytest.fixture
+def banco(arquivo_banco):
+    """Conexão com um banco vazio no schema atual"""
+    assert init_db.create_database()
+    conn = init_db.get_connection()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def banco_v1(arquivo_banco):
+    """Banco no schema original (v1, anterior às migrações), ainda sem dados"""
+    conn = sqlite3.connect(arquivo_banco)
+    conn.executescript((DADOS / 'schema_v1.sql').read_text(encoding='utf-8'))
+    yield conn
+    conn.close()
@@ -0,0 +1,38 @@
+"""Gravação de PLs: upsert pelo id, autor vindo de autorias e conflitos de número"""
+from database.autorias import SQL_INSERIR_AUTORIA, linhas_autoria
+from database.coletor_historico_pls import salvar_pl
+from database.escrita import EscritorLotes
+
+
+def pl(pl_id, numero, ementa='Dispõe sobre a saúde'):
+    return {'id': pl_id, 'siglaTipo': 'PL', 'numero': numero, 'ano': 2024, 'ementa': ementa,
+            'dataApresentacao': '2024-03-01', 'nomeAutor': 'Senado Federal'}
+
+
+def test_recoleta_atualiza_o_autor_vindo_de_autorias(banco):
+    banco.execute("INSERT INTO deputados (id, nome, partido, uf) VALUES (204554, 'Fulana', 'PT', 'SP')")
+    with EscritorLotes(conn=banco) as escritor:
+        salvar_pl(escritor, pl(1, 10))
+        escritor.flush()
+        assert banco.execute("SELECT autor_id FROM projetos_lei WHERE id = 1").fetchone()[0] is None
+
+        autores = [{'nome': 'Fulana', 'uri': 'https://dadosabertos.camara.leg.br/api/v2/deputados/204554',
+                    'ordemAssinatura': 1, 'siglaPartido': 'PT', 'siglaUf': 'SP'}]
+        escritor.adicionar_varios(SQL_INSERIR_AUTORIA, linhas_autoria(1, autores))
+        salvar_pl(escritor, pl(1, 10, ementa='Dispõe sobre a saúde pública'))
+
+    assert tuple(banco.execute("SELECT autor_id, autor_nome FROM projetos_lei WHERE id = 1").fetchone()) == (
+        204554, 'Fulana'
+    )
+
+
+def test_conflito_de_numero_nao_e_descartado_em_silencio(banco):
+    escritor = EscritorLotes(conn=banco)
+    salvar_pl(escritor, pl(1, 10))
+    assert escritor.flush()
+
+    salvar_pl(escritor, pl(2, 10))
+    assert not escritor.flush()
+
+    assert escritor.linhas_com_erro == 1
+    assert banco.execute("SELECT COUNT(*) FROM projetos_lei").fetchone()[0] == 1
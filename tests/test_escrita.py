@@ -0,0 +1,194 @@
+"""Escrita em lotes: EscritorDedicado (commits, envios inválidos, falhas da thread) e EscritorLotes"""
+import sqlite3
+import time
+
+import pytest
+
+from database.coletor_historico_gastos import salvar_gasto
+from database.escrita import EscritorDedicado, EscritorLotes, Lote
+
+INSERIR = "INSERT INTO teste (valor) VALUES (?)"
+
+
+@pytest.fixture
+def tabela(banco):
+    """Tabela de rascunho no banco do teste; devolve a conexão para conferir o que foi confirmado"""
+    banco.execute("CREATE TABLE teste (valor INTEGER NOT NULL)")
+    banco.commit()
+    return banco
+
+
+def lote(*valores):
+    return Lote(INSERIR, None, [(valor,) for valor in valores])
+
+
+def confirmadas(conn):
+    return conn.execute("SELECT COUNT(*) FROM teste").fetchone()[0]
+
+
+def test_close_confirma_o_que_falta(tabela):
+    dedicado = EscritorDedicado(linhas_por_commit=1000, intervalo_commit=60)
+    dedicado.enviar(lote(1, 2))
+    dedicado.enviar(lote(3))
+    assert confirmadas(tabela) == 0
+
+    dedicado.close()
+
+    assert confirmadas(tabela) == 3
+    assert (dedicado.linhas_gravadas, dedicado.commits, dedicado.linhas_com_erro) == (3, 1, 0)
+
+
+def test_commit_a_cada_linhas_por_commit(tabela):
+    dedicado = EscritorDedicado(linhas_por_commit=2, intervalo_commit=60)
+    for valor in range(4):
+        dedicado.enviar(lote(valor))
+    assert dedicado.sincronizar(timeout=5)
+
+    assert confirmadas(tabela) == 4
+    assert dedicado.commits == 2
+    dedicado.close()
+
+
+def test_commit_por_intervalo_sem_novos_envios(tabela):
+    dedicado = EscritorDedicado(linhas_por_commit=1000, intervalo_commit=0.05)
+    dedicado.enviar(lote(1))
+
+    prazo = time.monotonic() + 5
+    while confirmadas(tabela) == 0 and time.monotonic() < prazo:
+        time.sleep(0.01)
+
+    assert confirmadas(tabela) == 1
+    dedicado.close()
+
+
+def test_envio_invalido_e_descartado_inteiro_sem_desfazer_os_outros(tabela):
+    with EscritorDedicado(linhas_por_commit=1000, intervalo_commit=60) as dedicado:
+        dedicado.enviar(lote(1))
+        # Os lotes de um flush são um envio só: o válido também é descartado
+        dedicado.enviar([lote(2), Lote("INSERT INTO nao_existe VALUES (?)", None, [(3,)])])
+        dedicado.enviar(lote(4))
+
+    assert sorted(v for (v,) in tabela.execute("SELECT valor FROM teste")) == [1, 4]
+    assert (dedicado.linhas_gravadas, dedicado.linhas_com_erro) == (2, 2)
+
+
+def test_erro_no_preparador_descarta_so_o_envio(tabela):
+    def preparar(conn, registro):
+        return (registro['valor'],)
+
+    with EscritorDedicado() as dedicado:
+        dedicado.enviar(Lote(INSERIR, preparar, [{'valor': 1}]))
+        dedicado.enviar(Lote(INSERIR, preparar, [{'outro': 2}]))
+
+    assert confirmadas(tabela) == 1
+    assert dedicado.linhas_com_erro == 1
+
+
+def test_falha_da_thread_chega_aos_chamadores_sem_travar(tabela, tmp_path):
+    # Um diretório no lugar do arquivo: a conexão da thread de escrita não abre
+    dedicado = EscritorDedicado(database_file=tmp_path)
+    prazo = time.monotonic() + 5
+    while dedicado._erro is None and time.monotonic() < prazo:
+        time.sleep(0.01)
+
+    with pytest.raises(sqlite3.OperationalError):
+        dedicado.enviar(lote(1))
+    with pytest.raises(sqlite3.OperationalError):
+        dedicado.sincronizar(timeout=5)
+    with pytest.raises(sqlite3.OperationalError):
+        dedicado.close()
+    assert not dedicado._thread.is_alive()
+
+
+def test_erro_do_bloco_tem_prioridade_sobre_o_do_escritor(tabela, tmp_path):
+    with pytest.raises(KeyError):
+        with EscritorDedicado(database_file=tmp_path):
+            raise KeyError('coletor')
+
+
+def test_escritor_lotes_com_destino_conta_linhas_enviadas(tabela):
+    with EscritorDedicado() as dedicado:
+        escritor = EscritorLotes(destino=dedicado)
+        escritor.adicionar_varios(INSERIR, [(1,), (2,)])
+        escritor.adicionar("INSERT INTO nao_existe VALUES (?)", (3,))
+        assert escritor.flush()
+        escritor.close()
+
+    # Entregues ao escritor dedicado não são gravadas: quem sabe disso é ele
+    assert (escritor.linhas_enviadas, escritor.linhas_gravadas) == (3, 0)
+    assert (dedicado.linhas_gravadas, dedicado.linhas_com_erro) == (0, 3)
+    assert confirmadas(tabela) == 0
+
+
+def test_escritor_lotes_grava_e_conta_erros(tabela):
+    escritor = EscritorLotes(conn=tabela, tamanho_lote=2)
+    escritor.adicionar(INSERIR, (1,))
+    escritor.adicionar(INSERIR, (2,))  # atinge tamanho_lote: grava sozinho
+    assert escritor.pendentes == 0
+
+    escritor.adicionar(INSERIR, (None,))
+    assert not escritor.flush()
+
+    assert confirmadas(tabela) == 2
+    assert (escritor.linhas_gravadas, escritor.linhas_com_erro, escritor.lotes) == (2, 1, 1)
+
+
+def gasto(fornecedor, documento, tipo, valor):
+    return {'ano': 2024, 'mes': 3, 'tipoDespesa': tipo, 'valorDocumento': valor, 'valorLiquido': valor,
+            'cnpjCpfFornecedor': documento, 'nomeFornecedor': fornecedor, 'codDocumento': valor}
+
+
+def gastos_gravados(conn):
+    return [tuple(g) for g in conn.execute(
+        "SELECT fornecedor, tipo_despesa, valor_liquido FROM vw_gastos ORDER BY valor_liquido"
+    )]
+
+
+@pytest.fixture
+def deputado(banco):
+    banco.execute("INSERT INTO deputados (id, nome) VALUES (1, 'Fulana')")
+    banco.commit()
+    return banco
+
+
+def test_rollback_nao_deixa_ids_de_dimensoes_no_cache(deputado):
+    escritor = EscritorLotes(conn=deputado)
+    posto = gasto('Posto A', '11111111000111', 'COMBUSTÍVEIS', 10.0)
+    sem_ano = {k: v for k, v in gasto('Hotel C', '33333333000133', 'HOSPEDAGEM', 30.0).items() if k != 'ano'}
+
+    salvar_gasto(escritor, 1, posto)
+    salvar_gasto(escritor, 1, sem_ano)
+    assert not escritor.flush()
+
+    # Novos valores depois do rollback não herdam os ids que ficaram para trás
+    salvar_gasto(escritor, 1, gasto('Companhia B', '22222222000122', 'PASSAGEM AÉREA', 20.0))
+    assert escritor.flush()
+    salvar_gasto(escritor, 1, posto)
+    assert escritor.flush()
+
+    assert gastos_gravados(deputado) == [
+        ('POSTO A', 'COMBUSTÍVEIS', 10.0),
+        ('COMPANHIA B', 'PASSAGEM AÉREA', 20.0),
+    ]
+    assert deputado.execute("SELECT COUNT(*) FROM fornecedores").fetchone()[0] == 2
+
+
+def test_rollback_to_do_escritor_dedicado_nao_deixa_ids_no_cache(deputado):
+    posto = gasto('Posto A', '11111111000111', 'COMBUSTÍVEIS', 10.0)
+    sem_ano = {k: v for k, v in gasto('Hotel C', '33333333000133', 'HOSPEDAGEM', 30.0).items() if k != 'ano'}
+
+    with EscritorDedicado() as dedicado:
+        escritor = EscritorLotes(destino=dedicado)
+        salvar_gasto(escritor, 1, posto)
+        salvar_gasto(escritor, 1, sem_ano)
+        escritor.flush()
+        salvar_gasto(escritor, 1, gasto('Companhia B', '22222222000122', 'PASSAGEM AÉREA', 20.0))
+        escritor.flush()
+        salvar_gasto(escritor, 1, posto)
+        escritor.flush()
+
+    assert gastos_gravados(deputado) == [
+        ('POSTO A', 'COMBUSTÍVEIS', 10.0),
+        ('COMPANHIA B', 'PASSAGEM AÉREA', 20.0),
+    ]
+    assert dedicado.linhas_com_erro == 2
@@ -0,0 +1,31 @@
+"""Métricas das filas: cada execução conta do zero"""
+from concurrent.futures import ThreadPoolExecutor
+
+from database.filas import FilaLimitada, em_ordem_de_conclusao, metricas_por_etapa, reiniciar_metricas
+
+
+def test_nova_fila_com_o_mesmo_nome_nao_soma_a_anterior():
+    anterior = FilaLimitada('escritor', 4)
+    anterior.put(1)
+    anterior.get()
+
+    fila = FilaLimitada('escritor', 8)
+
+    assert anterior.metricas.itens == 1
+    assert (fila.metricas.itens, fila.metricas.capacidade) == (0, 8)
+    assert metricas_por_etapa['escritor'] is fila.metricas
+
+
+def test_etapa_conta_so_os_itens_da_propria_execucao():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for _ in range(2):
+            resultados = [futuro.result() for _, futuro in
+                          em_ordem_de_conclusao(executor, abs, [(-1,), (-2,), (-3,)], 2, 'teste')]
+            assert sorted(resultados) == [1, 2, 3]
+            assert metricas_por_etapa['teste'].itens == 3
+
+
+def test_reiniciar_metricas_esquece_etapas_anteriores():
+    FilaLimitada('antiga', 1)
+    reiniciar_metricas()
+    assert metricas_por_etapa == {}
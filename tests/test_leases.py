@@ -0,0 +1,138 @@
+"""Leases de trabalho: reivindicação, vencimento, devolução e conclusão de shards"""
+import pytest
+
+from database import coleta_distribuida, leases
+from database.escrita import EscritorLotes
+
+
+def status(conn, shard, entidade='pls'):
+    return tuple(conn.execute(
+        "SELECT status, worker, tentativas FROM work_leases WHERE entidade = ? AND shard = ?", (entidade, shard)
+    ).fetchone())
+
+
+@pytest.fixture
+def shards(banco):
+    """Dois shards de PLs na fila"""
+    leases.registrar(banco, 'pls', [('2024-01', False), ('2024-02', False)])
+    return banco
+
+
+def test_registrar_e_idempotente(banco):
+    assert leases.registrar(banco, 'pls', [('2024-01', False), ('2024-02', True)]) == 2
+    assert leases.registrar(banco, 'pls', [('2024-01', False), ('2024-02', True)]) == 0
+    assert leases.resumo(banco) == {'pls': {'pending': 2}}
+
+
+def test_registrar_recoloca_shard_aberto_concluido(shards):
+    leases.reivindicar(shards, 'a', ['pls'])
+    with EscritorLotes(conn=shards) as escritor:
+        leases.concluir(escritor, 'pls', '2024-01', 'a')
+
+    assert leases.registrar(shards, 'pls', [('2024-01', False)]) == 0
+    assert leases.registrar(shards, 'pls', [('2024-01', True)]) == 1
+    assert status(shards, '2024-01')[0] == 'pending'
+
+
+def test_workers_recebem_shards_distintos(shards):
+    primeiro = leases.reivindicar(shards, 'a', ['pls'])
+    segundo = leases.reivindicar(shards, 'b', ['pls'])
+
+    assert primeiro == ('pls', '2024-01', 1)
+    assert segundo == ('pls', '2024-02', 1)
+    assert leases.reivindicar(shards, 'c', ['pls']) is None
+    assert leases.em_andamento(shards, ['pls']) == 2
+
+
+def test_reivindicar_filtra_por_entidade(shards):
+    assert leases.reivindicar(shards, 'a', ['gastos']) is None
+
+
+def test_lease_vencido_e_reivindicado_por_outro_worker(shards):
+    leases.registrar(shards, 'mps', [('2024', False)])
+    assert leases.reivindicar(shards, 'a', ['mps'], duracao=-1) == ('mps', '2024', 1)
+    assert leases.em_andamento(shards, ['mps']) == 0
+
+    assert leases.reivindicar(shards, 'b', ['mps']) == ('mps', '2024', 2)
+
+    # O worker original não renova nem conclui um lease que não é mais dele
+    assert not leases.renovar(shards, 'mps', '2024', 'a')
+    with EscritorLotes(conn=shards) as escritor:
+        leases.concluir(escritor, 'mps', '2024', 'a', 10)
+    assert status(shards, '2024', 'mps') == ('leased', 'b', 2)
+    assert leases.renovar(shards, 'mps', '2024', 'b')
+
+
+def test_lease_vencido_apos_max_tentativas_vira_erro(banco):
+    leases.registrar(banco, 'mps', [('2024', False)])
+    for tentativa in range(1, leases.MAX_TENTATIVAS + 1):
+        assert leases.reivindicar(banco, f'w{tentativa}', ['mps'], duracao=-1) == ('mps', '2024', tentativa)
+
+    assert leases.reivindicar(banco, 'outro', ['mps']) is None
+    assert status(banco, '2024', 'mps')[0] == 'error'
+
+    # Registrar de novo é a forma de pedir nova tentativa
+    assert leases.registrar(banco, 'mps', [('2024', False)]) == 1
+    assert status(banco, '2024', 'mps') == ('pending', f'w{leases.MAX_TENTATIVAS}', 0)
+
+
+def test_liberar_devolve_o_shard_a_fila(shards):
+    leases.reivindicar(shards, 'a', ['pls'])
+    leases.liberar(shards, 'pls', '2024-01', 'a', 'timeout')
+
+    assert status(shards, '2024-01') == ('pending', 'a', 1)
+    assert leases.reivindicar(shards, 'b', ['pls']) == ('pls', '2024-02', 1)
+    assert leases.reivindicar(shards, 'b', ['pls']) == ('pls', '2024-01', 2)
+
+
+def test_liberar_apos_max_tentativas_marca_erro(banco):
+    leases.registrar(banco, 'mps', [('2024', False)])
+    for tentativa in range(leases.MAX_TENTATIVAS):
+        leases.reivindicar(banco, 'a', ['mps'])
+        leases.liberar(banco, 'mps', '2024', 'a', 'timeout')
+
+    assert status(banco, '2024', 'mps') == ('error', 'a', leases.MAX_TENTATIVAS)
+    assert leases.reivindicar(banco, 'a', ['mps']) is None
+
+
+def test_concluir_grava_no_flush_do_escritor(shards):
+    leases.reivindicar(shards, 'a', ['pls'])
+    escritor = EscritorLotes(conn=shards)
+    leases.concluir(escritor, 'pls', '2024-01', 'a', 42)
+    assert status(shards, '2024-01')[0] == 'leased'
+
+    escritor.flush()
+
+    assert status(shards, '2024-01')[0] == 'done'
+    assert shards.execute(
+        "SELECT total_registros FROM work_leases WHERE shard = '2024-01'"
+    ).fetchone()[0] == 42
+    assert leases.em_andamento(shards, ['pls']) == 0
+
+
+def test_batimento_sinaliza_lease_perdido(banco):
+    leases.registrar(banco, 'mps', [('2024', False)])
+    leases.reivindicar(banco, 'a', ['mps'], duracao=-1)
+    leases.reivindicar(banco, 'b', ['mps'])
+
+    with leases.Batimento('mps', '2024', 'a', duracao=0.03) as batimento:
+        assert batimento.perdido.wait(timeout=5)
+
+
+def test_trabalhar_libera_o_shard_quando_o_processamento_quebra(banco, monkeypatch):
+    leases.registrar(banco, 'mps', [('2024', False)])
+    chamadas = []
+
+    def processar_shard(escritor, executor, checkpoints, entidade, shard):
+        chamadas.append(shard)
+        if len(chamadas) == 1:
+            raise KeyError('campo inesperado')
+        return 7, True
+
+    monkeypatch.setattr(coleta_distribuida, 'processar_shard', processar_shard)
+
+    estatisticas = coleta_distribuida.trabalhar(entidades=('mps',), worker='a', paralelo=1)
+
+    assert chamadas == ['2024', '2024']
+    assert estatisticas == {'shards': 2, 'falhas': 1, 'registros': 7}
+    assert status(banco, '2024', 'mps') == ('done', 'a', 2)
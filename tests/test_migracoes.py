@@ -0,0 +1,104 @@
+"""Migrações: um banco no schema original chega à versão atual sem perder dados"""
+import re
+
+from database import init_db
+from database.migracoes import MIGRACOES, migracoes_pendentes, versao_atual
+
+GASTO_V1 = """
+    INSERT INTO gastos (deputado_id, ano, mes, tipo_despesa, valor_documento, valor_liquido,
+                        fornecedor, cnpj_fornecedor, numero_documento, data_documento)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def popular_v1(conn):
+    """Um deputado com gastos (um deles duplicado por recoleta), um PL e uma votação"""
+    conn.execute("INSERT INTO deputados (id, nome, partido, uf) VALUES (204554, 'Fulana', 'PT', 'SP')")
+    conn.executemany(GASTO_V1, [
+        (204554, 2024, 3, 'COMBUSTÍVEIS E LUBRIFICANTES.', 100.0, 100.0, 'Posto A', '111', '1', '2024-03-02'),
+        (204554, 2024, 3, 'COMBUSTÍVEIS E LUBRIFICANTES.', 100.0, 100.0, 'Posto A', '111', '1', '2024-03-02'),
+        (204554, 2024, 3, 'PASSAGEM AÉREA', 900.0, 900.0, 'Companhia B', '222', '2', '2024-03-05'),
+    ])
+    conn.execute("""
+        INSERT INTO projetos_lei (id, numero, ano, ementa, data_apresentacao, categoria)
+        VALUES (1, 'PL 1/2024', 2024, 'Dispõe sobre a reforma tributária', '2024-03-01', 'economia')
+    """)
+    conn.execute("INSERT INTO votacoes (id, data, descricao) VALUES ('v1', '2024-03-10', 'Votação')")
+    conn.execute("INSERT INTO votos_deputados (votacao_id, deputado_id, voto) VALUES ('v1', 204554, 'Não')")
+    conn.commit()
+
+
+def test_banco_v1_migra_ate_a_versao_atual(banco_v1):
+    popular_v1(banco_v1)
+    banco_v1.close()
+
+    assert init_db.create_database()
+    conn = init_db.get_connection()
+
+    assert versao_atual(conn) == MIGRACOES[-1].versao
+    assert migracoes_pendentes(conn) == []
+
+    # v6/v7: gastos codificados e deduplicados pela chave natural
+    colunas = {row[1] for row in conn.execute("PRAGMA table_info(gastos)")}
+    assert {'tipo_despesa_id', 'fornecedor_id', 'cod_documento', 'parcela'} <= colunas
+    assert 'tipo_despesa' not in colunas
+    gastos = conn.execute("""
+        SELECT tipo_despesa, fornecedor, valor_liquido FROM vw_gastos ORDER BY valor_liquido
+    """).fetchall()
+    assert [tuple(g) for g in gastos] == [
+        ('COMBUSTÍVEIS E LUBRIFICANTES', 'POSTO A', 100.0),
+        ('PASSAGEM AÉREA', 'COMPANHIA B', 900.0),
+    ]
+
+    # v8: voto codificado
+    assert conn.execute("SELECT tipo_voto FROM votos_deputados").fetchone()[0] == 2
+
+    # Recálculos pedidos pelas migrações: cota, resumos e busca textual
+    assert conn.execute("SELECT gasto FROM cota_utilizacao WHERE ano = 2024 AND mes = 3").fetchone()[0] == 1000.0
+    assert conn.execute("SELECT rowid FROM busca_pls WHERE busca_pls MATCH 'tributaria'").fetchone()[0] == 1
+    conn.close()
+
+
+def test_migracao_e_idempotente(banco_v1):
+    popular_v1(banco_v1)
+    banco_v1.close()
+
+    assert init_db.create_database()
+    assert init_db.create_database()
+
+    conn = init_db.get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM gastos").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == MIGRACOES[-1].versao
+    conn.close()
+
+
+def test_get_connection_migra_banco_antigo(banco_v1):
+    popular_v1(banco_v1)
+    banco_v1.close()
+
+    conn = init_db.get_connection()
+    assert versao_atual(conn) == MIGRACOES[-1].versao
+    conn.close()
+
+
+def test_get_connection_sem_migrar_preserva_a_versao(banco_v1):
+    banco_v1.execute("INSERT INTO deputados (id, nome) VALUES (1, 'Fulano')")
+    banco_v1.commit()
+
+    conn = init_db.get_connection(migrar=False)
+    assert versao_atual(conn) == 1
+    assert len(migracoes_pendentes(conn)) == len(MIGRACOES)
+    conn.close()
+
+
+def test_banco_novo_ja_nasce_na_versao_atual(banco):
+    assert versao_atual(banco) == MIGRACOES[-1].versao
+    assert migracoes_pendentes(banco) == []
+
+
+def test_versoes_do_schema_e_das_migracoes_coincidem():
+    schema = init_db.SCHEMA_FILE.read_text(encoding='utf-8')
+    versoes = [int(v) for v in re.findall(r'VALUES \((\d+), ', schema[schema.index('schema_version (version'):])]
+
+    assert versoes == list(range(1, MIGRACOES[-1].versao + 1))
+    assert [m.versao for m in MIGRACOES] == list(range(2, MIGRACOES[-1].versao + 1))
@@ -0,0 +1,159 @@
+"""Sincronização incremental: a marca d'água não passa de itens que falharam na API"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import sincronizacao
+from database.escrita import EscritorLotes
+
+ONTEM = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+HOJE = datetime.now().strftime('%Y-%m-%d')
+
+VOTACOES = [
+    {'id': 'v1', 'dataHoraRegistro': f'{ONTEM}T10:00:00'},
+    {'id': 'v2', 'dataHoraRegistro': f'{ONTEM}T11:00:00'},
+    {'id': 'v3', 'dataHoraRegistro': f'{ONTEM}T12:00:00'},
+]
+
+
+def marca(conn, entidade):
+    linha = conn.execute(
+        "SELECT ultima_data, ultimo_id FROM sync_watermarks WHERE entidade = ?", (entidade,)
+    ).fetchone()
+    return tuple(linha) if linha else None
+
+
+@pytest.fixture
+def escritor(banco):
+    with EscritorLotes(conn=banco) as escritor:
+        yield escritor
+
+
+@pytest.fixture
+def api_votacoes(monkeypatch):
+    """Listagem fixa de votações; `falhas` não voltam do enriquecimento e `sem_votos` voltam sem votos"""
+    api = {'falhas': set(), 'sem_votos': set(), 'enriquecidas': [], 'gravadas': []}
+    datas = {v['id']: v['dataHoraRegistro'] for v in VOTACOES}
+
+    def enriquecer_votacoes(ids, executor):
+        api['enriquecidas'].append(list(ids))
+        registros = [
+            {'id': i, 'data': datas[i],
+             'votos_deputados': [] if i in api['sem_votos'] else [{'deputado_id': 1, 'tipo_voto': 'sim'}]}
+            for i in ids if i not in api['falhas']
+        ]
+        return registros, [i for i in ids if i in api['falhas']]
+
+    def save_vote_to_db(escritor, details):
+        api['gravadas'].append(details['id'])
+        return True
+
+    monkeypatch.setattr(sincronizacao, 'paginar', lambda url, params: iter(VOTACOES))
+    monkeypatch.setattr(sincronizacao, 'enriquecer_votacoes', enriquecer_votacoes)
+    monkeypatch.setattr(sincronizacao, 'save_vote_to_db', save_vote_to_db)
+    return api
+
+
+def test_votacoes_sem_falha_avancam_ate_a_ultima(escritor, api_votacoes):
+    gravadas = sincronizacao.sincronizar_votacoes(escritor, None, ONTEM, None)
+
+    assert gravadas == 3
+    assert marca(escritor.conn, 'votacoes') == (f'{ONTEM}T12:00:00', 'v3')
+
+
+def test_votacao_com_falha_retem_a_marca(escritor, api_votacoes):
+    api_votacoes['falhas'] = {'v2'}
+
+    gravadas = sincronizacao.sincronizar_votacoes(escritor, None, ONTEM, None)
+
+    assert gravadas == 2
+    assert marca(escritor.conn, 'votacoes') == (f'{ONTEM}T11:00:00', None)
+
+    # A próxima execução parte da marca retida e busca a votação que falhou de novo
+    api_votacoes['falhas'] = set()
+    desde, ultimo_id = sincronizacao.ler_marca(escritor.conn, 'votacoes')
+    sincronizacao.sincronizar_votacoes(escritor, None, desde, ultimo_id)
+
+    assert 'v2' in api_votacoes['enriquecidas'][-1]
+    assert marca(escritor.conn, 'votacoes') == (f'{ONTEM}T12:00:00', 'v3')
+
+
+def test_votacao_sem_votos_retem_a_marca_ate_os_votos_sairem(escritor, api_votacoes):
+    api_votacoes['sem_votos'] = {'v2'}
+
+    sincronizacao.sincronizar_votacoes(escritor, None, ONTEM, None)
+    assert marca(escritor.conn, 'votacoes') == (f'{ONTEM}T11:00:00', None)
+
+    # Já gravada, mas sem votos: é enriquecida de novo em vez de pulada
+    escritor.adicionar("INSERT INTO votacoes (id, data) VALUES (?, ?)", ('v2', f'{ONTEM}T11:00:00'))
+    escritor.flush()
+    api_votacoes['sem_votos'] = set()
+    desde, ultimo_id = sincronizacao.ler_marca(escritor.conn, 'votacoes')
+    sincronizacao.sincronizar_votacoes(escritor, None, desde, ultimo_id)
+
+    assert 'v2' in api_votacoes['enriquecidas'][-1]
+    assert marca(escritor.conn, 'votacoes') == (f'{ONTEM}T12:00:00', 'v3')
+
+
+def test_votacao_antiga_sem_votos_nao_segura_a_marca(escritor, api_votacoes, monkeypatch):
+    # Votações simbólicas nunca têm votos nominais
+    monkeypatch.setattr(sincronizacao, 'DIAS_AGUARDANDO_VOTOS', 0)
+    api_votacoes['sem_votos'] = {'v2'}
+
+    sincronizacao.sincronizar_votacoes(escritor, None, ONTEM, None)
+
+    assert marca(escritor.conn, 'votacoes') == (f'{ONTEM}T12:00:00', 'v3')
+
+
+def test_falha_na_autoria_retem_a_marca_dos_pls(escritor, monkeypatch):
+    monkeypatch.setattr(sincronizacao, 'paginar', lambda url, params: iter([{'id': 1}, {'id': 2}]))
+    monkeypatch.setattr(sincronizacao, 'enriquecer_pls', lambda pls, executor: (list(pls), []))
+    monkeypatch.setattr(sincronizacao, 'salvar_pl', lambda escritor, pl: True)
+    monkeypatch.setattr(sincronizacao, 'pls_sem_autoria', lambda conn, ids: list(ids))
+    monkeypatch.setattr(sincronizacao, 'enriquecer_autorias', lambda escritor, executor, ids: (1, [2]))
+    monkeypatch.setattr(sincronizacao, 'atualizar_tramitacoes', lambda escritor, executor, ids: (0, []))
+
+    gravados = sincronizacao.sincronizar_proposicoes(escritor, None, 'pls', ONTEM)
+
+    assert gravados == 2
+    assert marca(escritor.conn, 'pls') is None
+
+
+@pytest.fixture
+def api_mps(monkeypatch):
+    """Listagem fixa de MPs; os ids em `falhas` não voltam dos detalhes"""
+    api = {'falhas': set()}
+
+    monkeypatch.setattr(sincronizacao, 'paginar', lambda url, params: iter([{'id': 10}, {'id': 11}]))
+    monkeypatch.setattr(sincronizacao, 'fetch_mp_details',
+                        lambda mp_id: None if mp_id in api['falhas'] else {'id': mp_id})
+    monkeypatch.setattr(sincronizacao, 'save_mp_to_db', lambda escritor, mp: True)
+    monkeypatch.setattr(sincronizacao, 'atualizar_tramitacoes', lambda escritor, executor, ids: (0, []))
+    return api
+
+
+def test_mps_sem_falha_avancam_ate_hoje(escritor, api_mps):
+    with sincronizacao.ThreadPoolExecutor(max_workers=1) as executor:
+        gravadas = sincronizacao.sincronizar_proposicoes(escritor, executor, 'mps', ONTEM)
+
+    assert gravadas == 2
+    assert marca(escritor.conn, 'mps') == (HOJE, '11')
+
+
+def test_mp_com_falha_nao_move_a_marca(escritor, api_mps):
+    api_mps['falhas'] = {11}
+
+    with sincronizacao.ThreadPoolExecutor(max_workers=1) as executor:
+        gravadas = sincronizacao.sincronizar_proposicoes(escritor, executor, 'mps', ONTEM)
+
+    assert gravadas == 1
+    assert marca(escritor.conn, 'mps') is None
+
+
+def test_falha_nas_tramitacoes_tambem_retem_a_marca(escritor, api_mps, monkeypatch):
+    monkeypatch.setattr(sincronizacao, 'atualizar_tramitacoes', lambda escritor, executor, ids: (0, [10]))
+
+    with sincronizacao.ThreadPoolExecutor(max_workers=1) as executor:
+        sincronizacao.sincronizar_proposicoes(escritor, executor, 'mps', ONTEM)
+
+    assert marca(escritor.conn, 'mps') is None
@@ -0,0 +1,34 @@
+"""Watchlist: votações novas percorrem todas as páginas da janela"""
+from database.watchlist import BASE_URL, verificar_votacoes
+
+
+class ClienteFalso:
+    """Responde a listagem de votações em páginas e /votos com um voto do deputado 1"""
+
+    def __init__(self, paginas):
+        self.paginas = paginas
+        self.confirmadas = []
+
+    def get_json(self, url, params=None, timeout=15, condicional=True, guardar=True):
+        if url.endswith('/votos'):
+            return {'dados': [{'deputado_': {'id': 1}, 'tipoVoto': 'Sim'}]}
+        pagina = 1 if params else int(url.rsplit('=', 1)[1])
+        links = [{'rel': 'next', 'href': f"{BASE_URL}/votacoes?pagina={pagina + 1}"}] \
+            if pagina < len(self.paginas) else []
+        return {'dados': [{'id': votacao_id} for votacao_id in self.paginas[pagina - 1]], 'links': links}
+
+    def confirmar(self, url, params=None):
+        self.confirmadas.append(url)
+
+
+def test_votacoes_de_todas_as_paginas_viram_eventos(banco):
+    cliente = ClienteFalso([['v1', 'v2'], ['v3'], ['v4']])
+
+    novos = verificar_votacoes(banco, cliente, [1])
+
+    assert sorted(dados['id'] for tipo, _, dados in novos if tipo == 'votacao') == ['v1', 'v2', 'v3', 'v4']
+    assert sorted(dados['idVotacao'] for tipo, _, dados in novos if tipo == 'voto') == ['v1', 'v2', 'v3', 'v4']
+    assert cliente.confirmadas == [f"{BASE_URL}/votacoes"]
+
+    # Segundo ciclo: nada novo em nenhuma página
+    assert verificar_votacoes(banco, cliente, [1]) == []